@@ -1,113 +1,34 @@
-import os
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-import statsmodels.api as sm
-import pytz
-
-# --- 1. GLOBAL SETTINGS & PATHING ---
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-def _path(fname):
-    local = os.path.join(BASE_DIR, fname)
-    if os.path.exists(local): return local
-    if os.path.exists('/Volumes'):
-        for vol in os.listdir('/Volumes'):
-            if 'Extreme' in vol:
-                for sub in ['', 'moms-dashboard', 'bamboo_data']:
-                    alt = os.path.join('/Volumes', vol, sub, fname) if sub else os.path.join('/Volumes', vol, fname)
-                    if os.path.exists(alt): return alt
-    return local
+import os
+from forecasting import backtest, engines, features, horizon, intervals, intraday, items, prep, registry, scoring
+from pipeline import cache, cpi, data
+from pipeline.paths import data_path
 
+# --- 1. GLOBAL SETTINGS ---
 st.set_page_config(page_title="Bamboo Pho Daily Insights", layout="wide", page_icon="🍜")
 
-@st.cache_data
-def load_all_data():
-    pt_tz, et_tz = pytz.timezone('US/Pacific'), pytz.timezone('US/Eastern')
-    
-    def process_sales(df_raw):
-        df_raw['Datetime_PT'] = pd.to_datetime(df_raw['Date'] + ' ' + df_raw['Time'])
-        df_raw['Datetime_ET'] = df_raw['Datetime_PT'].dt.tz_localize(pt_tz).dt.tz_convert(et_tz)
-        df_raw['Date'] = df_raw['Datetime_ET'].dt.date
-        df_raw['Day_of_Week'] = df_raw['Datetime_ET'].dt.day_name()
-        df_raw['Gross Sales'] = df_raw['Gross Sales'].replace(r'[\$,]', '', regex=True).astype(float)
-        df_raw['Qty'] = pd.to_numeric(df_raw['Qty'], errors='coerce').fillna(0)
-        return df_raw
-
-    # Sales files
-    sales_files = ['2024_Bamboo_Data.csv', '2025_Bamboo_Data.csv', 'Jan_2026_Bamboo_Data.csv', 'Feb 3 and 4 sales.csv']
-    sales_dfs = []
-    for f in sales_files:
-        p = _path(f)
-        if os.path.exists(p):
-            sales_dfs.append(process_sales(pd.read_csv(p)))
-    
-    # Weather files
-    weather_files = ['camp_hill_2024_weather_processed.csv', 'camp_hill_2025_weather.csv', 'jan_weather.csv', 'feb_weather.csv']
-    weather_dfs = []
-    for f in weather_files:
-        p = _path(f)
-        if os.path.exists(p):
-            w = pd.read_csv(p)
-            w['Date'] = pd.to_datetime(w['Date']).dt.date
-            w.columns = w.columns.str.replace(' ', '_')
-            if 'Temp_High' in w.columns:
-                w['Temp_High'] = w['Temp_High'].astype(str).str.replace('°F', '').astype(float)
-            if 'Precip_Type' in w.columns:
-                w['Precip_Type'] = w['Precip_Type'].astype(str).str.split(' ').str[0]
-            weather_dfs.append(w)
-            
-    return pd.concat(sales_dfs, ignore_index=True), pd.concat(weather_dfs, ignore_index=True)
-
 try:
     # --- 2. DATA PIPELINE ---
-    sales_df, weather_df = load_all_data()
-    pho_only = sales_df[sales_df['Item'].str.contains('Pho', case=False, na=False)].copy()
-    daily_pho = pho_only.groupby('Date')['Qty'].sum().reset_index().rename(columns={'Qty': 'Bowls_Sold'})
-    
-    merged = pd.merge(weather_df, daily_pho, on='Date', how='left').fillna(0)
-    merged['Date_dt'] = pd.to_datetime(merged['Date'])
-    merged['Day_of_Week'] = merged['Date_dt'].dt.day_name()
-    
-    # Global Filter: Closed on Mondays and zero-sales days
-    merged = merged[(merged['Day_of_Week'] != 'Monday') & (merged['Bowls_Sold'] > 0)].copy()
-
-    # Feature Engineering
-    KINK = 60
-    merged['is_weekend'] = merged['Day_of_Week'].isin(['Friday', 'Saturday', 'Sunday']).astype(int)
-    merged['is_rain'] = (merged['Precip_Type'].isin(['Rain', 'Mixed', 'Rainy'])).astype(int)
-    merged['is_snow'] = (merged['Precip_Type'].isin(['Snow', 'Flurries', 'Heavy Snow'])).astype(int)
-    merged['temp_cold'] = merged['Temp_High'].apply(lambda t: min(t, KINK))
-    merged['temp_hot'] = merged['Temp_High'].apply(lambda t: max(0, t - KINK))
-    merged['month'] = merged['Date_dt'].dt.month
-    merged['year'] = merged['Date_dt'].dt.year
-    merged['is_2024'] = (merged['year'] == 2024).astype(int)
-    merged['is_2025'] = (merged['year'] == 2025).astype(int)
-    
-    def get_season(m): return 1 if m in [1, 2, 11, 12] else (-1 if m in [4, 5, 6, 7, 8] else 0)
-    merged['season_impact'] = merged['month'].apply(get_season)
-    
-    anchor = pd.Timestamp('2026-01-09')
-    paydays = [anchor + pd.Timedelta(days=i*14) for i in range(-52, 26)]
-    merged['is_federal_payday'] = merged['Date_dt'].isin(paydays).astype(int)
+    # Sales, weather and merged frames are shared with the other pages (pipeline/data.py).
+    # Global Filter: Closed on Mondays and zero-sales days; calendar/precip features joined on date
+    merged = features.model_frame(data.load_merged())
 
     # --- 3. MODELING & BACKTESTING ---
-    merged = merged.sort_values('Date_dt')
-    X_vars = ['temp_cold', 'temp_hot', 'is_weekend', 'is_rain', 'is_snow', 'is_federal_payday', 'is_2024', 'is_2025', 'season_impact']
-    
-    # Split for Backtest
-    train_df = merged.iloc[:-14]
-    test_df = merged.iloc[-14:]
-    
-    X_train = sm.add_constant(train_df[X_vars])
-    model = sm.OLS(train_df['Bowls_Sold'], X_train).fit()
+    # Fitted artifacts are keyed by a hash of the training data (forecasting/registry.py):
+    # reruns and slider moves only load them, a refit happens when new sales are ingested
+    model = registry.load_or_fit('bowls_ols', merged)
+    # Residual-bootstrap draws for P10/P50/P90 and capacity risk, built once per artifact (forecasting/intervals.py)
+    draws = intervals.load_or_bootstrap(model, merged)
     
-    # Run Backtest
-    X_test = sm.add_constant(test_df[X_vars], has_constant='add')
-    test_df['Predicted'] = model.predict(X_test)
-    mae = np.mean(np.abs(test_df['Bowls_Sold'] - test_df['Predicted']))
+    # Walk-forward backtest over the whole history: each day is forecast from the days before it
+    # (recursive least-squares updates, forecasting/backtest.py)
+    walk = backtest.run(merged, model.kink)
+    test_df = walk.predictions.rename(columns={'Actual': 'Bowls_Sold'})
+    mae = walk.accuracy()['MAE'].iloc[0]
 
     # --- 4. NAVIGATION ---
     with st.sidebar:
@@ -116,31 +37,123 @@ try:
         st.markdown("---")
         st.metric("Model R² Score", f"{model.rsquared:.2f}")
         st.metric("Forecast Accuracy", f"{100 - (mae/test_df['Bowls_Sold'].mean()*100):.1f}%")
+        st.caption(f"Data cache: {cache.memory_footprint()['MB'].sum():.1f} MB")
 
     # --- PAGE: HOME & FORECAST ---
     if page == "Home & Forecast":
         st.title("🍜 Bamboo Pho Daily Insights")
-        st.header("📅 Tomorrow's Forecast")
+        mode = st.radio("Forecast mode", ["Tomorrow", "Week Ahead"], horizontal=True, label_visibility="collapsed")
+        if mode == "Tomorrow":
+            st.header("📅 Tomorrow's Forecast")
         
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Operational Inputs")
-            t_temp = st.slider("Forecasted High Temp (°F)", 0, 100, 35)
-            c1, c2 = st.columns(2)
-            with c1:
-                t_wknd = st.checkbox("Weekend (Fri-Sun)")
-                t_rain = st.checkbox("Rain")
-            with c2:
-                t_snow = st.checkbox("Snow")
-                t_pay = st.checkbox("Payday Friday")
-            t_season = st.selectbox("Seasonality", [1, 0, -1], format_func=lambda x: {1: "Winter Peak", 0: "Shoulder", -1: "Summer Slump"}[x])
-
-        with col2:
-            input_data = pd.DataFrame({'const':[1.0], 'temp_cold':[min(t_temp, KINK)], 'temp_hot':[max(0, t_temp-KINK)], 'is_weekend':[1 if t_wknd else 0], 'is_rain':[1 if t_rain else 0], 'is_snow':[1 if t_snow else 0], 'is_federal_payday':[1 if t_pay else 0], 'is_2024':[0], 'is_2025':[0], 'season_impact':[t_season]})
-            pred = model.predict(input_data)[0]
-            st.metric("🔮 Predicted Demand", f"{int(max(0, pred))} Bowls")
-            if pred > 80: st.error(f"🚨 Capacity Alert! {int(pred-80)} bowls over seating limit.")
-            elif pred > 68: st.warning("🟡 High Demand Expected.")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("Operational Inputs")
+                t_temp = st.slider("Forecasted High Temp (°F)", 0, 100, 35)
+                c1, c2 = st.columns(2)
+                with c1:
+                    t_wknd = st.checkbox("Weekend (Fri-Sun)")
+                    t_rain = st.checkbox("Rain")
+                with c2:
+                    t_snow = st.checkbox("Snow")
+                    t_pay = st.checkbox("Payday Friday")
+                t_season = st.selectbox("Seasonality", [1, 0, -1], format_func=lambda x: {1: "Winter Peak", 0: "Shoulder", -1: "Summer Slump"}[x])
+
+            with col2:
+                X = scoring.feature_matrix(model, t_temp, is_weekend=int(t_wknd), is_rain=int(t_rain), is_snow=int(t_snow),
+                                           is_federal_payday=int(t_pay), season_impact=t_season)
+                pred = model.predict(X)[0]
+                band = intervals.interval_frame(model, X, draws).iloc[0]
+                st.metric("🔮 Predicted Demand", f"{int(max(0, pred))} Bowls")
+                st.caption(f"80% range: **{band['P10']:.0f}-{band['P90']:.0f}** bowls (median {band['P50']:.0f}) · "
+                           f"{band['P_Over_Capacity']:.0%} chance of exceeding {scoring.CAPACITY_LIMIT} seats")
+                if band['Risk'] == 'capacity': st.error(f"🚨 Capacity Alert! {band['P_Over_Capacity']:.0%} chance of exceeding the seating limit.")
+                elif band['Risk'] == 'warning' or pred > scoring.CAPACITY_WARNING: st.warning("🟡 High Demand Expected.")
+
+            # Intraday: spread the daily forecast over 15-minute slots (forecasting/intraday.py)
+            st.subheader("⏱️ Intraday Rush Forecast")
+            day_type = features.DAY_TYPES[int(t_wknd)]
+            profile = intraday.load_profile()
+            slots = (intraday.forecast_slots(max(0, pred), day_type, profile, intraday.load_seat_profile())
+                     .set_index('Slot').loc[intraday.open_slots(profile)])
+            fig_slots = go.Figure()
+            fig_slots.add_trace(go.Bar(x=slots.index, y=slots['Bowls'], name='Bowls ordered', marker_color='#2E7D32'))
+            fig_slots.add_trace(go.Scatter(x=slots.index, y=slots['Seats_In_Use'], name=f'Dine-in seats in use (~{intraday.DWELL_MINUTES} min stay)', line=dict(color='#FFA000')))
+            fig_slots.add_hline(y=intraday.SEATS, line_dash='dash', line_color='#C62828', annotation_text='Seats')
+            fig_slots.update_layout(template='simple_white', height=300, hovermode='x unified', margin=dict(t=10, b=10))
+            st.plotly_chart(fig_slots, use_container_width=True)
+            peak = slots['Seats_In_Use'].idxmax()
+            st.caption(f"{day_type} profile · peak around **{peak}** with ~{slots['Seats_In_Use'].max():.0f} of {intraday.SEATS} seats in use")
+            if slots['Over_Capacity'].any():
+                st.error(f"🚨 Seating full in {int(slots['Over_Capacity'].sum())} slot(s) from {slots.index[slots['Over_Capacity']][0]}.")
+
+        else:
+            # Week ahead: score a 7-14 day weather forecast and its scenario grid in one call each (forecasting/horizon.py)
+            st.header("🗓️ Week-Ahead Forecast")
+            upload = st.file_uploader("Weather forecast CSV (Date, Temp_High, Precip_Type)", type="csv")
+            local = data_path(horizon.FORECAST_FILE)
+            if upload is None and not os.path.exists(local):
+                st.info(f"Upload a 7-14 day forecast or save it as `{horizon.FORECAST_FILE}` in the project folder.")
+            else:
+                forecast = horizon.read_forecast(upload if upload is not None else local)
+                week = horizon.forecast_horizon(forecast, model, draws)
+                alert_colors = {'ok': '#2E7D32', 'warning': '#FFA000', 'capacity': '#C62828'}
+
+                s1, s2 = st.columns(2)
+                sweep = s1.slider("Temperature sweep (± °F)", 0, 15, 5)
+                cases = s2.multiselect("Precip scenarios", horizon.PRECIP_SCENARIOS, default=horizon.PRECIP_SCENARIOS)
+                spread = horizon.scenario_spread(horizon.scenario_grid(forecast, sweep, precip=cases or [horizon.AS_FORECAST], model=model))
+
+                fig_week = go.Figure()
+                fig_week.add_trace(go.Bar(x=week['Day'], y=spread['High'] - spread['Low'], base=spread['Low'], name='Scenario range',
+                                          marker_color='rgba(158,158,158,0.35)', width=0.6))
+                fig_week.add_trace(go.Scatter(x=week['Day'], y=week['P50'], name='P10-P90', mode='markers',
+                                              marker=dict(size=1, color='rgba(0,0,0,0)'),
+                                              error_y=dict(type='data', symmetric=False, array=week['P90'] - week['P50'],
+                                                           arrayminus=week['P50'] - week['P10'], color='#616161', width=6)))
+                fig_week.add_trace(go.Scatter(x=week['Day'], y=week['Predicted_Bowls'], name='Forecast', mode='markers+text',
+                                              marker=dict(size=14, color=week['Alert'].map(alert_colors)),
+                                              text=week['Predicted_Bowls'].round(0).astype(int), textposition='top center'))
+                fig_week.add_hline(y=scoring.CAPACITY_LIMIT, line_dash='dash', line_color='#C62828', annotation_text='Seating limit')
+                fig_week.update_layout(template='simple_white', height=350, hovermode='x unified', margin=dict(t=10, b=10))
+                st.plotly_chart(fig_week, use_container_width=True)
+
+                strip = week[['Day', 'Temp_High', 'Precip_Type', 'Events', 'Predicted_Bowls', 'Alert']].copy()
+                strip['P10-P90'] = week['P10'].round(0).astype(int).astype(str) + '-' + week['P90'].round(0).astype(int).astype(str)
+                strip['P(Over Limit)'] = (week['P_Over_Capacity'] * 100).round(0).astype(int).astype(str) + '%'
+                strip['Range'] = spread['Low'].round(0).astype(int).astype(str) + '-' + spread['High'].round(0).astype(int).astype(str)
+                strip['Scenarios Over Limit'] = (spread['Share_capacity'] * 100).round(0).astype(int).astype(str) + '%'
+                st.dataframe(strip.style.apply(lambda col: [f'color: {alert_colors[a]}' for a in col], subset=['Alert']),
+                             use_container_width=True, hide_index=True)
+
+                # Whole-menu forecast: one model per item / category / family, one matrix product (forecasting/items.py)
+                st.subheader("🥢 Menu Forecast")
+                level = st.radio("Forecast by", items.LEVELS, horizontal=True)
+                item_models = items.load_or_fit(merged, model.kink, data.load_cube(), data.load_menu(), level)
+                quantities = prep.item_quantities(items.forecast_menu(forecast, item_models), level)
+                menu_qty = quantities.T.copy()
+                menu_qty.columns = week['Day'].to_numpy()
+                menu_qty = menu_qty.assign(Total=menu_qty.sum(axis=1)).sort_values('Total', ascending=False)
+                st.dataframe(menu_qty.round(0).astype(int), use_container_width=True)
+                st.caption(f"{len(item_models.series)} {level.lower()} models ({item_models.engine}, {item_models.nobs} operating days)")
+
+                # Prep list: forecasts × historical modifier mix × recipes.csv, one sparse product (forecasting/prep.py)
+                st.subheader("🧾 Prep Sheet")
+                prep_engine = prep.load_engine(level)
+                sheet = prep_engine.sheet(quantities)
+                prep_wide = sheet.pivot(index=['Ingredient', 'Unit'], columns='Date', values='Qty').fillna(0.0)
+                prep_wide.columns = pd.DatetimeIndex(prep_wide.columns).strftime('%a %b %d')
+                st.dataframe(prep_wide.assign(Total=prep_wide.sum(axis=1)).round(2), use_container_width=True)
+                st.download_button("⬇️ Download prep sheet (CSV)", sheet.assign(Date=sheet['Date'].dt.strftime('%Y-%m-%d')).to_csv(index=False),
+                                   file_name="prep_sheet.csv", mime="text/csv")
+                flagged = sheet[sheet['Over_Limit']]
+                if len(flagged):
+                    st.warning(f"⚠️ The {level.lower()} forecast asks for more than {engines.MAX_RATIO:g}× the busiest day on record for "
+                               f"{flagged['Ingredient'].nunique()} ingredient(s) ({', '.join(flagged['Ingredient'].unique()[:5])}). "
+                               "Those lines are flagged Over_Limit in the download; check the menu forecast before prepping.")
+                if prep_engine.unmatched:
+                    st.caption(f"No recipe in `{prep.RECIPES_FILE}` yet for {len(prep_engine.unmatched)} {level.lower()}(s): "
+                               f"{', '.join(prep_engine.unmatched[:8])}{' …' if len(prep_engine.unmatched) > 8 else ''}")
 
         st.divider()
         st.subheader("📈 Historical Sales vs. Temperature")
@@ -150,6 +163,22 @@ try:
         fig_hist.update_layout(yaxis2=dict(overlaying='y', side='right'), template='simple_white', hovermode='x unified')
         st.plotly_chart(fig_hist, use_container_width=True)
 
+        # Ticket-level reads from the basket table (pipeline/baskets.py)
+        tickets = data.load_daily_tickets()
+        k1, k2, k3 = st.columns(3)
+        k1.metric("🧾 Tickets / Day", f"{tickets['Tickets'].mean():.0f}")
+        k2.metric("💵 Avg Check", f"${tickets['Avg_Check'].mean():.2f}")
+        k3.metric("🍜 Pho per Ticket", f"{tickets['Pho_Per_Ticket'].mean():.2f}")
+
+        # Revenue in constant dollars (pipeline/cpi.py)
+        st.subheader(f"💵 Daily Revenue (nominal vs. {cpi.BASE_YEAR} dollars)")
+        revenue = data.load_daily_revenue()
+        fig_rev = go.Figure()
+        fig_rev.add_trace(go.Scatter(x=revenue['Date'], y=revenue['Net Sales'], name='Net sales', line=dict(color='#9E9E9E')))
+        fig_rev.add_trace(go.Scatter(x=revenue['Date'], y=revenue['Real_Net_Sales'], name=f'Real net sales ({cpi.BASE_YEAR} $)', line=dict(color='#2E7D32')))
+        fig_rev.update_layout(template='simple_white', height=300, hovermode='x unified', margin=dict(t=10, b=10))
+        st.plotly_chart(fig_rev, use_container_width=True)
+
     # --- PAGE: MODEL DIAGNOSTICS ---
     else:
         st.title("🧪 Model Diagnostics")
@@ -157,9 +186,9 @@ try:
         Use this page to validate the model's accuracy and understand the underlying drivers of soup demand.
         """)
         
-        # 14-Day Backtest
-        st.subheader("🧪 14-Day Backtest Accuracy")
-        st.markdown("_Showing model performance on the last 14 operating days (unseen by training data)._")
+        # Walk-forward Backtest
+        st.subheader("🧪 Walk-Forward Backtest Accuracy")
+        st.markdown(f"_Each day after the first {backtest.MIN_TRAIN_DAYS} operating days is forecast by a model trained only on earlier days._")
         fig_back = go.Figure()
         fig_back.add_trace(go.Scatter(x=test_df['Date'], y=test_df['Bowls_Sold'], name='Actual Sales', mode='lines+markers', line=dict(color='#2E7D32')))
         fig_back.add_trace(go.Scatter(x=test_df['Date'], y=test_df['Predicted'], name='Model Prediction', mode='lines+markers', line=dict(color='#FFA000', dash='dash')))
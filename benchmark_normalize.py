@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark Square line-item normalisation: legacy process_sales() vs the
+vectorized path in pipeline/normalize.py, on a synthetic year of line items
+(the January 2026 export repeated for each month of 2025). The store row also
+types every kept column (categoricals) as written to the Parquet store.
+
+Usage:
+    python benchmark_normalize.py [--repeat 5]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from pipeline import normalize, sales_store
+from pipeline.paths import data_path
+
+SOURCE_EXPORT = 'Jan_2026_Bamboo_Data.csv'
+
+
+def legacy_process_sales(df_raw):
+    """process_sales() as it was in app.py before the sales store"""
+    pt_tz, et_tz = pytz.timezone('US/Pacific'), pytz.timezone('US/Eastern')
+    df_raw['Datetime_PT'] = pd.to_datetime(df_raw['Date'] + ' ' + df_raw['Time'])
+    df_raw['Datetime_ET'] = df_raw['Datetime_PT'].dt.tz_localize(pt_tz).dt.tz_convert(et_tz)
+    df_raw['Date'] = df_raw['Datetime_ET'].dt.date
+    df_raw['Day_of_Week'] = df_raw['Datetime_ET'].dt.day_name()
+    df_raw['Gross Sales'] = df_raw['Gross Sales'].replace(r'[\$,]', '', regex=True).astype(float)
+    df_raw['Qty'] = pd.to_numeric(df_raw['Qty'], errors='coerce').fillna(0)
+    return df_raw
+
+
+def year_of_line_items():
+    """One month of real line items shifted into each month of 2025"""
+    jan = pd.read_csv(data_path(SOURCE_EXPORT), dtype=str)
+    day = pd.to_datetime(jan['Date']).dt.day.clip(upper=28)
+    months = []
+    for m in range(1, 13):
+        part = jan.copy()
+        part['Date'] = [f'2025-{m:02d}-{d:02d}' for d in day]
+        months.append(part)
+    return pd.concat(months, ignore_index=True)
+
+
+def best_of(fn, raw, repeat):
+    times = []
+    for _ in range(repeat):
+        frame = raw.copy()
+        start = time.perf_counter()
+        result = fn(frame)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    raw = year_of_line_items()
+    legacy_s, legacy = best_of(legacy_process_sales, raw, args.repeat)
+    fast_s, fast = best_of(lambda df: normalize.normalize_sales(df, ['Gross Sales']), raw, args.repeat)
+    store_s, _ = best_of(sales_store.normalize_export, raw, args.repeat)
+
+    # Same instants, days and amounts
+    assert (legacy['Datetime_ET'].dt.tz_convert('UTC').to_numpy() == fast['Datetime_ET'].dt.tz_convert('UTC').to_numpy()).all()
+    assert (pd.to_datetime(legacy['Date']).to_numpy() == fast['Date'].to_numpy()).all()
+    assert np.allclose(legacy['Gross Sales'], fast['Gross Sales'])
+
+    print(f"Line items: {len(raw):,} (one synthetic year)")
+    print(f"{'Path':<28}{'Seconds':>10}{'Rows/sec':>14}")
+    print(f"{'legacy process_sales()':<28}{legacy_s:>10.3f}{len(raw) / legacy_s:>14,.0f}")
+    print(f"{'normalize_sales()':<28}{fast_s:>10.3f}{len(raw) / fast_s:>14,.0f}")
+    print(f"{'normalize_export() (store)':<28}{store_s:>10.3f}{len(raw) / store_s:>14,.0f}")
+    print(f"Speed-up (same columns): {legacy_s / fast_s:.1f}x")
@@ -0,0 +1,3 @@
+"""
+Demand models for the Bamboo Pho dashboard (kink search, fitting, scoring)
+"""
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Rolling-origin (walk-forward) backtest for the piecewise OLS demand model.
+
+Every operating day is forecast by a model fitted only on the days before
+it, then added to the fit. Instead of refitting from scratch, the
+coefficients are carried forward with recursive least squares: adding a day
+is a rank-one (Sherman-Morrison) update of (X'X)^-1, and with a sliding
+window the oldest day is removed with the matching rank-one downdate. A
+tiny ridge prior keeps the early, rank-deficient windows solvable (columns
+that are still all zero, e.g. a year dummy, stay at 0).
+
+The temperature kink is held at the given value (by default the production
+artifact's), so only the coefficients are re-estimated as the origin rolls.
+
+Usage:
+    python -m forecasting.backtest                 # expanding window
+    python -m forecasting.backtest --window 90     # sliding 90-day window
+"""
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from forecasting import features, scoring
+from pipeline import cache
+
+MIN_TRAIN_DAYS = 14
+RIDGE = 1e-4
+# Sliding windows re-solve the current window from scratch this often, so the
+# rounding error of repeated downdates cannot accumulate
+REFACTOR_EVERY = 28
+
+
+@dataclass
+class WalkForward:
+    """One-step-ahead forecasts for every day after the initial training window"""
+    predictions: pd.DataFrame   # Date, Actual, Predicted, Error, Abs_Pct_Error, alerts, Month, Day_Type
+    kink: float
+    window: int = None          # None = expanding
+
+    def accuracy(self, by=None):
+        return accuracy(self.predictions, by)
+
+
+def _rls_update(P, beta, x, y, sign=1.0):
+    """Add (sign=1) or remove (sign=-1) one observation from a least-squares fit"""
+    Px = P @ x
+    denom = sign + x @ Px
+    P = P - np.outer(Px, Px) / denom
+    beta = beta + sign * (P @ x) * (y - x @ beta)
+    return P, beta
+
+
+def walk_forward(df, kink_point, min_train=MIN_TRAIN_DAYS, window=None, target=features.TARGET):
+    """Forecast each day from the days before it (expanding, or a sliding window of N days)
+
+    df is a model frame (features.model_frame), sorted by date.
+    """
+    X = features.design_matrix(df, kink_point).to_numpy()
+    y = df[target].to_numpy(dtype=float)
+    n, k = X.shape
+    if n <= min_train:
+        raise ValueError(f"Need more than {min_train} operating days for a walk-forward backtest (have {n})")
+
+    def solve(lo, hi):
+        Xw = X[lo:hi]
+        P = np.linalg.inv(Xw.T @ Xw + RIDGE * np.eye(k))
+        return P, P @ Xw.T @ y[lo:hi]
+
+    # Initial fit on the first min_train days (the last `window` of them when sliding)
+    start = 0 if window is None else max(0, min_train - window)
+    P, beta = solve(start, min_train)
+
+    pred = np.empty(n - min_train)
+    for t in range(min_train, n):
+        pred[t - min_train] = X[t] @ beta
+        if window is not None and (t - min_train) % REFACTOR_EVERY == REFACTOR_EVERY - 1:
+            P, beta = solve(max(0, t + 1 - window), t + 1)
+            continue
+        P, beta = _rls_update(P, beta, X[t], y[t])
+        if window is not None and t >= window:
+            # Day t - window slides out of the window
+            P, beta = _rls_update(P, beta, X[t - window], y[t - window], -1.0)
+
+    return WalkForward(prediction_frame(df.iloc[min_train:], pred, target), float(kink_point), window)
+
+
+def prediction_frame(test, pred, target=features.TARGET):
+    """Date, Actual, Predicted, errors, alert levels, Month and Day_Type for forecast days"""
+    actual = test[target].to_numpy(dtype=float)
+    pred = np.maximum(0.0, pred)
+    return pd.DataFrame({
+        'Date': test['Date'].to_numpy(),
+        'Actual': actual,
+        'Predicted': pred,
+        'Error': actual - pred,
+        'Abs_Pct_Error': np.abs(actual - pred) / actual * 100,
+        'Alert_Actual': scoring.alert_levels(actual),
+        'Alert_Predicted': scoring.alert_levels(pred),
+        'Month': test['Date'].dt.strftime('%Y-%m').to_numpy(),
+        'Day_Type': features.day_type(test['is_weekend']),
+    })
+
+
+def accuracy(predictions, by=None):
+    """MAE, MAPE and capacity-alert hit rate, overall or grouped by a column (Month, Day_Type)
+
+    Alert hit rate = share of days whose actual sales crossed the warning level
+    (CAPACITY_WARNING) on which the forecast raised an alert too.
+    """
+    p = predictions.assign(
+        Abs_Error=predictions['Error'].abs(),
+        Alert_Day=predictions['Alert_Actual'] != 'ok',
+        Alert_Hit=(predictions['Alert_Actual'] != 'ok') & (predictions['Alert_Predicted'] != 'ok'),
+    )
+    keys = by if by is not None else np.zeros(len(p), dtype=int)
+    g = p.groupby(keys, sort=True)
+    out = pd.DataFrame({
+        'Days': g.size(),
+        'MAE': g['Abs_Error'].mean(),
+        'MAPE': g['Abs_Pct_Error'].mean(),
+        'Alert_Days': g['Alert_Day'].sum(),
+        'Alert_Hits': g['Alert_Hit'].sum(),
+    })
+    out['Alert_Hit_Rate'] = out['Alert_Hits'] / out['Alert_Days'].where(out['Alert_Days'] > 0)
+    return out if by is not None else out.reset_index(drop=True)
+
+
+def run(df, kink_point, min_train=MIN_TRAIN_DAYS, window=None, target=features.TARGET):
+    """walk_forward() through the shared cache, keyed on the training data"""
+    from forecasting import registry
+    key = f'backtest:{target}:{kink_point:g}:{min_train}:{window}'
+    return cache.get_or_build(key, registry.data_hash(df, target),
+                              lambda: walk_forward(df, kink_point, min_train, window, target))
+
+
+if __name__ == '__main__':
+    import time
+
+    from forecasting import registry
+    from pipeline import data
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the demand model")
+    parser.add_argument('--window', type=int, default=None, help="sliding window in operating days (default: expanding)")
+    parser.add_argument('--min-train', type=int, default=MIN_TRAIN_DAYS)
+    args = parser.parse_args()
+
+    df = features.model_frame(data.load_merged())
+    model = registry.load_or_fit(scoring.MODEL_NAME, df)
+    t0 = time.perf_counter()
+    wf = walk_forward(df, model.kink, args.min_train, args.window)
+    elapsed = time.perf_counter() - t0
+
+    pd.set_option('display.width', 120)
+    print(f"✓ Walk-forward over {len(wf.predictions)} days ({'expanding' if args.window is None else f'{args.window}-day sliding'} window, kink {model.kink:g}°F) in {elapsed:.3f}s")
+    print(wf.accuracy().round(2).to_string(index=False))
+    print("\nBy month:")
+    print(wf.accuracy('Month').round(2).to_string())
+    print("\nBy day type:")
+    print(wf.accuracy('Day_Type').round(2).to_string())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Walk-forward comparison of the model engines (forecasting/engines.py).
+
+Every engine is scored on the same folds: each operating day after the
+first MIN_TRAIN_DAYS is forecast by an engine fitted only on the days
+before it (expanding window, kink held at the production artifact's). The
+engines run in parallel, one per worker process, on a shared design matrix
+built once. Each returns its forecasts plus fit and predict wall time.
+The summary puts accuracy (MAE, MAPE, alert hit rate) next to the mean fit
+and predict latency per fold.
+
+Usage:
+    python -m forecasting.compare
+    python -m forecasting.compare --engines ols negbin --workers 2
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from forecasting import backtest, engines, features
+from pipeline import cache
+
+
+@dataclass
+class Comparison:
+    """Per-engine walk-forward forecasts and the accuracy / latency summary"""
+    summary: pd.DataFrame        # Engine -> Days, MAE, MAPE, Alert_Hit_Rate, Fit_ms, Predict_ms
+    predictions: dict            # engine name -> backtest.prediction_frame
+    kink: float
+
+
+def _walk(name, X, y, min_train):
+    """One engine over every fold: (name, forecasts, fit seconds, predict seconds)"""
+    pred = np.empty(len(y) - min_train)
+    fit_s = predict_s = 0.0
+    for t in range(min_train, len(y)):
+        t0 = time.perf_counter()
+        engine = engines.make_engine(name).fit(X[:t], y[:t])
+        t1 = time.perf_counter()
+        pred[t - min_train] = engine.predict(X[t:t + 1])[0]
+        fit_s += t1 - t0
+        predict_s += time.perf_counter() - t1
+    return name, pred, fit_s, predict_s
+
+
+def compare(df, kink_point, names=None, min_train=backtest.MIN_TRAIN_DAYS, workers=None, target=features.TARGET):
+    """Walk-forward forecasts for each engine, fitted in a process pool"""
+    names = list(names or engines.ENGINES)
+    X = features.design_matrix(df, kink_point).to_numpy()
+    y = df[target].to_numpy(dtype=float)
+    if len(y) <= min_train:
+        raise ValueError(f"Need more than {min_train} operating days to compare engines (have {len(y)})")
+
+    workers = workers or min(len(names), os.cpu_count() or 1)
+    args = (names, repeat(X), repeat(y), repeat(min_train))
+    if workers == 1:
+        results = list(map(_walk, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_walk, *args))
+
+    test = df.iloc[min_train:]
+    folds = len(test)
+    predictions, rows = {}, []
+    for name, pred, fit_s, predict_s in results:
+        predictions[name] = backtest.prediction_frame(test, pred, target)
+        acc = backtest.accuracy(predictions[name]).iloc[0]
+        rows.append({'Engine': name, 'Days': folds, 'MAE': acc['MAE'], 'MAPE': acc['MAPE'],
+                     'Alert_Hit_Rate': acc['Alert_Hit_Rate'],
+                     'Fit_ms': fit_s / folds * 1e3, 'Predict_ms': predict_s / folds * 1e3})
+    return Comparison(pd.DataFrame(rows).set_index('Engine'), predictions, float(kink_point))
+
+
+def run(df, kink_point, names=None, min_train=backtest.MIN_TRAIN_DAYS, workers=None):
+    """compare() through the shared cache, keyed on the training data"""
+    from forecasting import registry
+    names = tuple(names or engines.ENGINES)
+    key = f'compare:{kink_point:g}:{min_train}:{",".join(names)}'
+    return cache.get_or_build(key, registry.data_hash(df),
+                              lambda: compare(df, kink_point, names, min_train, workers))
+
+
+if __name__ == '__main__':
+    from forecasting import registry, scoring
+    from pipeline import data
+
+    parser = argparse.ArgumentParser(description="Compare model engines on walk-forward folds")
+    parser.add_argument('--engines', nargs='+', default=list(engines.ENGINES), choices=list(engines.ENGINES))
+    parser.add_argument('--min-train', type=int, default=backtest.MIN_TRAIN_DAYS)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per engine)")
+    args = parser.parse_args()
+
+    df = features.model_frame(data.load_merged())
+    model = registry.load_or_fit(scoring.MODEL_NAME, df)
+    t0 = time.perf_counter()
+    result = compare(df, model.kink, args.engines, args.min_train, args.workers)
+    elapsed = time.perf_counter() - t0
+
+    pd.set_option('display.width', 120)
+    print(f"✓ {len(args.engines)} engines × {len(df) - args.min_train} walk-forward folds (kink {model.kink:g}°F) in {elapsed:.2f}s")
+    print(result.summary.round(3).to_string())
@@ -0,0 +1,273 @@
+"""
+Interchangeable demand-model engines behind one fit / predict / diagnostics contract.
+
+Every engine takes the shared design matrix (features.design_matrix, in
+EXOG_NAMES order, as a DataFrame or array) and a bowl count:
+
+    engine = engines.make_engine('poisson').fit(X, y)
+    engine.predict(X_new)        # bowls, never negative
+    engine.diagnostics()         # dict: nobs, train_mae + engine-specific stats
+
+- ols      least squares, same specification as the production artifact
+- poisson  Poisson GLM (log link), so forecasts are positive by construction
+- negbin   negative-binomial GLM; the dispersion alpha is a moment estimate
+           from the Poisson fit
+- gbm      gradient-boosted regression trees in plain numpy. Splits are
+           found with one sort + cumulative sum per node, and the ensemble
+           is held as padded (trees × nodes) arrays, so predicting walks all
+           trees at once.
+
+The log-link engines are fitted by ridge-penalised IRLS (RIDGE_ALPHA on
+every coefficient but the constant), so a hinge slope fitted on a handful
+of days cannot reach several log-units per °F. Their forecasts go through
+bounded_exp. The temperature is held inside the range seen in training, so
+a warmer day is forecast as the warmest training day with its own weekend
+and precip effects. The result is also capped at MAX_RATIO × the largest
+training count. forecasting/items.py stores the same bounds per series.
+
+forecasting/compare.py scores them against each other on walk-forward folds.
+"""
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+from forecasting import features, kink
+
+# Floor for the negative-binomial dispersion (alpha -> 0 is the Poisson model)
+MIN_ALPHA = 1e-3
+# L2 penalty on the log-link coefficients (not the constant)
+RIDGE_ALPHA = 1.0
+IRLS_MAX_ITER = 100
+IRLS_TOL = 1e-8
+# Log-link forecasts never exceed this multiple of the largest training count
+MAX_RATIO = 1.5
+TEMP_COLUMNS = [features.EXOG_NAMES.index(c) for c in kink.HINGE_COLUMNS]
+
+
+def _array(X):
+    if isinstance(X, pd.DataFrame):
+        X = X[features.EXOG_NAMES]
+    return np.atleast_2d(np.asarray(X, dtype=float))
+
+
+def ridge_glm(X, y, family, alpha=RIDGE_ALPHA):
+    """Log-link GLM params maximising the log-likelihood minus alpha/2 ||params[1:]||^2 (IRLS)"""
+    penalty = np.diag(np.r_[0.0, np.full(X.shape[1] - 1, alpha)])
+    params = np.zeros(X.shape[1])
+    params[0] = np.log(max(y.mean(), 1e-3))
+    for _ in range(IRLS_MAX_ITER):
+        eta = X @ params
+        mu = np.exp(eta)
+        w = mu ** 2 / family.variance(mu)
+        z = eta + (y - mu) / mu
+        new = np.linalg.solve((X.T * w) @ X + penalty, (X.T * w) @ z)
+        done = np.max(np.abs(new - params)) < IRLS_TOL
+        params = new
+        if done:
+            break
+    return params
+
+
+def log_bounds(X, Y):
+    """Per-series cap plus the training range of the temperature columns (bounded_exp arguments)"""
+    Y = np.asarray(Y, dtype=float).reshape(len(X), -1)
+    temps = X[:, TEMP_COLUMNS]
+    return {'cap': MAX_RATIO * np.maximum(Y.max(axis=0), 1.0), 'temp_lo': temps.min(axis=0), 'temp_hi': temps.max(axis=0)}
+
+
+def clamp_temps(X, temp_lo, temp_hi):
+    """Design rows with the temperature held inside the training range
+
+    The hinge columns are monotone in the temperature, so clipping each to
+    its training range is the same as clamping Temp_High before the hinge.
+    """
+    X = np.array(np.atleast_2d(X), dtype=float)
+    X[:, TEMP_COLUMNS] = np.clip(X[:, TEMP_COLUMNS], temp_lo, temp_hi)
+    return X
+
+
+def bounded_exp(X, params, cap, temp_lo, temp_hi):
+    """Days × series exp(X @ params.T) at temperatures clamped to training, capped at cap"""
+    eta = clamp_temps(X, temp_lo, temp_hi) @ np.atleast_2d(params).T
+    return np.exp(np.minimum(eta, np.log(cap)))
+
+
+class Engine:
+    """Common contract: fit(X, y) -> self, predict(X) -> bowls >= 0, diagnostics() -> dict
+
+    Engines with a linear predictor set link ('identity' / 'log') and params,
+    so a batch of fits can be stored as one params matrix (forecasting/items.py).
+    """
+    name = None
+    link = None
+
+    def fit(self, X, y):
+        X, y = _array(X), np.asarray(y, dtype=float)
+        self._fit(X, y)
+        self.nobs = len(y)
+        self.train_mae = float(np.abs(y - self.predict(X)).mean())
+        return self
+
+    def predict(self, X):
+        return np.maximum(0.0, self._predict(_array(X)))
+
+    def diagnostics(self):
+        return {'nobs': self.nobs, 'train_mae': self.train_mae, **self._diagnostics()}
+
+    def _diagnostics(self):
+        return {}
+
+
+class OLSEngine(Engine):
+    """Least squares on the piecewise design"""
+    name = 'ols'
+    link = 'identity'
+
+    def _fit(self, X, y):
+        self.params, _, self.rank, _ = np.linalg.lstsq(X, y, rcond=None)
+        resid = y - X @ self.params
+        self.mse_resid = float(resid @ resid / max(len(y) - self.rank, 1))
+        self.rsquared = float(1 - resid @ resid / ((y - y.mean()) @ (y - y.mean())))
+
+    def _predict(self, X):
+        return X @ self.params
+
+    def _diagnostics(self):
+        return {'rsquared': self.rsquared, 'mse_resid': self.mse_resid, 'rank': int(self.rank)}
+
+
+class PoissonEngine(Engine):
+    """Poisson GLM with a log link (ridge-penalised, bounded forecasts)"""
+    name = 'poisson'
+    link = 'log'
+
+    def _family(self, X, y):
+        return sm.families.Poisson()
+
+    def _fit(self, X, y):
+        family = self._family(X, y)
+        # The penalty also keeps early folds (all-zero year dummies) solvable
+        self.params = ridge_glm(X, y, family)
+        self.bounds = log_bounds(X, y)
+        mu = np.exp(X @ self.params)
+        self.deviance = float(family.deviance(y, mu))
+        self.pearson_chi2 = float(np.sum((y - mu) ** 2 / family.variance(mu)))
+        self.df_resid = len(y) - np.linalg.matrix_rank(X)
+        self.aic = float(-2 * family.loglike(y, mu) + 2 * X.shape[1])
+
+    def _predict(self, X):
+        return bounded_exp(X, self.params, **self.bounds)[:, 0]
+
+    def _diagnostics(self):
+        return {'deviance': self.deviance, 'pearson_chi2': self.pearson_chi2,
+                'dispersion': float(self.pearson_chi2 / max(self.df_resid, 1)), 'aic': self.aic}
+
+
+class NegBinEngine(PoissonEngine):
+    """Negative-binomial GLM; alpha from the Poisson fit's excess variance"""
+    name = 'negbin'
+
+    def _family(self, X, y):
+        mu = np.exp(X @ ridge_glm(X, y, sm.families.Poisson()))
+        df_resid = len(y) - np.linalg.matrix_rank(X)
+        # Var(y) = mu + alpha mu^2
+        self.alpha = max(MIN_ALPHA, float(np.sum(((y - mu) ** 2 - y) / mu ** 2) / max(df_resid, 1)))
+        return sm.families.NegativeBinomial(alpha=self.alpha)
+
+    def _diagnostics(self):
+        return {**super()._diagnostics(), 'alpha': self.alpha}
+
+
+def _best_split(X, r, min_leaf):
+    """(feature, threshold, gain) of the squared-error split of r, or None"""
+    n = len(r)
+    order = np.argsort(X, axis=0, kind='stable')
+    xs = np.take_along_axis(X, order, axis=0)
+    left_sum = np.cumsum(r[order], axis=0)[:-1]
+    n_left = np.arange(1, n)[:, None]
+    total = r.sum()
+    score = left_sum ** 2 / n_left + (total - left_sum) ** 2 / (n - n_left)
+    valid = (xs[1:] > xs[:-1]) & (n_left >= min_leaf) & (n - n_left >= min_leaf)
+    score = np.where(valid, score, -np.inf)
+    i, f = np.unravel_index(np.argmax(score), score.shape)
+    gain = score[i, f] - total ** 2 / n
+    if not np.isfinite(score[i, f]) or gain <= 1e-12:
+        return None
+    return f, (xs[i, f] + xs[i + 1, f]) / 2, gain
+
+
+def _grow_tree(X, r, max_depth, min_leaf, tree, importance):
+    """Fill one row of the padded tree arrays (feature, threshold, left, right, value)"""
+    feature, threshold, left, right, value = tree
+    size = [0]
+
+    def node(idx, depth):
+        k = size[0]
+        size[0] += 1
+        value[k] = r[idx].mean()
+        split = _best_split(X[idx], r[idx], min_leaf) if depth < max_depth and len(idx) >= 2 * min_leaf else None
+        if split is not None:
+            f, t, gain = split
+            importance[f] += gain
+            go_left = X[idx, f] <= t
+            feature[k], threshold[k] = f, t
+            left[k] = node(idx[go_left], depth + 1)
+            right[k] = node(idx[~go_left], depth + 1)
+        return k
+
+    node(np.arange(len(r)), 0)
+
+
+class TreeEnsembleEngine(Engine):
+    """Gradient-boosted regression trees (squared error)"""
+    name = 'gbm'
+
+    def __init__(self, n_trees=150, learning_rate=0.1, max_depth=2, min_leaf=3):
+        self.n_trees, self.learning_rate, self.max_depth, self.min_leaf = n_trees, learning_rate, max_depth, min_leaf
+
+    def _fit(self, X, y):
+        T, M = self.n_trees, 2 ** (self.max_depth + 1) - 1
+        self.feature = np.full((T, M), -1)
+        self.threshold = np.zeros((T, M))
+        self.left = np.zeros((T, M), dtype=int)
+        self.right = np.zeros((T, M), dtype=int)
+        self.value = np.zeros((T, M))
+        self.importance = np.zeros(X.shape[1])
+        self.base = y.mean()
+
+        current = np.full(len(y), self.base)
+        for t in range(T):
+            tree = (self.feature[t], self.threshold[t], self.left[t], self.right[t], self.value[t])
+            _grow_tree(X, y - current, self.max_depth, self.min_leaf, tree, self.importance)
+            current = current + self.learning_rate * self.value[t][self._leaves(X, t)]
+
+    def _leaves(self, X, trees=slice(None)):
+        """Leaf index per (tree, row), walking every tree in lockstep"""
+        feature, threshold = np.atleast_2d(self.feature[trees]), np.atleast_2d(self.threshold[trees])
+        left, right = np.atleast_2d(self.left[trees]), np.atleast_2d(self.right[trees])
+        t = np.arange(len(feature))[:, None]
+        rows = np.arange(len(X))[None, :]
+        node = np.zeros((len(feature), len(X)), dtype=int)
+        for _ in range(self.max_depth):
+            f = feature[t, node]
+            x = X[rows, np.maximum(f, 0)]
+            node = np.where(f < 0, node, np.where(x <= threshold[t, node], left[t, node], right[t, node]))
+        return node if not isinstance(trees, int) else node[0]
+
+    def _predict(self, X):
+        node = self._leaves(X)
+        return self.base + self.learning_rate * self.value[np.arange(self.n_trees)[:, None], node].sum(axis=0)
+
+    def _diagnostics(self):
+        share = self.importance / self.importance.sum() if self.importance.sum() > 0 else self.importance
+        return {'trees': self.n_trees, 'importance': dict(zip(features.EXOG_NAMES, share.round(3).tolist()))}
+
+
+ENGINES = {e.name: e for e in (OLSEngine, PoissonEngine, NegBinEngine, TreeEnsembleEngine)}
+
+
+def make_engine(name, **params):
+    """Unfitted engine by name (see ENGINES)"""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}' (choose from {', '.join(ENGINES)})")
+    return ENGINES[name](**params)
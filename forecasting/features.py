@@ -0,0 +1,56 @@
+"""
+Model frame and design matrix shared by every page and engine
+"""
+import numpy as np
+import pandas as pd
+
+from forecasting import kink
+from pipeline import calendar_features
+
+TARGET = 'Bowls_Sold'
+# Alternative target: net sales in constant CPI dollars (pipeline/cpi.py)
+REVENUE_TARGET = 'Real_Net_Sales'
+RAIN_TYPES = ['Rain', 'Mixed', 'Rainy']
+SNOW_TYPES = ['Snow', 'Flurries', 'Heavy Snow']
+
+# Regressors besides the two temperature hinge columns
+KINK_VARS = ['is_weekend', 'is_rain', 'is_snow', 'is_federal_payday', 'is_payday_weekend',
+             'is_2024', 'is_2025', 'season_impact']
+MODEL_FEATURES = kink.HINGE_COLUMNS + KINK_VARS
+EXOG_NAMES = ['const'] + MODEL_FEATURES
+
+# Day types used for reporting and intraday profiles (is_weekend = Fri/Sat/Sun)
+DAY_TYPES = ['Midweek (Tue-Thu)', 'Weekend (Fri-Sun)']
+
+
+def precip_flags(precip_type):
+    """(is_rain, is_snow) 0/1 arrays for Precip_Type values"""
+    precip_type = np.asarray(precip_type, dtype=object)
+    return np.isin(precip_type, RAIN_TYPES).astype(int), np.isin(precip_type, SNOW_TYPES).astype(int)
+
+
+def day_type(is_weekend):
+    """DAY_TYPES label for each is_weekend flag"""
+    return np.asarray(DAY_TYPES, dtype=object)[np.asarray(is_weekend, dtype=int)]
+
+
+def model_frame(merged):
+    """Operating days with every model feature, sorted by date
+
+    Mondays (closed), zero-sales days and days without a temperature are
+    excluded.
+    """
+    df = merged[(merged['Day_of_Week'] != 'Monday') & (merged[TARGET] > 0)].dropna(subset=['Temp_High'])
+    df = calendar_features.add_calendar_features(df)
+    df['is_clear'] = df['Precip_Type'].isin(['None', 'Clear']).astype(int)
+    df['is_rain'], df['is_snow'] = precip_flags(df['Precip_Type'])
+    return df.sort_values('Date').reset_index(drop=True)
+
+
+def design_matrix(df, kink_point):
+    """const + hinge(Temp_High, kink) + KINK_VARS, in EXOG_NAMES order"""
+    X = pd.DataFrame({'const': np.ones(len(df))}, index=df.index)
+    X['temp_cold'], X['temp_hot'] = kink.hinge(df['Temp_High'], kink_point)
+    for col in KINK_VARS:
+        X[col] = df[col].astype(float)
+    return X
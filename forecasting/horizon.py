@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Multi-day forecast horizon and batched weather scenarios.
+
+A 7-14 day weather forecast (Date, Temp_High, Precip_Type), from a local
+CSV or a JSON feed, is scored as one design matrix. Weekend, payday
+and season regressors come from the dates via the cached calendar table.
+Holiday and event flags are attached for display.
+
+Scenario sweeps expand every forecast day into days × temperature offsets ×
+precip scenarios with np.repeat / np.tile and score the whole grid in one
+call. A ±10°F sweep over 14 days and 4 precip cases is about 1,200 rows
+and takes a few milliseconds, so moving a slider never waits on a refit.
+Each day also gets P10/P50/P90 bowls and P(over the seating limit).
+Mondays (closed) are dropped from the forecast.
+
+Usage:
+    python -m forecasting.horizon weather_forecast.csv
+    python -m forecasting.horizon weather_forecast.csv --sweep 5 --precip None Rain Snow
+    python -m forecasting.horizon http://127.0.0.1:9000/forecast.json
+"""
+import argparse
+import json
+import sys
+from urllib.request import urlopen
+
+import numpy as np
+import pandas as pd
+
+from forecasting import features, intervals, scoring
+from pipeline import calendar_features, weather
+
+FORECAST_FILE = 'weather_forecast.csv'
+MAX_DAYS = 14
+AS_FORECAST = 'As forecast'
+PRECIP_SCENARIOS = [AS_FORECAST, 'None', 'Rain', 'Snow']
+EVENT_FLAGS = {'is_pre_holiday': 'Pre-holiday', 'is_post_holiday': 'Post-holiday',
+               'is_valentines_period': "Valentine's", 'is_lunar_new_year': 'Lunar New Year',
+               'is_federal_payday': 'Payday'}
+
+
+def read_forecast(source):
+    """Date, Temp_High, Precip_Type for up to MAX_DAYS open days from a CSV path/buffer or a JSON feed URL
+
+    JSON feeds use the scoring server's shape: {"date": [...], "temp_high":
+    [...], "precip_type": [...]} or {"rows": [{...}, ...]}.
+    """
+    if isinstance(source, str) and source.startswith(('http://', 'https://')):
+        with urlopen(source, timeout=10) as response:
+            dates, temps, precip = scoring._rows_to_columns(json.load(response))
+        raw = pd.DataFrame({'Date': dates, 'Temp_High': temps, 'Precip_Type': precip})
+    else:
+        raw = pd.read_csv(source, dtype=str, keep_default_na=False, na_values=weather.NA_VALUES)
+        raw.columns = raw.columns.str.strip().str.replace(' ', '_')
+    forecast = pd.DataFrame({
+        'Date': pd.to_datetime(raw['Date']).dt.normalize(),
+        'Temp_High': pd.to_numeric(raw['Temp_High'].astype(str).str.replace('°F', '', regex=False), errors='coerce'),
+        'Precip_Type': weather.normalize_precip(raw['Precip_Type'] if 'Precip_Type' in raw else None),
+    })
+    forecast['Precip_Type'] = forecast['Precip_Type'].fillna('None').astype(str)
+    forecast = forecast.dropna(subset=['Temp_High']).drop_duplicates('Date', keep='last').sort_values('Date')
+    forecast = forecast[forecast['Date'].dt.dayofweek != 0]   # closed Mondays
+    return forecast.head(MAX_DAYS).reset_index(drop=True)
+
+
+def _events(dates):
+    """Comma-joined event labels per date (holidays, paydays)"""
+    table = calendar_features.calendar_table(dates.min(), dates.max()).reindex(dates)
+    labels = np.full(len(dates), '', dtype=object)
+    for flag, label in EVENT_FLAGS.items():
+        on = table[flag].to_numpy() == 1
+        labels[on] = np.where(labels[on] == '', label, labels[on] + ', ' + label)
+    return labels
+
+
+def forecast_horizon(forecast, model=None, draws=None):
+    """Forecast frame with Day, Day_Type, Events, Predicted_Bowls, Alert and P10/P50/P90 per day
+
+    Intervals come from the bootstrap draws when given, else from the OLS
+    covariance (forecasting/intervals.py).
+    """
+    model = model or scoring.load_model()
+    dates = pd.DatetimeIndex(forecast['Date'])
+    X = scoring.scenario_matrix(dates.to_numpy(), forecast['Temp_High'], forecast['Precip_Type'], model)
+    bowls = np.maximum(0.0, model.predict(X))
+    is_weekend = calendar_features.calendar_table(dates.min(), dates.max()).reindex(dates)['is_weekend'].to_numpy()
+    spread = intervals.interval_frame(model, X, draws).set_index(forecast.index)
+    return forecast.assign(
+        Day=dates.strftime('%a %b %d'),
+        Day_Type=features.day_type(is_weekend),
+        Events=_events(dates),
+        Predicted_Bowls=bowls.round(1),
+        Alert=scoring.alert_levels(bowls),
+        P10=spread['P10'].round(1), P50=spread['P50'].round(1), P90=spread['P90'].round(1),
+        P_Over_Capacity=spread['P_Over_Capacity'].round(3), Risk=spread['Risk'],
+    )
+
+
+def scenario_grid(forecast, sweep=5, step=1, precip=PRECIP_SCENARIOS, model=None):
+    """Long frame of every day × temperature offset (±sweep °F) × precip scenario, scored in one call"""
+    model = model or scoring.load_model()
+    offsets = np.arange(-sweep, sweep + 1, step) if sweep else np.zeros(1)
+    precip = np.asarray(list(precip), dtype=object)
+    n, t, p = len(forecast), len(offsets), len(precip)
+
+    dates = np.repeat(forecast['Date'].to_numpy(), t * p)
+    offset = np.tile(np.repeat(offsets, p), n)
+    scenario = np.tile(precip, n * t)
+    kind = np.where(scenario == AS_FORECAST, np.repeat(forecast['Precip_Type'].to_numpy(dtype=object), t * p), scenario)
+    temps = np.repeat(forecast['Temp_High'].to_numpy(dtype=float), t * p) + offset
+
+    result = scoring.score(dates, temps, kind, model)
+    return pd.DataFrame({
+        'Date': dates, 'Temp_Offset': offset, 'Precip_Scenario': scenario, 'Temp_High': temps,
+        'Precip_Type': kind, 'Predicted_Bowls': result['bowls'].round(1), 'Alert': result['alert'],
+    })
+
+
+def scenario_spread(grid):
+    """Per day: Low / High bowls across the grid and the share of scenarios at each alert level"""
+    g = grid.groupby('Date')
+    out = pd.DataFrame({'Low': g['Predicted_Bowls'].min(), 'High': g['Predicted_Bowls'].max()})
+    shares = pd.crosstab(grid['Date'], grid['Alert'], normalize='index')
+    for level in scoring.ALERT_LEVELS:
+        out[f'Share_{level}'] = shares[level] if level in shares else 0.0
+    return out.reset_index()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score a 7-14 day weather forecast (and scenario sweeps)")
+    parser.add_argument('source', nargs='?', default='-', help="forecast CSV, '-' for stdin, or a JSON feed URL")
+    parser.add_argument('--sweep', type=int, default=0, help="also sweep the forecast high ±N °F")
+    parser.add_argument('--precip', nargs='+', default=PRECIP_SCENARIOS, help="precip scenarios for the sweep")
+    args = parser.parse_args()
+
+    forecast = read_forecast(sys.stdin if args.source == '-' else args.source)
+    model = scoring.load_model()
+    if args.sweep:
+        scenario_grid(forecast, args.sweep, precip=args.precip, model=model).to_csv(sys.stdout, index=False)
+    else:
+        forecast_horizon(forecast, model).to_csv(sys.stdout, index=False)
@@ -0,0 +1,114 @@
+"""
+Prediction intervals and probabilistic capacity alerts.
+
+Two engines give P10/P50/P90 bowls and P(demand > CAPACITY_LIMIT) for any
+number of design rows at once.
+
+Analytic: the OLS predictive distribution. Its variance is x'Σx (parameter
+covariance) plus the residual variance, and it is t-distributed with the
+model's residual degrees of freedom. One einsum over the rows.
+
+Bootstrap: a residual bootstrap. Training residuals are resampled into an
+n × B matrix, and every refit is a single product, β* = β + pinv(X) E*.
+Each draw also carries one resampled residual as the new day's noise. The
+B parameter draws and noise terms are computed once per model artifact and
+saved next to it (models/<name>/<hash>.boot.npz). A slider move or a
+scenario grid is then one (rows × p) @ (p × B) product plus quantiles.
+"""
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from forecasting import features, registry, scoring
+from pipeline import cache
+
+QUANTILES = (0.1, 0.5, 0.9)
+N_DRAWS = 2000
+SEED = 0
+# P(over the seating limit) at which the dashboard warns / raises a capacity alert
+RISK_WARNING = 0.2
+RISK_ALERT = 0.5
+
+
+@dataclass
+class BootstrapDraws:
+    """Precomputed residual-bootstrap parameter draws (B × p) and new-day noise (B)"""
+    data_hash: str
+    params: np.ndarray
+    noise: np.ndarray
+
+    def predictive(self, X):
+        """Rows × B matrix of simulated demand"""
+        return np.asarray(X, dtype=float) @ self.params.T + self.noise[None, :]
+
+
+def analytic(model, X, quantiles=QUANTILES, limit=scoring.CAPACITY_LIMIT):
+    """{'p10', 'p50', 'p90', 'p_capacity'} from the OLS covariance and residual variance"""
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    mean = model.predict(X)
+    se = np.sqrt(np.einsum('ij,jk,ik->i', X, model.cov.to_numpy(), X) + model.mse_resid)
+    out = {f'p{round(q * 100)}': np.maximum(0.0, mean + stats.t.ppf(q, model.df_resid) * se) for q in quantiles}
+    out['p_capacity'] = stats.t.sf((limit - mean) / se, model.df_resid)
+    return out
+
+
+def bootstrap(model, df, n_draws=N_DRAWS, seed=SEED, target=features.TARGET):
+    """Residual-bootstrap draws for a fitted model and its training frame"""
+    X = features.design_matrix(df, model.kink)[model.exog_names].to_numpy(dtype=float)
+    y = df[target].to_numpy(dtype=float)
+    resid = y - X @ model.params.to_numpy()
+    n, p = X.shape
+    # Centered and inflated for the degrees of freedom the fit used up
+    resid = (resid - resid.mean()) * np.sqrt(n / max(n - p, 1))
+
+    rng = np.random.default_rng(seed)
+    samples = resid[rng.integers(0, n, size=(n, n_draws))]
+    params = model.params.to_numpy()[None, :] + (np.linalg.pinv(X) @ samples).T
+    noise = resid[rng.integers(0, n, size=n_draws)]
+    return BootstrapDraws(model.data_hash, params, noise)
+
+
+def draws_path(model, model_dir=registry.MODEL_DIR):
+    return os.path.join(model_dir, model.name, f'{model.data_hash}.boot.npz')
+
+
+def load_or_bootstrap(model, df, n_draws=N_DRAWS, model_dir=registry.MODEL_DIR):
+    """Bootstrap draws for model (process cache, then disk, then computed and saved)"""
+    path = draws_path(model, model_dir)
+
+    def build():
+        if os.path.exists(path):
+            saved = np.load(path)
+            if saved['params'].shape[0] == n_draws:
+                return BootstrapDraws(model.data_hash, saved['params'], saved['noise'])
+        draws = bootstrap(model, df, n_draws)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(path + '.tmp.npz', params=draws.params, noise=draws.noise)
+        os.replace(path + '.tmp.npz', path)
+        return draws
+
+    return cache.get_or_build(f'bootstrap:{model.name}', (model.data_hash, n_draws), build)
+
+
+def from_draws(draws, X, quantiles=QUANTILES, limit=scoring.CAPACITY_LIMIT):
+    """{'p10', 'p50', 'p90', 'p_capacity'} from bootstrap draws"""
+    sims = draws.predictive(np.atleast_2d(X))
+    out = {f'p{round(q * 100)}': v for q, v in zip(quantiles, np.maximum(0.0, np.quantile(sims, quantiles, axis=1)))}
+    out['p_capacity'] = (sims > limit).mean(axis=1)
+    return out
+
+
+def risk_levels(p_capacity):
+    """'ok' / 'warning' / 'capacity' from P(over the seating limit)"""
+    p = np.asarray(p_capacity, dtype=float)
+    return scoring.ALERT_LEVELS[(p >= RISK_WARNING).astype(int) + (p >= RISK_ALERT)]
+
+
+def interval_frame(model, X, draws=None):
+    """P10 / P50 / P90 / P_Over_Capacity / Risk per row (bootstrap when draws are given)"""
+    out = from_draws(draws, X) if draws is not None else analytic(model, X)
+    return pd.DataFrame({'P10': out['p10'], 'P50': out['p50'], 'P90': out['p90'],
+                         'P_Over_Capacity': out['p_capacity'], 'Risk': risk_levels(out['p_capacity'])})
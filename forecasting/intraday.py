@@ -0,0 +1,125 @@
+"""
+Intraday (15-minute) demand curves and slot-level forecasts.
+
+Line items are bucketed by their ticket's first timestamp into 15-minute
+slots with one np.bincount over (day, slot) indices, giving a days × 96 slot
+matrix of pho bowls (or tickets). Averaging the matrix per day type gives the
+share of a day's bowls that lands in each slot; a daily forecast (scoring.py
+or the OLS artifact) is spread over the slots through that profile. Seats in
+use are estimated from dine-in arrivals only: a second profile holds the
+'For Here' bowls per slot as a share of the day's bowls (a line without a
+Dining Option takes its ticket's), and each of those bowls holds a seat
+for an average stay. Slots are flagged against the dining-room seat count
+(SEATS).
+"""
+import numpy as np
+import pandas as pd
+
+from forecasting import features
+from pipeline import baskets, cache, calendar_features
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+# Average dine-in stay used to turn arrivals into seats in use
+DWELL_MINUTES = 45
+DINE_IN = 'For Here'
+# Dining-room seats, the concurrent limit for Seats_In_Use (the dashboard's documented 80-seat capacity)
+SEATS = 80
+
+
+def slot_labels():
+    minutes = np.arange(SLOTS_PER_DAY) * SLOT_MINUTES
+    return [f'{m // 60:02d}:{m % 60:02d}' for m in minutes]
+
+
+def bucket(datetimes, transaction_ids, weights=None):
+    """Days × slots matrix of weights binned by each ticket's first (local) timestamp
+
+    weights=None counts tickets. Line items without a Transaction ID are
+    treated as their own ticket.
+    """
+    wall = pd.DatetimeIndex(datetimes).tz_localize(None).as_unit('s').asi8 // 60   # wall-clock minutes
+    codes, _ = baskets.ticket_codes(transaction_ids)
+    first = pd.Series(wall).groupby(codes).transform('min').to_numpy()
+
+    day = first // (24 * 60)
+    slot = (first % (24 * 60)) // SLOT_MINUTES
+    day0 = day.min()
+    if weights is None:
+        # One count per ticket (its first line item)
+        weights = np.zeros(len(codes))
+        weights[np.unique(codes, return_index=True)[1]] = 1.0
+    flat = (day - day0) * SLOTS_PER_DAY + slot
+    n_days = int(day.max() - day0 + 1)
+    counts = np.bincount(flat, weights=np.asarray(weights, dtype=float), minlength=n_days * SLOTS_PER_DAY)
+    dates = pd.to_datetime(day0 + np.arange(n_days), unit='D')
+    return pd.DataFrame(counts.reshape(n_days, SLOTS_PER_DAY), index=pd.DatetimeIndex(dates, name='Date'),
+                        columns=slot_labels())
+
+
+def demand_profile(slots, base=None):
+    """Share of a day's demand per slot for each day type (columns sum to 1)
+
+    With base (e.g. all bowls, for dine-in slots), shares are of base's
+    daily total instead, so columns sum to slots' share of base.
+    """
+    base = slots if base is None else base.reindex(slots.index, fill_value=0.0)
+    is_weekend = calendar_features.add_calendar_features(
+        pd.DataFrame({'Date': slots.index}), columns=['is_weekend'])['is_weekend'].to_numpy()
+    day_types = features.day_type(is_weekend)
+    totals = slots.groupby(day_types).sum().T
+    return (totals / base.groupby(day_types).sum().T.sum()).reindex(columns=features.DAY_TYPES).fillna(0.0)
+
+
+def forecast_slots(daily_bowls, day_type, profile, seat_profile=None, seats=SEATS):
+    """Expected bowls and seats in use per slot for a daily forecast (Over_Capacity: more than seats)
+
+    seat_profile gives the dine-in share per slot (default: every bowl is dine-in).
+    """
+    bowls = float(daily_bowls) * profile[day_type].to_numpy()
+    dine_in = bowls if seat_profile is None else float(daily_bowls) * seat_profile[day_type].to_numpy()
+    dwell = DWELL_MINUTES // SLOT_MINUTES
+    in_use = np.convolve(dine_in, np.ones(dwell))[:SLOTS_PER_DAY]
+    out = pd.DataFrame({'Slot': profile.index, 'Bowls': bowls, 'Seats_In_Use': in_use})
+    out['Over_Capacity'] = out['Seats_In_Use'] > seats
+    return out
+
+
+def open_slots(profile):
+    """Slots between the first and last slot with any demand"""
+    active = np.flatnonzero(profile.to_numpy().sum(axis=1) > 0)
+    return profile.index[active.min():active.max() + 1] if len(active) else profile.index[:0]
+
+
+def dine_in_lines(transaction_ids, dining_option):
+    """Boolean per line item: the line (or, if unlabelled, its ticket) is For Here"""
+    option = pd.Series(dining_option, dtype=object).reset_index(drop=True)
+    ticket = option.groupby(baskets.ticket_codes(transaction_ids)[0]).transform('first')
+    return ticket.where(option.isna(), option).eq(DINE_IN).to_numpy()
+
+
+def load_slots(dine_in=False):
+    """Pho bowls per (day, 15-minute slot) from the sales store (For Here bowls only with dine_in)"""
+    from pipeline import data, menu
+
+    def build():
+        sales = data.load_sales(['Datetime_ET', 'Transaction ID', 'Item', 'Qty', 'Dining Option'])
+        keep = np.isin(sales['Item'].cat.codes, menu.codes_for(data.load_menu(), 'Family', ['pho']))
+        if dine_in:
+            keep = keep & dine_in_lines(sales['Transaction ID'], sales['Dining Option'])
+        return bucket(sales['Datetime_ET'], sales['Transaction ID'], sales['Qty'].to_numpy() * keep)
+
+    return cache.get_or_build(f'intraday_slots:{dine_in}', data.sync_sales(), build)
+
+
+def load_profile():
+    """Per-day-type 15-minute demand profile (cached with the sales store)"""
+    from pipeline import data
+    return cache.get_or_build('intraday_profile', data.sync_sales(), lambda: demand_profile(load_slots()))
+
+
+def load_seat_profile():
+    """Per-day-type For Here bowls per slot as a share of the day's bowls (forecast_slots seat_profile)"""
+    from pipeline import data
+    return cache.get_or_build('intraday_seat_profile', data.sync_sales(),
+                              lambda: demand_profile(load_slots(dine_in=True), load_slots()))
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Per-item demand models for the whole menu.
+
+The daily cube is rolled up once into an operating-days × series quantity
+matrix at one level:
+- Item: each menu item by trimmed name, voided lines excluded;
+- Category;
+- Family: the product families in pipeline/menu.py.
+
+Every series shares the aggregate model's design matrix (calendar +
+weather + kink), which is built once. Series are split into chunks, and
+each worker process fits one engine per series (forecasting/engines.py,
+any engine with a linear predictor).
+
+The fits are kept as one array-backed artifact: a series × exog params
+matrix, the link, and per-series train MAE and mean daily quantity. It is
+saved as models/items_<level>/<hash>.npz and keyed like the aggregate
+artifact, so forecasting the whole menu for any set of days is a single
+(days × p) @ (p × series) product. Series sold fewer than MIN_TOTAL_QTY
+times in the training window are left out.
+
+Forecasts are bounded like the engines'. The artifact keeps the training
+temperature range, and a warmer or colder day is forecast at the nearest
+training temperature (engines.clamp_temps) with its own calendar and
+precip effects. Log-link forecasts are also capped at a multiple of the
+series' largest daily quantity (engines.bounded_exp).
+
+Usage:
+    python -m forecasting.items                                  # per item, Poisson
+    python -m forecasting.items --level Family --engine ols
+    python -m forecasting.items --forecast weather_forecast.csv   # menu forecast per day
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from forecasting import engines, features, registry, scoring
+from pipeline import cache
+
+LEVELS = ['Item', 'Category', 'Family']
+DEFAULT_ENGINE = 'poisson'
+MIN_TOTAL_QTY = 10
+# Families that are not dishes (bags, extras) are never modelled
+SKIP_FAMILIES = ['packaging', 'extra']
+CHUNKS_PER_WORKER = 4
+
+
+@dataclass
+class ItemModels:
+    """One linear-predictor model per series, stacked into a params matrix"""
+    level: str
+    engine: str
+    link: str
+    data_hash: str
+    kink: float
+    exog_names: list
+    series: np.ndarray      # series labels (S)
+    params: np.ndarray      # S × p
+    train_mae: np.ndarray   # S
+    mean_qty: np.ndarray    # S, mean per operating day
+    cap: np.ndarray         # S, largest log-link forecast
+    temp_lo: np.ndarray     # training range of the temperature columns (engines.TEMP_COLUMNS)
+    temp_hi: np.ndarray
+    nobs: int
+
+    def predict(self, X):
+        """Days × series quantities for design rows in exog_names order"""
+        if self.link == 'log':
+            return engines.bounded_exp(X, self.params, self.cap, self.temp_lo, self.temp_hi)
+        return np.maximum(0.0, engines.clamp_temps(X, self.temp_lo, self.temp_hi) @ self.params.T)
+
+    def summary(self):
+        return pd.DataFrame({'Mean_Qty': self.mean_qty, 'Train_MAE': self.train_mae},
+                            index=pd.Index(self.series, name=self.level))
+
+
+def series_matrix(cells, taxonomy, dates, level='Item'):
+    """Operating days (dates) × series quantity matrix rolled up from the cube"""
+    codes = cells['Item'].cat.codes.to_numpy()
+    labels = taxonomy[{'Item': 'Item_Name'}.get(level, level)].fillna('Unknown')
+    keep = ~taxonomy['Is_Voided'] & ~taxonomy['Family'].isin(SKIP_FAMILIES)
+    lines = pd.DataFrame({'Date': cells['Date'].to_numpy(), 'Series': labels.to_numpy()[codes],
+                          'Qty': cells['Qty'].to_numpy()})[keep.to_numpy()[codes]]
+    Y = lines.pivot_table(index='Date', columns='Series', values='Qty', aggfunc='sum', fill_value=0.0)
+    Y = Y.reindex(pd.DatetimeIndex(dates), fill_value=0.0)
+    return Y.loc[:, Y.sum() >= MIN_TOTAL_QTY].astype(float)
+
+
+def items_hash(X, Y, level, engine):
+    h = hashlib.sha256()
+    h.update(json.dumps({'version': registry.ARTIFACT_VERSION, 'level': level, 'engine': engine,
+                         'series': Y.columns.tolist(), 'exog': list(X.columns)}).encode())
+    h.update(np.ascontiguousarray(X.to_numpy(dtype=float)).tobytes())
+    h.update(np.ascontiguousarray(Y.to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()[:16]
+
+
+def _fit_chunk(engine, X, Y):
+    """Params (S × p) and train MAE (S) for a block of series columns (runs in a worker)"""
+    params, mae = np.empty((Y.shape[1], X.shape[1])), np.empty(Y.shape[1])
+    for j in range(Y.shape[1]):
+        fitted = engines.make_engine(engine).fit(X, Y[:, j])
+        params[j], mae[j] = fitted.params, fitted.train_mae
+    return params, mae
+
+
+def fit(df, kink_point, cells, taxonomy, level='Item', engine=DEFAULT_ENGINE, workers=None):
+    """ItemModels for every series at level, fitted in a process pool"""
+    if level not in LEVELS:
+        raise ValueError(f"Unknown level '{level}' (choose from {', '.join(LEVELS)})")
+    link = engines.ENGINES[engine].link
+    if link is None:
+        raise ValueError(f"Engine '{engine}' has no linear predictor; per-item models need one of "
+                         f"{', '.join(n for n, e in engines.ENGINES.items() if e.link)}")
+    Xf = features.design_matrix(df, kink_point)
+    Y = series_matrix(cells, taxonomy, df['Date'], level)
+    X, Yv = Xf.to_numpy(), Y.to_numpy()
+
+    workers = workers or os.cpu_count() or 1
+    blocks = [b for b in np.array_split(np.arange(Yv.shape[1]), workers * CHUNKS_PER_WORKER) if len(b)]
+    args = (repeat(engine), repeat(X), [Yv[:, b] for b in blocks])
+    if workers == 1:
+        results = list(map(_fit_chunk, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_fit_chunk, *args))
+
+    bounds = engines.log_bounds(X, Yv)
+    return ItemModels(
+        level=level, engine=engine, link=link, data_hash=items_hash(Xf, Y, level, engine),
+        kink=float(kink_point), exog_names=list(Xf.columns),
+        series=Y.columns.to_numpy(dtype=str),
+        params=np.vstack([r[0] for r in results]), train_mae=np.concatenate([r[1] for r in results]),
+        mean_qty=Yv.mean(axis=0), cap=bounds['cap'], temp_lo=bounds['temp_lo'], temp_hi=bounds['temp_hi'],
+        nobs=len(Yv),
+    )
+
+
+def artifact_path(level, digest, model_dir=registry.MODEL_DIR):
+    return os.path.join(model_dir, f'items_{level.lower()}', f'{digest}.npz')
+
+
+def save(models, model_dir=registry.MODEL_DIR):
+    path = artifact_path(models.level, models.data_hash, model_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    meta = {k: getattr(models, k) for k in ('level', 'engine', 'link', 'data_hash', 'kink', 'exog_names', 'nobs')}
+    np.savez(path + '.tmp.npz', meta=json.dumps(meta), series=models.series, params=models.params,
+             train_mae=models.train_mae, mean_qty=models.mean_qty, cap=models.cap,
+             temp_lo=models.temp_lo, temp_hi=models.temp_hi)
+    os.replace(path + '.tmp.npz', path)
+    return path
+
+
+def load(path):
+    with np.load(path) as saved:
+        return ItemModels(**json.loads(str(saved['meta'])),
+                          **{k: saved[k] for k in ('series', 'params', 'train_mae', 'mean_qty', 'cap',
+                                                   'temp_lo', 'temp_hi')})
+
+
+def load_or_fit(df, kink_point, cells, taxonomy, level='Item', engine=DEFAULT_ENGINE,
+                model_dir=registry.MODEL_DIR, workers=None):
+    """Stored per-series models for exactly this data, fitting (and saving) them if missing"""
+    Xf = features.design_matrix(df, kink_point)
+    digest = items_hash(Xf, series_matrix(cells, taxonomy, df['Date'], level), level, engine)
+
+    def build():
+        path = artifact_path(level, digest, model_dir)
+        if os.path.exists(path):
+            return load(path)
+        models = fit(df, kink_point, cells, taxonomy, level, engine, workers)
+        save(models, model_dir)
+        return models
+
+    return cache.get_or_build(f'items:{level}:{engine}', digest, build)
+
+
+def forecast_menu(forecast, models):
+    """Long frame Date × series -> Predicted_Qty for a weather forecast (Date, Temp_High, Precip_Type)"""
+    dates = pd.DatetimeIndex(forecast['Date'])
+    X = scoring.scenario_matrix(dates.to_numpy(), forecast['Temp_High'], forecast['Precip_Type'], models)
+    qty = pd.DataFrame(models.predict(X), index=pd.Index(dates, name='Date'),
+                       columns=pd.Index(models.series, name=models.level))
+    return qty.stack().rename('Predicted_Qty').reset_index()
+
+
+if __name__ == '__main__':
+    from forecasting import horizon
+    from pipeline import data
+
+    parser = argparse.ArgumentParser(description="Fit one demand model per menu item / category / family")
+    parser.add_argument('--level', default='Item', choices=LEVELS)
+    parser.add_argument('--engine', default=DEFAULT_ENGINE, choices=[n for n, e in engines.ENGINES.items() if e.link])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--forecast', help="weather forecast CSV (or JSON feed URL) to forecast the menu for")
+    args = parser.parse_args()
+
+    df = features.model_frame(data.load_merged())
+    model = registry.load_or_fit(scoring.MODEL_NAME, df)
+    cells, taxonomy = data.load_cube(), data.load_menu()
+    t0 = time.perf_counter()
+    models = fit(df, model.kink, cells, taxonomy, args.level, args.engine, args.workers)
+    elapsed = time.perf_counter() - t0
+    save(models)
+
+    pd.set_option('display.width', 120)
+    print(f"✓ {len(models.series)} {args.level.lower()} models ({args.engine}, {models.nobs} days) in {elapsed:.2f}s")
+    if args.forecast:
+        menu_qty = forecast_menu(horizon.read_forecast(args.forecast), models)
+        menu_qty.pivot(index=models.level, columns='Date', values='Predicted_Qty').round(1).to_csv(sys.stdout)
+    else:
+        print(models.summary().sort_values('Mean_Qty', ascending=False).round(2).to_string())
@@ -0,0 +1,161 @@
+"""
+Batched OLS search for the piecewise temperature kink.
+
+Demand follows a "hockey stick" in Temp_High: temp_cold = min(T, kink) and
+temp_hot = max(0, T - kink). Every candidate kink shares the same design
+matrix except those two hinge columns, so the cross-products of the shared
+columns are computed once and only the hinge blocks change per kink. All
+candidates are then solved together as one stacked least-squares problem
+(pseudo-inverse, like statsmodels, so rank-deficient designs still fit).
+
+A candidate kink is only eligible when at least MIN_SIDE_DAYS observations
+fall on each side of it (T <= kink and T > kink). Otherwise a single warm
+day can set the hot slope. Between two observed temperatures R² is flat, so
+candidates within R2_TIE of the best R² count as tied. The tie is broken
+deterministically by taking the middle of the tied kinks (the lower one of
+the two middle kinks when there is an even number). When no candidate has
+enough support, best_kink is None and callers fall back to DEFAULT_KINK.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import optimize, stats
+
+# Every 0.5°F from 30 to 85
+KINK_GRID = np.arange(30.0, 85.0 + 0.25, 0.5)
+HINGE_COLUMNS = ['temp_cold', 'temp_hot']
+# Fixed kink of the original dashboard, used when the search has too little support
+DEFAULT_KINK = 60.0
+MIN_SIDE_DAYS = 5
+R2_TIE = 1e-9
+
+
+def hinge(temp, kink):
+    """Piecewise temperature columns (temp_cold, temp_hot) for one kink"""
+    temp = np.asarray(temp, dtype=float)
+    return np.minimum(temp, kink), np.maximum(0.0, temp - kink)
+
+
+@dataclass
+class KinkSearch:
+    """Fit statistics for every candidate kink (one row per kink)"""
+    summary: pd.DataFrame   # kink -> r2, adj_r2, rss, df_resid, n_cold, n_hot, supported
+    params: pd.DataFrame    # kink -> coefficient per column
+    bse: pd.DataFrame       # kink -> standard error per column
+    pvalues: pd.DataFrame   # kink -> two-sided t-test p-value per column
+
+    @property
+    def best_kink(self):
+        """Highest-R² kink with enough days on both sides (middle of any near-tie), or None"""
+        return _best_supported(self.summary)
+
+
+def _best_supported(summary):
+    r2 = summary['r2'][summary['supported']]
+    if r2.empty:
+        return None
+    tied = np.sort(r2.index[r2 >= r2.max() - R2_TIE].to_numpy())
+    return float(tied[(len(tied) - 1) // 2])
+
+
+def side_counts(temp, kinks):
+    """(n_cold, n_hot): observations with T <= kink and T > kink, per kink"""
+    temp = np.asarray(temp, dtype=float)
+    kinks = np.atleast_1d(np.asarray(kinks, dtype=float))
+    n_hot = (temp[None, :] > kinks[:, None]).sum(axis=1)
+    return len(temp) - n_hot, n_hot
+
+
+def _shared_design(other, y):
+    Z = np.column_stack([np.ones(len(y)), np.asarray(other, dtype=float)])
+    return Z, Z.T @ Z, Z.T @ y
+
+
+def _stacked_normal_equations(temp, kinks, Z, ZtZ, Zty, y):
+    """X'X and X'y for every kink, X = [hinges | Z], without rebuilding Z"""
+    cold = np.minimum(temp[None, :], kinks[:, None])           # (K, n)
+    hot = np.maximum(0.0, temp[None, :] - kinks[:, None])      # (K, n)
+    H = np.stack([cold, hot], axis=2)                          # (K, n, 2)
+    k, p = len(kinks), 2 + Z.shape[1]
+    XtX = np.empty((k, p, p))
+    XtX[:, :2, :2] = np.einsum('kni,knj->kij', H, H)
+    XtX[:, :2, 2:] = np.einsum('kni,nj->kij', H, Z)
+    XtX[:, 2:, :2] = np.transpose(XtX[:, :2, 2:], (0, 2, 1))
+    XtX[:, 2:, 2:] = ZtZ
+    Xty = np.concatenate([np.einsum('kni,n->ki', H, y), np.broadcast_to(Zty, (k, len(Zty)))], axis=1)
+    return H, XtX, Xty
+
+
+def search_kinks(temp, other, y, kinks=KINK_GRID, columns=None, min_side=MIN_SIDE_DAYS):
+    """Fit y ~ const + hinge(temp, kink) + other for every kink in one batched pass
+
+    temp: Temp_High per day; other: (n, m) array/DataFrame of the remaining
+    regressors; y: Bowls_Sold. Returns a KinkSearch indexed by kink; kinks
+    with fewer than min_side observations on either side are not supported.
+    """
+    if columns is None:
+        columns = list(other.columns) if isinstance(other, pd.DataFrame) else [f'x{i}' for i in range(np.shape(other)[1])]
+    temp, y = np.asarray(temp, dtype=float), np.asarray(y, dtype=float)
+    kinks = np.atleast_1d(np.asarray(kinks, dtype=float))
+    Z, ZtZ, Zty = _shared_design(other, y)
+    H, XtX, Xty = _stacked_normal_equations(temp, kinks, Z, ZtZ, Zty, y)
+
+    XtX_inv = np.linalg.pinv(XtX, hermitian=True)
+    beta = np.einsum('kij,kj->ki', XtX_inv, Xty)
+
+    fitted = np.einsum('kni,ki->kn', H, beta[:, :2]) + beta[:, 2:] @ Z.T
+    resid = y[None, :] - fitted
+    rss = np.einsum('kn,kn->k', resid, resid)
+    tss = np.sum((y - y.mean()) ** 2)
+    n = len(y)
+    rank = np.linalg.matrix_rank(XtX, hermitian=True)
+    df_resid = n - rank
+    sigma2 = rss / df_resid
+    bse = np.sqrt(np.clip(np.diagonal(XtX_inv, axis1=1, axis2=2), 0, None) * sigma2[:, None])
+    # All-zero columns (e.g. temp_hot when no day is above the kink) are not identified
+    empty = np.diagonal(XtX, axis1=1, axis2=2) == 0
+    beta[empty], bse[empty] = 0.0, np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tvalues = beta / bse
+    pvalues = 2 * stats.t.sf(np.abs(tvalues), df_resid[:, None])
+
+    index = pd.Index(kinks, name='kink')
+    r2 = 1 - rss / tss
+    n_cold, n_hot = side_counts(temp, kinks)
+    summary = pd.DataFrame({
+        'r2': r2,
+        'adj_r2': 1 - (1 - r2) * (n - 1) / df_resid,
+        'rss': rss,
+        'df_resid': df_resid,
+        'n_cold': n_cold,
+        'n_hot': n_hot,
+        'supported': (n_cold >= min_side) & (n_hot >= min_side),
+    }, index=index)
+
+    # Solved as [hinges | const | others]; reported in statsmodels order
+    solved = HINGE_COLUMNS + ['const'] + list(columns)
+    order = ['const'] + HINGE_COLUMNS + list(columns)
+
+    def frame(values):
+        return pd.DataFrame(values, index=index, columns=solved)[order]
+
+    return KinkSearch(summary, frame(beta), frame(bse), frame(pvalues))
+
+
+def optimize_kink(temp, other, y, bounds=(30.0, 85.0), grid=KINK_GRID, min_side=MIN_SIDE_DAYS):
+    """Continuous kink: best supported grid point refined with a bounded scalar search on RSS (None if unsupported)"""
+    coarse = search_kinks(temp, other, y, kinks=grid, min_side=min_side).summary
+    best = _best_supported(coarse)
+    if best is None:
+        return None
+    step = np.diff(grid).min() if len(grid) > 1 else (bounds[1] - bounds[0])
+    lo, hi = max(bounds[0], best - step), min(bounds[1], best + step)
+
+    def rss(k):
+        return search_kinks(temp, other, y, kinks=[k]).summary['rss'].iloc[0]
+
+    res = optimize.minimize_scalar(rss, bounds=(lo, hi), method='bounded', options={'xatol': 0.01})
+    n_cold, n_hot = side_counts(temp, res.x)
+    supported = n_cold[0] >= min_side and n_hot[0] >= min_side
+    return float(res.x) if supported and res.fun <= coarse.loc[best, 'rss'] else best
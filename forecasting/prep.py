@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Ingredient prep lists: demand forecasts × recipes (bill of materials).
+
+recipes.csv gives ingredient quantities per unit sold. Each row is keyed
+by Item, which is an item name or a product family (pipeline/menu.py),
+plus optional Size / Broth and Protein:
+- rows without a Protein apply to every unit sold;
+- Protein rows apply per portion of that protein modifier.
+Blank Size / Broth match anything. For each Component (broth, noodles,
+meat, ...), the most specific row wins: an item beats its family, and a
+set Size or Broth beats a blank one.
+
+Sales history turns each forecast series (item, category or family, as in
+forecasting/items.py) into expected recipe keys per unit sold. For
+example, a pho bowl is about two-thirds Large and mostly beef broth, plus
+its share of rare-beef portions. This is the series × keys mix matrix M. Matching
+the keys against the recipes gives the sparse keys × ingredients matrix B.
+Both are built once, and their product (series × ingredients) is kept
+sparse. A prep list for any number of days or scenario rows is then one
+sparse × dense product. The pho total from the aggregate bowl model can be
+used directly as the 'pho' series of the Family level.
+
+The same product over the sales history gives each ingredient's busiest
+day. Quantities are never rewritten. Instead, the sheet flags lines above
+engines.MAX_RATIO × that day (Limit, Over_Limit), and over_limit() lists
+them so callers can warn. A catering day or real growth stays on the
+sheet, and an implausible forecast is visible as such.
+
+Usage:
+    python -m forecasting.prep weather_forecast.csv                       # per-item forecasts -> prep sheet
+    python -m forecasting.prep weather_forecast.csv --from-total          # aggregate pho forecast only
+    python -m forecasting.prep weather_forecast.csv --output prep_sheet.csv
+"""
+import argparse
+import os
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from forecasting import engines, items
+from pipeline import cache, menu
+from pipeline.paths import data_path
+
+RECIPES_FILE = 'recipes.csv'
+KEY_COLUMNS = ['Item', 'Family', 'Size', 'Broth', 'Protein']
+
+
+@dataclass
+class PrepEngine:
+    """Series × ingredients quantities per unit sold (sparse), from the sales mix and the recipes"""
+    level: str
+    series: pd.Index
+    ingredients: pd.DataFrame   # Ingredient, Unit (column order of per_unit)
+    per_unit: sparse.csr_matrix
+    unmatched: list             # series with no recipe rows at all
+    max_daily: np.ndarray       # per ingredient, most used on any day of the sales history
+
+    def limits(self):
+        """Plausible daily quantity per ingredient: engines.MAX_RATIO × its busiest historical day"""
+        return pd.Series(engines.MAX_RATIO * self.max_daily,
+                         index=pd.Index(self.ingredients['Ingredient'], name='Ingredient'))
+
+    def prep(self, quantities):
+        """Days × ingredient quantities for a days × series forecast frame (missing series = 0)"""
+        return pd.DataFrame(usage(self.per_unit, self.series, quantities), index=quantities.index,
+                            columns=pd.Index(self.ingredients['Ingredient'], name='Ingredient'))
+
+    def sheet(self, quantities):
+        """Long daily prep sheet: Date, Ingredient, Unit, Qty, Limit, Over_Limit (non-zero rows)"""
+        wide = self.prep(quantities).rename_axis('Date')
+        long = wide.stack().rename('Qty').reset_index()
+        long['Unit'] = long['Ingredient'].map(self.ingredients.set_index('Ingredient')['Unit'])
+        long['Limit'] = long['Ingredient'].map(self.limits()).round(2)
+        long['Over_Limit'] = long['Qty'] > long['Limit']
+        long['Qty'] = long['Qty'].round(2)
+        columns = ['Date', 'Ingredient', 'Unit', 'Qty', 'Limit', 'Over_Limit']
+        return long.loc[long['Qty'] > 0, columns].reset_index(drop=True)
+
+    def over_limit(self, quantities):
+        """Sheet rows above their ingredient's Limit"""
+        sheet = self.sheet(quantities)
+        return sheet[sheet['Over_Limit']].reset_index(drop=True)
+
+
+def usage(per_unit, series, quantities):
+    """Days × ingredients array for a days × series frame (columns matched to series)"""
+    Q = quantities.reindex(columns=series, fill_value=0.0).to_numpy(dtype=float)
+    return (per_unit.T @ Q.T).T
+
+
+def read_recipes(path=None):
+    recipes = pd.read_csv(path or data_path(RECIPES_FILE), dtype=str, keep_default_na=False)
+    recipes['Qty'] = pd.to_numeric(recipes['Qty'])
+    for col in ['Item', 'Size', 'Broth', 'Protein']:
+        recipes[col] = recipes[col].map(menu.clean_label)
+    return recipes
+
+
+def mix_table(cells, taxonomy, mods, level='Item'):
+    """Long Series, Item, Family, Size, Broth, Protein, Per_Unit: recipe keys per unit sold of each series"""
+    codes = cells['Item'].cat.codes.to_numpy()
+    keep = (~taxonomy['Is_Voided'] & ~taxonomy['Family'].isin(items.SKIP_FAMILIES)).to_numpy()
+    sold = pd.Series(cells['Qty'].to_numpy()[keep[codes]]).groupby(codes[keep[codes]]).sum()
+
+    mods = mods[np.isin(mods['Item'].cat.codes.to_numpy(), sold.index)]
+    mods = mods.assign(Code=mods['Item'].cat.codes.to_numpy(), Modifier=mods['Modifier'].astype(str))
+    lines = mods.drop_duplicates('Line_ID')[['Line_ID', 'Code', 'Qty']]
+    for group, col in [('size', 'Size'), ('broth', 'Broth')]:
+        first = mods[mods['Group'] == group].drop_duplicates('Line_ID').set_index('Line_ID')['Modifier']
+        lines[col] = lines['Line_ID'].map(first).fillna('')
+    variants = lines.groupby(['Code', 'Size', 'Broth'])['Qty'].sum().reset_index()
+    # Units sold without a size or broth choice are the item's plain variant
+    plain = (sold - variants.groupby('Code')['Qty'].sum().reindex(sold.index, fill_value=0.0)).clip(lower=0.0)
+    variants = pd.concat([variants, pd.DataFrame({'Code': plain.index, 'Size': '', 'Broth': '', 'Qty': plain.to_numpy()})])
+    proteins = (mods[mods['Group'] == 'protein'].groupby(['Code', 'Modifier'])['Qty'].sum()
+                .rename_axis(['Code', 'Protein']).reset_index())
+
+    keys = pd.concat([variants.assign(Protein=''), proteins.assign(Size='', Broth='')], ignore_index=True)
+    keys = keys[keys['Qty'] > 0]
+    info = taxonomy.loc[keys['Code']]
+    keys = keys.assign(Series=info[{'Item': 'Item_Name'}.get(level, level)].fillna('Unknown').to_numpy(),
+                       Item=info['Item_Name'].to_numpy(), Family=info['Family'].to_numpy())
+    totals = pd.Series(sold.to_numpy(), index=taxonomy.loc[sold.index, {'Item': 'Item_Name'}.get(level, level)]
+                       .fillna('Unknown').to_numpy()).groupby(level=0).sum()
+    keys['Per_Unit'] = keys['Qty'] / keys['Series'].map(totals)
+    return keys.groupby(['Series'] + KEY_COLUMNS, sort=True)['Per_Unit'].sum().reset_index()
+
+
+def recipe_matrix(keys, recipes):
+    """Sparse keys × ingredients quantities (most specific recipe row per key and Component) and the ingredient list"""
+    k = keys.reset_index(drop=True).rename_axis('Key').reset_index()
+    k = k.assign(**{f'{c}_key': k[c].map(menu.clean_label) for c in ['Item', 'Size', 'Broth', 'Protein']})
+    pairs = k[['Key', 'Item_key', 'Family', 'Size_key', 'Broth_key', 'Protein_key']].merge(recipes, how='cross')
+    item_row = pairs['Item'] == pairs['Item_key']
+    match = ((item_row | (pairs['Item'] == pairs['Family']))
+             & ((pairs['Size'] == '') | (pairs['Size'] == pairs['Size_key']))
+             & ((pairs['Broth'] == '') | (pairs['Broth'] == pairs['Broth_key']))
+             & (pairs['Protein'] == pairs['Protein_key']))
+    pairs = pairs[match].assign(Specificity=4 * item_row[match] + (pairs['Size'] != '') + (pairs['Broth'] != ''))
+    rows = pairs.sort_values(['Key', 'Component', 'Specificity'], ascending=[True, True, False])
+    rows = rows.drop_duplicates(['Key', 'Component'])
+
+    ingredients = recipes.drop_duplicates('Ingredient')[['Ingredient', 'Unit']].reset_index(drop=True)
+    col = pd.Index(ingredients['Ingredient']).get_indexer(rows['Ingredient'])
+    B = sparse.csr_matrix((rows['Qty'].to_numpy(), (rows['Key'].to_numpy(), col)), shape=(len(k), len(ingredients)))
+    return B, ingredients
+
+
+def build_engine(cells, taxonomy, mods, recipes, level='Item'):
+    """PrepEngine for the forecast series at level (see forecasting/items.py)"""
+    mix = mix_table(cells, taxonomy, mods, level)
+    keys = mix[KEY_COLUMNS].drop_duplicates().reset_index(drop=True)
+    key_index = pd.MultiIndex.from_frame(keys).get_indexer(pd.MultiIndex.from_frame(mix[KEY_COLUMNS]))
+    series = pd.Index(mix['Series'].unique(), name=level)
+    M = sparse.csr_matrix((mix['Per_Unit'].to_numpy(), (series.get_indexer(mix['Series']), key_index)),
+                          shape=(len(series), len(keys)))
+    B, ingredients = recipe_matrix(keys, recipes)
+    per_unit = (M @ B).tocsr()
+    unmatched = series[np.asarray(per_unit.getnnz(axis=1)) == 0].tolist()
+    history = items.series_matrix(cells, taxonomy, np.unique(cells['Date']), level)
+    max_daily = usage(per_unit, series, history).max(axis=0, initial=0.0)
+    return PrepEngine(level, series, ingredients, per_unit, unmatched, max_daily)
+
+
+def load_engine(level='Item', path=None):
+    """PrepEngine from the sales store and recipes.csv (cached; rebuilt on new sales or recipe edits)"""
+    from pipeline import data
+    path = path or data_path(RECIPES_FILE)
+    return cache.get_or_build(f'prep:{level}', (data.sync_sales(), os.path.getmtime(path)), lambda: build_engine(
+        data.load_cube(), data.load_menu(), data.load_modifiers(), read_recipes(path), level))
+
+
+def total_quantities(week):
+    """Days × series frame for the Family level from an aggregate bowl forecast (forecasting/horizon.py)"""
+    return pd.DataFrame({'pho': week['Predicted_Bowls'].to_numpy()}, index=pd.DatetimeIndex(week['Date'], name='Date'))
+
+
+def item_quantities(menu_qty, level):
+    """Days × series frame from items.forecast_menu() output"""
+    return menu_qty.pivot(index='Date', columns=level, values='Predicted_Qty')
+
+
+if __name__ == '__main__':
+    from forecasting import features, horizon, registry, scoring
+    from pipeline import data
+
+    parser = argparse.ArgumentParser(description="Daily ingredient prep sheet from a weather forecast")
+    parser.add_argument('source', help="forecast CSV or JSON feed URL (see forecasting/horizon.py)")
+    parser.add_argument('--level', default='Item', choices=items.LEVELS, help="per-series forecasts to expand")
+    parser.add_argument('--from-total', action='store_true', help="use the aggregate pho forecast instead")
+    parser.add_argument('--output', help="CSV path (default: stdout)")
+    args = parser.parse_args()
+
+    forecast = horizon.read_forecast(args.source)
+    df = features.model_frame(data.load_merged())
+    model = registry.load_or_fit(scoring.MODEL_NAME, df)
+    if args.from_total:
+        engine = load_engine('Family')
+        quantities = total_quantities(horizon.forecast_horizon(forecast, model))
+    else:
+        engine = load_engine(args.level)
+        item_models = items.load_or_fit(df, model.kink, data.load_cube(), data.load_menu(), args.level)
+        quantities = item_quantities(items.forecast_menu(forecast, item_models), args.level)
+
+    sheet = engine.sheet(quantities)
+    sheet['Date'] = pd.to_datetime(sheet['Date']).dt.strftime('%Y-%m-%d')
+    flagged = sheet[sheet['Over_Limit']]
+    for ingredient, rows in flagged.groupby('Ingredient', sort=False):
+        print(f"  Warning: {ingredient} above {rows['Limit'].iloc[0]:.1f} {rows['Unit'].iloc[0]}/day on "
+              f"{len(rows)} day(s) (up to {rows['Qty'].max():,.1f}); check the item forecast", file=sys.stderr)
+    sheet.to_csv(args.output or sys.stdout, index=False)
+    if args.output:
+        print(f"✓ {len(sheet)} prep lines for {sheet['Date'].nunique()} days -> {args.output}")
+    if engine.unmatched:
+        print(f"  (no recipe for: {', '.join(engine.unmatched)})", file=sys.stderr)
@@ -0,0 +1,193 @@
+"""
+Persisted, versioned OLS model artifacts.
+
+A fit (kink search + OLS) is stored as JSON under models/<name>/<hash>.json
+with its coefficients, covariance, feature list, kink, training window and
+fit statistics. Columns that are constant over the training window (a year
+dummy that is still all zero) are left out of the OLS fit and stored with a
+zero coefficient. The searched kink is only adopted when enough days fall
+on each side of it (forecasting/kink.py); otherwise the fit keeps
+kink.DEFAULT_KINK, and kink_source / kink_n_cold / kink_n_hot record which
+happened. The hash covers the training data and the model spec, so a
+Streamlit rerun (or a slider move) only loads the artifact, and a refit
+happens only when the ingested data changes. Forecasts are a dot product
+against the stored params.
+"""
+import hashlib
+import json
+import os
+import warnings
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy import stats
+
+from forecasting import features, kink
+from pipeline import cache
+from pipeline.paths import BASE_DIR
+
+MODEL_DIR = os.path.join(BASE_DIR, 'models')
+# Bumped when the fitting procedure or artifact layout changes
+ARTIFACT_VERSION = 4
+
+
+@dataclass
+class ModelArtifact:
+    """Fitted OLS model; attribute names follow statsmodels results"""
+    name: str
+    data_hash: str
+    exog_names: list
+    params: pd.Series
+    cov: pd.DataFrame
+    kink: float
+    train_start: str
+    train_end: str
+    nobs: int
+    df_resid: float
+    rsquared: float
+    rsquared_adj: float
+    mse_resid: float
+    fvalue: float
+    f_pvalue: float
+    fitted_at: str
+    kink_search: pd.DataFrame = field(default=None)
+    kink_source: str = 'search'     # 'search' or 'default' (no kink with enough support)
+    kink_n_cold: int = None         # training days with Temp_High <= kink
+    kink_n_hot: int = None          # training days with Temp_High > kink
+
+    @property
+    def bse(self):
+        return pd.Series(np.sqrt(np.clip(np.diag(self.cov.to_numpy()), 0, None)), index=self.exog_names)
+
+    @property
+    def tvalues(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.params / self.bse
+
+    @property
+    def pvalues(self):
+        return pd.Series(2 * stats.t.sf(np.abs(self.tvalues.to_numpy()), self.df_resid), index=self.exog_names)
+
+    def predict(self, X):
+        """Dot product of the design rows (DataFrame or array in exog_names order) with params"""
+        if isinstance(X, pd.DataFrame):
+            X = X[self.exog_names]
+        return np.asarray(X, dtype=float) @ self.params.to_numpy()
+
+    def to_dict(self):
+        d = {k: getattr(self, k) for k in self.__dataclass_fields__}
+        d['params'] = self.params.tolist()
+        d['cov'] = self.cov.to_numpy().tolist()
+        d['kink_search'] = None if self.kink_search is None else self.kink_search.reset_index().to_dict(orient='list')
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        d = dict(d)
+        names = d['exog_names']
+        d['params'] = pd.Series(d['params'], index=names)
+        d['cov'] = pd.DataFrame(d['cov'], index=names, columns=names)
+        if d.get('kink_search') is not None:
+            d['kink_search'] = pd.DataFrame(d['kink_search']).set_index('kink')
+        return cls(**d)
+
+
+def data_hash(df, target=features.TARGET):
+    """Hash of the training rows plus the model spec"""
+    h = hashlib.sha256()
+    h.update(json.dumps({'version': ARTIFACT_VERSION, 'features': features.MODEL_FEATURES,
+                         'kinks': kink.KINK_GRID.tolist(), 'min_side': kink.MIN_SIDE_DAYS,
+                         'default_kink': kink.DEFAULT_KINK}).encode())
+    h.update(pd.DatetimeIndex(df['Date']).asi8.tobytes())
+    for col in ['Temp_High', target] + features.KINK_VARS:
+        h.update(np.ascontiguousarray(df[col].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()[:16]
+
+
+def fit(name, df, target=features.TARGET):
+    """Kink search + OLS on a model frame (see features.model_frame)"""
+    search = kink.search_kinks(df['Temp_High'], df[features.KINK_VARS], df[target])
+    best = search.best_kink
+    source = 'search'
+    if best is None:
+        best, source = kink.DEFAULT_KINK, 'default'
+        warnings.warn(f"No kink on the {kink.KINK_GRID[0]:g}-{kink.KINK_GRID[-1]:g}°F grid has {kink.MIN_SIDE_DAYS} "
+                      f"training days on each side; using the default {kink.DEFAULT_KINK:g}°F kink", stacklevel=2)
+    n_cold, n_hot = kink.side_counts(df['Temp_High'], best)
+    X = features.design_matrix(df, best)
+    # Constant columns are collinear with const: fit without them, store them as 0
+    varies = X.columns[(X.columns == 'const') | (X.nunique() > 1).to_numpy()]
+    res = sm.OLS(df[target].to_numpy(dtype=float), X[varies]).fit()
+    params = pd.Series(np.asarray(res.params), index=varies).reindex(X.columns, fill_value=0.0)
+    cov = pd.DataFrame(np.asarray(res.cov_params()), index=varies, columns=varies).reindex(
+        index=X.columns, columns=X.columns, fill_value=0.0)
+    kink_table = search.summary[['r2', 'n_cold', 'n_hot', 'supported']].join(
+        search.params[kink.HINGE_COLUMNS]).join(search.pvalues[kink.HINGE_COLUMNS].add_prefix('p_'))
+    return ModelArtifact(
+        name=name,
+        data_hash=data_hash(df, target),
+        exog_names=list(X.columns),
+        params=params,
+        cov=cov,
+        kink=best,
+        train_start=f"{pd.Timestamp(df['Date'].min()):%Y-%m-%d}",
+        train_end=f"{pd.Timestamp(df['Date'].max()):%Y-%m-%d}",
+        nobs=int(res.nobs),
+        df_resid=float(res.df_resid),
+        rsquared=float(res.rsquared),
+        rsquared_adj=float(res.rsquared_adj),
+        mse_resid=float(res.mse_resid),
+        fvalue=float(np.squeeze(res.fvalue)),
+        f_pvalue=float(np.squeeze(res.f_pvalue)),
+        fitted_at=datetime.now().isoformat(timespec='seconds'),
+        kink_search=kink_table,
+        kink_source=source,
+        kink_n_cold=int(n_cold[0]),
+        kink_n_hot=int(n_hot[0]),
+    )
+
+
+def artifact_path(name, digest, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, name, f'{digest}.json')
+
+
+def save(artifact, model_dir=MODEL_DIR):
+    path = artifact_path(artifact.name, artifact.data_hash, model_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(artifact.to_dict(), f, indent=1)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def load(name, digest, model_dir=MODEL_DIR):
+    with open(artifact_path(name, digest, model_dir)) as f:
+        return ModelArtifact.from_dict(json.load(f))
+
+
+def load_or_fit(name, df, target=features.TARGET, model_dir=MODEL_DIR):
+    """Stored artifact for exactly this training data, fitting (and saving) it if missing"""
+    digest = data_hash(df, target)
+
+    def build():
+        if os.path.exists(artifact_path(name, digest, model_dir)):
+            return load(name, digest, model_dir)
+        artifact = fit(name, df, target)
+        save(artifact, model_dir)
+        return artifact
+
+    return cache.get_or_build(f'model:{name}:{model_dir}', digest, build)
+
+
+def latest(name, model_dir=MODEL_DIR):
+    """Most recently fitted artifact for name (for tools that run without the data)"""
+    folder = os.path.join(model_dir, name)
+    paths = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith('.json')] if os.path.isdir(folder) else []
+    if not paths:
+        raise FileNotFoundError(f"No fitted '{name}' model in {model_dir}. Open the dashboard or run a refit first.")
+    newest = max(paths, key=os.path.getmtime)
+    with open(newest) as f:
+        return ModelArtifact.from_dict(json.load(f))
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Batch demand scoring outside Streamlit.
+
+Scores any number of (date, forecast high, precip type) scenarios against a
+stored model artifact (forecasting/registry.py) with plain NumPy: calendar
+flags come from the cached per-day table (pipeline/calendar_features.py),
+precipitation flags from forecasting/features.py, and the forecast is one
+matrix product. Each bowl forecast also gets a capacity alert level.
+
+Usage:
+    python -m forecasting.scoring scenarios.csv             # Date,Temp_High,Precip_Type -> CSV on stdout
+    python -m forecasting.scoring - < scenarios.csv
+    python -m forecasting.scoring --serve --port 8765       # POST /score (JSON)
+
+    curl -s localhost:8765/score -d '{"date": ["2026-02-06"], "temp_high": [31], "precip_type": ["Snow"]}'
+"""
+import argparse
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from forecasting import features, kink, registry
+from pipeline import calendar_features
+
+MODEL_NAME = 'bowls_ols'
+
+# Seating capacity (bowls/day) and the "high demand" warning level below it
+CAPACITY_LIMIT = 80
+CAPACITY_WARNING = 68
+ALERT_LEVELS = np.array(['ok', 'warning', 'capacity'])
+
+
+def load_model(name=MODEL_NAME, refresh=False):
+    """Latest stored artifact; with refresh, sync the sales data and refit if it changed"""
+    if refresh:
+        from pipeline import data
+        return registry.load_or_fit(name, features.model_frame(data.load_merged()))
+    return registry.latest(name)
+
+
+def feature_matrix(model, temp_high, **flags):
+    """Design rows in model.exog_names order from temperatures and 0/1 (or season) flag arrays
+
+    Regressors not given in flags are 0 (e.g. is_2024/is_2025 for future days).
+    """
+    temp_high = np.atleast_1d(np.asarray(temp_high, dtype=float))
+    cols = dict(zip(kink.HINGE_COLUMNS, kink.hinge(temp_high, model.kink)))
+    cols['const'] = 1.0
+    X = np.zeros((len(temp_high), len(model.exog_names)))
+    for j, name in enumerate(model.exog_names):
+        if name in cols:
+            X[:, j] = cols[name]
+        elif name in flags:
+            X[:, j] = flags[name]
+    return X
+
+
+def _days(dates):
+    """datetime64[D] array; ISO date strings skip the pandas parser"""
+    try:
+        return np.atleast_1d(np.asarray(dates, dtype='datetime64[D]'))
+    except (ValueError, TypeError):
+        return pd.to_datetime(pd.Series(dates)).to_numpy().astype('datetime64[D]')
+
+
+def calendar_flags(dates):
+    """Calendar regressors for each date, looked up positionally in the cached table"""
+    days = _days(dates)
+    table = calendar_features.calendar_table(days.min(), days.max())
+    pos = (days - table.index[0].to_datetime64().astype('datetime64[D]')).astype(int)
+    return {c: table[c].to_numpy()[pos] for c in features.KINK_VARS if c in table.columns}
+
+
+def alert_levels(bowls):
+    """'ok' / 'warning' (> CAPACITY_WARNING) / 'capacity' (> CAPACITY_LIMIT) per forecast"""
+    bowls = np.asarray(bowls, dtype=float)
+    return ALERT_LEVELS[(bowls > CAPACITY_WARNING).astype(int) + (bowls > CAPACITY_LIMIT)]
+
+
+def scenario_matrix(dates, temp_high, precip_type, model):
+    """Design matrix for a batch of (date, forecast high, precip) scenarios"""
+    flags = calendar_flags(dates)
+    flags['is_rain'], flags['is_snow'] = features.precip_flags(precip_type)
+    return feature_matrix(model, temp_high, **flags)
+
+
+def score(dates, temp_high, precip_type, model=None):
+    """Bowl forecasts and alert levels for a batch of scenarios
+
+    Returns {'bowls': float array (floored at 0), 'alert': str array}.
+    """
+    model = model or load_model()
+    bowls = np.maximum(0.0, model.predict(scenario_matrix(dates, temp_high, precip_type, model)))
+    return {'bowls': bowls, 'alert': alert_levels(bowls)}
+
+
+def score_frame(df, model=None):
+    """score() for a frame with Date, Temp_High and Precip_Type columns"""
+    result = score(df['Date'], df['Temp_High'], df['Precip_Type'].fillna('Clear'), model)
+    return df.assign(Predicted_Bowls=result['bowls'].round(1), Alert=result['alert'])
+
+
+# --- LOCAL HTTP ENTRY POINT ---
+
+def _rows_to_columns(payload):
+    """Accept {"rows": [{date, temp_high, precip_type}, ...]} or columnar lists"""
+    if 'rows' in payload:
+        rows = payload['rows']
+        payload = {k: [r.get(k) for r in rows] for k in ('date', 'temp_high', 'precip_type')}
+    precip = payload.get('precip_type') or ['Clear'] * len(payload['date'])
+    return payload['date'], payload['temp_high'], [p or 'Clear' for p in precip]
+
+
+def make_handler(model):
+    class ScoringHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body):
+            out = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+        def do_GET(self):
+            if self.path != '/health':
+                return self._send(404, {'error': 'not found'})
+            self._send(200, {'model': model.name, 'data_hash': model.data_hash, 'kink': model.kink,
+                             'train_end': model.train_end, 'capacity_limit': CAPACITY_LIMIT,
+                             'capacity_warning': CAPACITY_WARNING})
+
+        def do_POST(self):
+            if self.path != '/score':
+                return self._send(404, {'error': 'not found'})
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                dates, temps, precip = _rows_to_columns(payload)
+                result = score(dates, temps, precip, model)
+            except (ValueError, KeyError, TypeError) as e:
+                return self._send(400, {'error': str(e)})
+            self._send(200, {'date': _days(dates).astype(str).tolist(),
+                             'bowls': result['bowls'].round(1).tolist(),
+                             'alert': result['alert'].tolist()})
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return ScoringHandler
+
+
+def serve(port=8765, model=None):
+    model = model or load_model()
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(model))
+    print(f"✓ Scoring {model.name} ({model.data_hash}, trained through {model.train_end}) on http://127.0.0.1:{port}/score")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score bowl demand scenarios")
+    parser.add_argument('csv', nargs='?', default='-', help="Date,Temp_High,Precip_Type CSV ('-' for stdin)")
+    parser.add_argument('--serve', action='store_true', help="run the local HTTP scoring server")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--refresh', action='store_true', help="sync sales data and refit if it changed")
+    args = parser.parse_args()
+
+    model = load_model(refresh=args.refresh)
+    if args.serve:
+        serve(args.port, model)
+    else:
+        scenarios = pd.read_csv(sys.stdin if args.csv == '-' else args.csv)
+        score_frame(scenarios, model).to_csv(sys.stdout, index=False)
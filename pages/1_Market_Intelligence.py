@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 
+from pipeline import cpi
+
 st.title("🗺️ Market Intelligence")
 
 st.markdown("""
@@ -36,6 +38,8 @@ try:
     competitors['Price_Index'] = (
         competitors['Pho Dac Biet L'] + competitors['Pho 2 Topping equivalent L']
     ) / 2
+    # Menu prices are current: deflate with the latest CPI month to constant base-year dollars
+    competitors['Real_Price_Index'] = cpi.deflate(competitors['Price_Index'], [pd.Timestamp.today()] * len(competitors))
     
     # --- GEOCODING ---
     # Manually add lat/long for Central PA addresses
@@ -208,7 +212,7 @@ try:
     # Sort by Bayesian rating
     competitors_display = competitors[[
         'Restaurants', 'Google Rating', 'Google Reviews', 'Bayesian_Rating', 
-        'Pho 2 Topping equivalent L', 'Price_Index', 'Address'
+        'Pho 2 Topping equivalent L', 'Price_Index', 'Real_Price_Index', 'Address'
     ]].copy()
     
     competitors_display = competitors_display.sort_values('Bayesian_Rating', ascending=False)
@@ -217,12 +221,12 @@ try:
     # Reorder columns
     competitors_display = competitors_display[[
         'Rank', 'Restaurants', 'Bayesian_Rating', 'Google Rating', 'Google Reviews',
-        'Pho 2 Topping equivalent L', 'Price_Index', 'Address'
+        'Pho 2 Topping equivalent L', 'Price_Index', 'Real_Price_Index', 'Address'
     ]]
     
     competitors_display.columns = [
         'Rank', 'Restaurant', 'Bayesian Rating', 'Google Rating', '# Reviews',
-        'Pho 2 Topping ($)', 'Price Index ($)', 'Address'
+        'Pho 2 Topping ($)', 'Price Index ($)', f'Price Index ({cpi.BASE_YEAR} $)', 'Address'
     ]
     
     # Highlight Bamboo
@@ -236,7 +240,8 @@ try:
             'Bayesian Rating': '{:.2f}',
             'Google Rating': '{:.1f}',
             'Pho 2 Topping ($)': '${:.2f}',
-            'Price Index ($)': '${:.2f}'
+            'Price Index ($)': '${:.2f}',
+            f'Price Index ({cpi.BASE_YEAR} $)': '${:.2f}'
         }),
         use_container_width=True,
         hide_index=True
@@ -1,15 +1,10 @@
-import os
 import streamlit as st
 import pandas as pd
-
-# Project root for data files (pages/ is subdir, so go up one level)
-_script_dir = os.path.dirname(os.path.abspath(__file__))
-BASE_DIR = os.path.dirname(_script_dir) if os.path.basename(_script_dir) == 'pages' else _script_dir
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-import statsmodels.api as sm
-import pytz
+from forecasting import backtest, compare, features, kink, registry, scoring
+from pipeline import cache, data
 
 st.title("📊 Model Diagnostics")
 
@@ -18,239 +13,23 @@ This page provides detailed diagnostics for the OLS regression model predicting
 The model uses temperature, precipitation, weekend effects, and interaction terms.
 """)
 
-@st.cache_data
-def load_all_data():
-    # Load and adjust timezone - combining 2024, 2025, and 2026 data
-    pt_tz, et_tz = pytz.timezone('US/Pacific'), pytz.timezone('US/Eastern')
-
-    def process_sales(df_raw):
-        df_raw['Datetime_PT'] = pd.to_datetime(df_raw['Date'] + ' ' + df_raw['Time'])
-        df_raw['Datetime_ET'] = df_raw['Datetime_PT'].dt.tz_localize(pt_tz).dt.tz_convert(et_tz)
-        df_raw['Date'] = df_raw['Datetime_ET'].dt.date
-        df_raw['Day_of_Week'] = df_raw['Datetime_ET'].dt.day_name()
-        df_raw['Gross Sales'] = df_raw['Gross Sales'].replace(r'[\$,]', '', regex=True).astype(float)
-        df_raw['Qty'] = pd.to_numeric(df_raw['Qty'], errors='coerce').fillna(0)
-        return df_raw
-
-    def _path(fname):
-        """Try project folder, then Extreme SSD (project or root) if mounted."""
-        p = os.path.join(BASE_DIR, fname)
-        if os.path.exists(p):
-            return p
-        for vol in ['Extreme SSD', 'Extreme']:
-            for sub in ['', 'moms-dashboard']:
-                alt = os.path.join('/Volumes', vol, sub, fname) if sub else os.path.join('/Volumes', vol, fname)
-                if os.path.exists(alt):
-                    return alt
-        return p
-
-    sales_dfs = []
-    # Load 2024 sales data (optional on Streamlit Cloud; required locally)
-    try:
-        df_2024 = process_sales(pd.read_csv(_path('2024_Bamboo_Data.csv')))
-        sales_dfs.append(df_2024)
-    except (FileNotFoundError, OSError):
-        pass
-
-    # Load 2025 sales data (optional on Streamlit Cloud; required locally)
-    try:
-        df_2025 = process_sales(pd.read_csv(_path('2025_Bamboo_Data.csv')))
-        sales_dfs.append(df_2025)
-    except (FileNotFoundError, OSError):
-        pass
-
-    # Load Jan 2026 sales data
-    df_jan_2026 = process_sales(pd.read_csv(os.path.join(BASE_DIR, 'Jan_2026_Bamboo_Data.csv')))
-    sales_dfs.append(df_jan_2026)
-
-    # Load Feb 2026 sales data (Feb 1-4)
-    df_feb_2026 = process_sales(pd.read_csv(os.path.join(BASE_DIR, 'Feb 3 and 4 sales.csv')))
-    sales_dfs.append(df_feb_2026)
-
-    # Combine sales data
-    if not sales_dfs:
-        raise FileNotFoundError("No sales data. Need Jan_2026_Bamboo_Data.csv and Feb 3 and 4 sales.csv.")
-    df = pd.concat(sales_dfs, ignore_index=True)
-    
-    # Load 2024 weather data (preprocessed)
-    weather_2024 = pd.read_csv(os.path.join(BASE_DIR, 'camp_hill_2024_weather_processed.csv'))
-    weather_2024['Date'] = pd.to_datetime(weather_2024['Date']).dt.date
-    
-    # Load 2025 weather data
-    weather_2025 = pd.read_csv(os.path.join(BASE_DIR, 'camp_hill_2025_weather.csv'))
-    weather_2025['Date'] = pd.to_datetime(weather_2025['Date']).dt.date
-    
-    # Load Jan 2026 weather data
-    weather_jan_2026 = pd.read_csv(os.path.join(BASE_DIR, 'jan_weather.csv'))
-    weather_jan_2026['Date'] = pd.to_datetime(weather_jan_2026['Date']).dt.date
-    
-    # Load Feb 2026 weather data
-    weather_feb_2026 = pd.read_csv(os.path.join(BASE_DIR, 'feb_weather.csv'))
-    # Fix column names (handle spaces)
-    weather_feb_2026.columns = weather_feb_2026.columns.str.replace(' ', '_')
-    # Clean temperature values (remove °F suffix)
-    weather_feb_2026['Temp_High'] = weather_feb_2026['Temp_High'].astype(str).str.replace('°F', '').astype(float)
-    # Clean precipitation type (extract base type)
-    weather_feb_2026['Precip_Type'] = weather_feb_2026['Precip_Type'].str.split(' ').str[0]
-    weather_feb_2026['Date'] = pd.to_datetime(weather_feb_2026['Date']).dt.date
-    
-    # Combine weather data
-    weather = pd.concat([weather_2024, weather_2025, weather_jan_2026, weather_feb_2026], ignore_index=True)
-    
-    # Aggregate pho bowls
-    pho_items = df[df['Item'].str.contains('Pho', case=False, na=False)]
-    daily_pho = pho_items.groupby('Date').agg({'Qty': 'sum'}).reset_index()
-    daily_pho.columns = ['Date', 'Bowls_Sold']
-    
-    # Merge with weather
-    merged = pd.merge(daily_pho, weather, on='Date', how='left')
-    merged['Day_of_Week'] = pd.to_datetime(merged['Date']).dt.day_name()
-    merged['Precip_Type'] = merged['Precip_Type'].fillna('Clear')
-    
-    return df, merged
-
 try:
-    sales_df, merged = load_all_data()
-    
-    # --- FEATURE ENGINEERING ---
-    
-    # Weekend binary (Friday, Saturday, Sunday - combined payday/weekend effect)
-    merged['is_weekend'] = merged['Day_of_Week'].isin(['Friday', 'Saturday', 'Sunday']).astype(int)
-    
-    # Precipitation type binaries (3 categories)
-    merged['is_clear'] = (merged['Precip_Type'].isin(['None', 'Clear'])).astype(int)
-    merged['is_rain'] = (merged['Precip_Type'].isin(['Rain', 'Mixed'])).astype(int)
-    merged['is_snow'] = (merged['Precip_Type'].isin(['Snow', 'Flurries', 'Heavy Snow'])).astype(int)
-    
-    # Seasonality: Consolidated season impact variable
-    merged['Date_dt'] = pd.to_datetime(merged['Date'])
-    merged['month'] = merged['Date_dt'].dt.month
-    
-    # High Demand (+1): Jan, Feb, Nov, Dec (The Winter Peak)
-    # Low Demand (-1): Apr, May, Jun, Jul, Aug (The Transitions & Heat Slump)
-    # Neutral (0): March, September, October
-    def get_season_impact(month):
-        if month in [1, 2, 11, 12]:  # High demand (winter peak)
-            return 1
-        elif month in [4, 5, 6, 7, 8]:  # Low demand (warm season slump)
-            return -1
-        else:  # Neutral (Mar, Sep, Oct - shoulder seasons)
-            return 0
-    
-    merged['season_impact'] = merged['month'].apply(get_season_impact)
-    
-    # Naval Base Traffic Effects
-    merged['Date_dt'] = pd.to_datetime(merged['Date'])
-    
-    # Federal Payday: Bi-weekly Fridays (2025 + 2026)
-    federal_payday_anchor = pd.Timestamp('2026-01-09')
-    federal_paydays = []
-    current_date = federal_payday_anchor
-    
-    # Go backwards to cover 2025
-    while current_date >= pd.Timestamp('2025-01-01'):
-        federal_paydays.append(current_date)
-        current_date = current_date - pd.Timedelta(days=14)
-    
-    # Go forwards to cover rest of 2026
-    current_date = federal_payday_anchor + pd.Timedelta(days=14)
-    while current_date <= pd.Timestamp('2026-12-31'):
-        federal_paydays.append(current_date)
-        current_date = current_date + pd.Timedelta(days=14)
-    
-    merged['is_federal_payday'] = merged['Date_dt'].isin(federal_paydays).astype(int)
-    
-    # Payday Weekend
-    merged['is_payday_weekend'] = 0
-    payday_dates = merged[merged['is_federal_payday'] == 1]['Date_dt']
-    for payday_date in payday_dates:
-        merged.loc[merged['Date_dt'] == payday_date + pd.Timedelta(days=1), 'is_payday_weekend'] = 1
-        merged.loc[merged['Date_dt'] == payday_date + pd.Timedelta(days=2), 'is_payday_weekend'] = 1
-    
-    # Friday Base Traffic
-    merged['is_friday_base'] = (merged['Day_of_Week'] == 'Friday').astype(int)
-    
-    # Holiday Proximity Effects
-    major_holidays = [
-        pd.Timestamp('2025-01-01'), pd.Timestamp('2025-01-29'), pd.Timestamp('2025-02-09'),
-        pd.Timestamp('2025-02-14'), pd.Timestamp('2025-04-20'), pd.Timestamp('2025-05-26'),
-        pd.Timestamp('2025-07-04'), pd.Timestamp('2025-09-01'), pd.Timestamp('2025-11-27'),
-        pd.Timestamp('2025-12-25'), pd.Timestamp('2026-01-01'), pd.Timestamp('2026-02-17'),
-        pd.Timestamp('2026-02-08'), pd.Timestamp('2026-02-14'), pd.Timestamp('2026-04-05'),
-        pd.Timestamp('2026-05-25'), pd.Timestamp('2026-07-04'), pd.Timestamp('2026-09-07'),
-        pd.Timestamp('2026-11-26'), pd.Timestamp('2026-12-25')
-    ]
-    
-    merged['is_pre_holiday'] = 0
-    for holiday in major_holidays:
-        merged.loc[merged['Date_dt'].isin([holiday - pd.Timedelta(days=1), holiday - pd.Timedelta(days=2)]), 'is_pre_holiday'] = 1
-    
-    merged['is_post_holiday'] = 0
-    for holiday in major_holidays:
-        merged.loc[merged['Date_dt'].isin([holiday + pd.Timedelta(days=1), holiday + pd.Timedelta(days=2)]), 'is_post_holiday'] = 1
-    
-    merged['is_valentines_period'] = merged['Date_dt'].isin([
-        pd.Timestamp('2025-02-13'), pd.Timestamp('2025-02-14'), pd.Timestamp('2025-02-15'),
-        pd.Timestamp('2026-02-13'), pd.Timestamp('2026-02-14'), pd.Timestamp('2026-02-15')
-    ]).astype(int)
-    
-    merged['is_lunar_new_year'] = merged['Date_dt'].isin([
-        pd.Timestamp('2025-01-29'), pd.Timestamp('2025-01-30'), pd.Timestamp('2025-01-31'),
-        pd.Timestamp('2026-02-17'), pd.Timestamp('2026-02-18'), pd.Timestamp('2026-02-19')
-    ]).astype(int)
-    
-    merged['is_pre_holiday_friday'] = (merged['is_pre_holiday'] * merged['is_friday_base']).astype(int)
-    
-    # Year Dummies (Capture Model Drift)
-    merged['year'] = merged['Date_dt'].dt.year
-    merged['is_2024'] = (merged['year'] == 2024).astype(int)
-    merged['is_2025'] = (merged['year'] == 2025).astype(int)
-    
-    # Prepare model data (exclude Mondays and zero sales)
-    model_df = merged[
-        (merged['Day_of_Week'] != 'Monday') & 
-        (merged['Bowls_Sold'] > 0)
-    ].copy()
-    
-    # --- FIND OPTIMAL TEMPERATURE KINK POINT ---
-    # Test piecewise temperature models with different kink points
-    kink_points = [50, 55, 60, 65, 70]
-    best_r2 = 0
-    best_kink = 60  # Default
-    
-    for kink in kink_points:
-        # Create piecewise temperature variables
-        model_df[f'temp_cold_{kink}'] = model_df['Temp_High'].apply(lambda t: min(t, kink))
-        model_df[f'temp_hot_{kink}'] = model_df['Temp_High'].apply(lambda t: max(0, t - kink))
-        
-        # Build temporary model with this kink
-        X_temp = model_df[[f'temp_cold_{kink}', f'temp_hot_{kink}', 
-                          'is_weekend', 'is_rain', 'is_snow', 'is_federal_payday', 
-                          'is_payday_weekend',
-                          'is_2024', 'is_2025', 'season_impact']]
-        X_temp = sm.add_constant(X_temp)
-        y_temp = model_df['Bowls_Sold']
-        
-        model_temp = sm.OLS(y_temp, X_temp).fit()
-        
-        if model_temp.rsquared > best_r2:
-            best_r2 = model_temp.rsquared
-            best_kink = kink
+    # Shared with the Home page via the process-wide cache (pipeline/data.py). Calendar effects
+    # (weekend Fri/Sat/Sun, season impact, federal payday + payday weekend, year dummies) and
+    # precipitation binaries are joined in forecasting/features.py; Mondays and zero sales excluded
+    model_df = features.model_frame(data.load_merged())
+    
+    # --- PIECEWISE TEMPERATURE MODEL ---
+    # The kink search (every 0.5°F from 30-85°F) and the OLS fit at the optimal kink are stored as a
+    # versioned artifact keyed by the data hash (forecasting/registry.py), so reruns only load it
+    ols_model = registry.load_or_fit('bowls_ols', model_df)
+    best_kink = ols_model.kink
+    kink_search = ols_model.kink_search
     
     # Use optimal kink point
-    model_df['temp_cold'] = model_df['Temp_High'].apply(lambda t: min(t, best_kink))
-    model_df['temp_hot'] = model_df['Temp_High'].apply(lambda t: max(0, t - best_kink))
-    
-    # --- BUILD SIMPLIFIED PIECEWISE TEMPERATURE MODEL ---
-    # Season_Impact: High (+1) = Jan/Feb/Nov/Dec, Low (-1) = Apr-Aug, Neutral (0) = Mar/Sep/Oct
-    # Weekend now includes Friday (combined payday/weekend effect)
-    # Temperature: Piecewise at optimal kink point
-    X = model_df[['temp_cold', 'temp_hot', 'is_weekend', 'is_rain', 'is_snow', 'is_federal_payday', 
-                  'is_payday_weekend',
-                  'is_2024', 'is_2025', 'season_impact']]
-    y = model_df['Bowls_Sold']
-    X = sm.add_constant(X)
-    ols_model = sm.OLS(y, X).fit()
+    model_df['temp_cold'], model_df['temp_hot'] = kink.hinge(model_df['Temp_High'], best_kink)
+    X = features.design_matrix(model_df, best_kink)
+    y = model_df[features.TARGET]
     
     # Calculate MAE and predictions
     mae = (y - ols_model.predict(X)).abs().mean()
@@ -276,9 +55,9 @@ try:
     with stat_col2:
         st.markdown("**Core Effects**")
         st.metric("🌡️ Cold", f"{ols_model.params['temp_cold']:.3f}/°F",
-                 help=f"Below {best_kink}°F")
+                 help=f"Below {best_kink:g}°F")
         st.metric("🌡️ Hot", f"{ols_model.params['temp_hot']:.3f}/°F",
-                 help=f"Above {best_kink}°F")
+                 help=f"Above {best_kink:g}°F")
         st.metric("📅 Weekend", f"+{ols_model.params['is_weekend']:.1f}")
         st.metric("🌧️ Rain", f"{ols_model.params['is_rain']:+.1f}")
         st.metric("❄️ Snow", f"{ols_model.params['is_snow']:+.1f}")
@@ -316,7 +95,7 @@ try:
                 colorbar=dict(title="Error %"),
                 line=dict(width=0.5, color='white')
             ),
-            text=[f"Date: {d}<br>Actual: {a:.0f}<br>Predicted: {p:.0f}<br>Error: {e:.1f}%" 
+            text=[f"Date: {d:%Y-%m-%d}<br>Actual: {a:.0f}<br>Predicted: {p:.0f}<br>Error: {e:.1f}%" 
                   for d, a, p, e in zip(model_df['Date'], model_df['Bowls_Sold'], 
                                        model_df['Predicted'], model_df['Error_Pct'])],
             hovertemplate='%{text}<extra></extra>',
@@ -427,6 +206,72 @@ try:
     
     st.divider()
     
+    # --- WALK-FORWARD BACKTEST (OUT OF SAMPLE) ---
+    st.subheader("🧪 Walk-Forward Backtest")
+    st.markdown(f"""
+    The fit above is **in-sample**. Here every day after the first {backtest.MIN_TRAIN_DAYS} operating days is
+    forecast by a model trained only on earlier days, then added to the fit (recursive least squares, kink fixed at {best_kink:g}°F).
+    **Alert hit rate** = share of days at or above {scoring.CAPACITY_WARNING} bowls where the forecast also raised an alert.
+    """)
+    
+    window_choice = st.radio("Training window", ["Expanding", "Sliding 90 days"], horizontal=True)
+    walk = backtest.run(model_df, best_kink, window=None if window_choice == "Expanding" else 90)
+    overall = walk.accuracy().iloc[0]
+    
+    wf_col1, wf_col2, wf_col3, wf_col4 = st.columns(4)
+    with wf_col1:
+        st.metric("Days Forecast", f"{int(overall['Days'])}")
+    with wf_col2:
+        st.metric("Out-of-Sample MAE", f"{overall['MAE']:.2f} bowls")
+    with wf_col3:
+        st.metric("MAPE", f"{overall['MAPE']:.1f}%")
+    with wf_col4:
+        hit_rate = overall['Alert_Hit_Rate']
+        st.metric("Alert Hit Rate", "n/a" if pd.isna(hit_rate) else f"{hit_rate:.0%}",
+                 help=f"{int(overall['Alert_Hits'])} of {int(overall['Alert_Days'])} high-demand days flagged")
+    
+    acc_format = {'MAE': '{:.2f}', 'MAPE': '{:.1f}%', 'Alert_Hit_Rate': '{:.0%}'}
+    acc_col1, acc_col2 = st.columns(2)
+    with acc_col1:
+        st.markdown("**By Month**")
+        st.dataframe(walk.accuracy('Month').style.format(acc_format, na_rep='–'), use_container_width=True)
+    with acc_col2:
+        st.markdown("**By Day Type**")
+        st.dataframe(walk.accuracy('Day_Type').style.format(acc_format, na_rep='–'), use_container_width=True)
+    
+    # --- ENGINE COMPARISON ---
+    # OLS, Poisson / negative-binomial GLMs and a boosted tree ensemble on the same folds, one
+    # worker process per engine (forecasting/compare.py); cached until new sales arrive
+    st.markdown("**Model Engines (same walk-forward folds)**")
+    engine_cmp = compare.run(model_df, best_kink)
+    st.dataframe(engine_cmp.summary.style.format({**acc_format, 'Fit_ms': '{:.1f}', 'Predict_ms': '{:.3f}'}, na_rep='–'),
+                 use_container_width=True)
+    st.caption("Fit / Predict = mean wall time per fold. The GLMs use a log link, so their forecasts can never go negative.")
+
+    st.divider()
+
+    # --- REVENUE MODEL (REAL NET SALES) ---
+    # Same features, kink search and walk-forward folds with CPI-deflated net sales as the
+    # target (features.REVENUE_TARGET); stored as its own artifact next to the bowls model
+    st.subheader("💵 Revenue Model: Real Net Sales")
+    revenue_df = model_df.dropna(subset=[features.REVENUE_TARGET]).reset_index(drop=True)
+    revenue_model = registry.load_or_fit('revenue_ols', revenue_df, target=features.REVENUE_TARGET)
+    revenue_walk = backtest.run(revenue_df, revenue_model.kink, target=features.REVENUE_TARGET)
+    revenue_overall = revenue_walk.accuracy().iloc[0]
+
+    rev_col1, rev_col2, rev_col3, rev_col4 = st.columns(4)
+    with rev_col1:
+        st.metric("R²", f"{revenue_model.rsquared:.3f}", help=f"{revenue_model.nobs} days, kink {revenue_model.kink:g}°F")
+    with rev_col2:
+        st.metric("📅 Weekend", f"+${revenue_model.params['is_weekend']:,.0f}")
+    with rev_col3:
+        st.metric("Out-of-Sample MAE", f"${revenue_overall['MAE']:,.0f}")
+    with rev_col4:
+        st.metric("MAPE", f"{revenue_overall['MAPE']:.1f}%")
+    st.caption("Net sales in constant 2025 dollars (pipeline/cpi.py); walk-forward folds as in the bowls backtest above.")
+
+    st.divider()
+    
     # --- MODEL STATISTICS (STARGAZER-STYLE) ---
     st.subheader("📊 OLS Regression Results")
     
@@ -449,8 +294,8 @@ try:
     # Format variable names
     var_names = {
         'const': f'Intercept (Baseline: 2026, Neutral season, Tue-Thu, Clear, Temp at kink)',
-        'temp_cold': f'Temperature ≤ {best_kink}°F (below kink, should be ~0)',
-        'temp_hot': f'Temperature > {best_kink}°F (above kink, should be negative)',
+        'temp_cold': f'Temperature ≤ {best_kink:g}°F (below kink, should be ~0)',
+        'temp_hot': f'Temperature > {best_kink:g}°F (above kink, should be negative)',
         'is_weekend': 'Weekend (Fri/Sat/Sun - combined payday/weekend)',
         'is_rain': 'Rain/Mixed (vs Clear)',
         'is_snow': 'Snow/Flurries/Heavy (vs Clear)',
@@ -509,47 +354,47 @@ try:
     st.markdown(f"""
     **Piecewise Temperature Model**: Tests whether temperature affects demand **non-linearly** with a threshold (kink).
     
-    - **Below {best_kink}°F**: Cold enough for pho (coefficient: {ols_model.params['temp_cold']:.4f})
-    - **Above {best_kink}°F**: Each degree warmer reduces demand (coefficient: {ols_model.params['temp_hot']:.4f})
+    - **Below {best_kink:g}°F**: Cold enough for pho (coefficient: {ols_model.params['temp_cold']:.4f})
+    - **Above {best_kink:g}°F**: Each degree warmer reduces demand (coefficient: {ols_model.params['temp_hot']:.4f})
     
     This "hockey stick" pattern captures that pho demand is strong in cold weather, but as temperatures rise,
     customers shift to other options like banh mi or fresh salads.
     """)
     
-    # Display kink point comparison table
-    kink_results_for_display = []
-    for kink_val in [50, 55, 60, 65, 70]:
-        # Recreate the kink analysis for display
-        model_df[f'temp_cold_{kink_val}'] = model_df['Temp_High'].apply(lambda t: min(t, kink_val))
-        model_df[f'temp_hot_{kink_val}'] = model_df['Temp_High'].apply(lambda t: max(0, t - kink_val))
-        
-        X_display = model_df[[f'temp_cold_{kink_val}', f'temp_hot_{kink_val}', 
-                             'is_weekend', 'is_rain', 'is_snow', 'is_federal_payday', 
-                             'is_payday_weekend',
-                             'is_2024', 'is_2025', 'season_impact']]
-        X_display = sm.add_constant(X_display)
-        y_display = model_df['Bowls_Sold']
-        model_display = sm.OLS(y_display, X_display).fit()
-        
-        kink_results_for_display.append({
-            'Kink (°F)': kink_val,
-            'R²': model_display.rsquared,
-            'Cold Coef': model_display.params[f'temp_cold_{kink_val}'],
-            'Hot Coef': model_display.params[f'temp_hot_{kink_val}'],
-            'Cold p-value': model_display.pvalues[f'temp_cold_{kink_val}'],
-            'Hot p-value': model_display.pvalues[f'temp_hot_{kink_val}']
-        })
-    
-    kink_display_df = pd.DataFrame(kink_results_for_display)
+    # Display kink point comparison table (every 5°F plus the optimum, from the single search above)
+    shown = kink_search.index[(kink_search.index % 5 == 0) | (kink_search.index == best_kink)]
+    kink_display_df = pd.DataFrame({
+        'Kink (°F)': shown,
+        'R²': kink_search.loc[shown, 'r2'].values,
+        'Cold Coef': kink_search.loc[shown, 'temp_cold'].values,
+        'Hot Coef': kink_search.loc[shown, 'temp_hot'].values,
+        'Cold p-value': kink_search.loc[shown, 'p_temp_cold'].values,
+        'Hot p-value': kink_search.loc[shown, 'p_temp_hot'].values,
+    })
     kink_display_df['Cold Coef'] = kink_display_df['Cold Coef'].apply(lambda x: f"{x:.4f}")
     kink_display_df['Hot Coef'] = kink_display_df['Hot Coef'].apply(lambda x: f"{x:.4f}")
     kink_display_df['Cold p-value'] = kink_display_df['Cold p-value'].apply(lambda x: f"{x:.4f}")
     kink_display_df['Hot p-value'] = kink_display_df['Hot p-value'].apply(lambda x: f"{x:.4f}")
     kink_display_df['R²'] = kink_display_df['R²'].apply(lambda x: f"{x:.4f}")
     
-    st.dataframe(kink_display_df, hide_index=True, use_container_width=True)
-    
-    st.caption(f"✅ **Optimal Kink: {best_kink}°F** (highest R²)")
+    kink_col1, kink_col2 = st.columns([1, 1])
+    with kink_col1:
+        st.dataframe(kink_display_df, hide_index=True, use_container_width=True)
+    with kink_col2:
+        fig_kink = go.Figure()
+        fig_kink.add_trace(go.Scatter(x=kink_search.index, y=kink_search['r2'],
+                                      mode='lines', name='R²', line=dict(color='#1E88E5')))
+        fig_kink.add_vline(x=best_kink, line=dict(color='#2E7D32', dash='dash'))
+        fig_kink.update_layout(xaxis_title='Kink (°F)', yaxis_title='R²', template='simple_white', height=300,
+                               margin=dict(t=10, b=10))
+        st.plotly_chart(fig_kink, use_container_width=True)
+    
+    if ols_model.kink_source == 'default':
+        st.warning(f"⚠️ No kink on the search grid has {kink.MIN_SIDE_DAYS}+ training days on each side, "
+                   f"so the model keeps the default **{best_kink:g}°F** kink ({ols_model.kink_n_hot} days above it).")
+    else:
+        st.caption(f"✅ **Optimal Kink: {best_kink:g}°F** (highest R² among kinks with {kink.MIN_SIDE_DAYS}+ days on each side: "
+                   f"{ols_model.kink_n_cold} at or below, {ols_model.kink_n_hot} above)")
     
     st.divider()
 
@@ -589,7 +434,13 @@ try:
                      legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01))
     st.plotly_chart(fig, use_container_width=True)
     
-    st.caption(f"📊 Baseline relationships shown. Piecewise temperature model with kink at {best_kink}°F. Lines show 'hockey stick' pattern: flat below kink, steep decline above. Weekend (Fri/Sat/Sun) vs Midweek (Tue-Thu). Model includes 10 features.")
+    st.caption(f"📊 Baseline relationships shown. Piecewise temperature model with kink at {best_kink:g}°F. Lines show 'hockey stick' pattern: flat below kink, steep decline above. Weekend (Fri/Sat/Sun) vs Midweek (Tue-Thu). Model includes 10 features.")
+
+    # --- SHARED DATA CACHE ---
+    with st.expander("🗄️ Shared Data Cache"):
+        footprint = cache.memory_footprint()
+        st.dataframe(footprint.style.format({'MB': '{:.2f}'}), use_container_width=True, hide_index=True)
+        st.caption(f"Frames shared by all pages in this process: {footprint['MB'].sum():.2f} MB total")
 
 except Exception as e:
     st.error(f"Model Diagnostics Error: {e}")
@@ -0,0 +1,3 @@
+"""
+Data pipeline for the Bamboo Pho dashboard (sales ingestion, weather, features)
+"""
@@ -0,0 +1,77 @@
+"""
+Basket table: one row per ticket (Transaction ID).
+
+Line items repeat the ticket's IDs, time, dining option and channel on every
+row. The basket builder sorts a batch once by ticket and reduces each run of
+rows with np.add/np.minimum.reduceat, so a ticket becomes one compact row
+(first timestamp, item count, pho bowls, gross, discounts, net, dining option,
+channel, refund flag). A line item without a Transaction ID is a ticket of
+its own, never lumped in with the others. Daily tickets, covers proxies and
+average check are then cheap reads (daily_tickets).
+"""
+import numpy as np
+import pandas as pd
+
+BASKET_COLUMNS = ['Transaction ID', 'Datetime_ET', 'Date', 'Line_Items', 'Items', 'Pho_Bowls',
+                  'Gross Sales', 'Discounts', 'Net Sales', 'Dining Option', 'Channel', 'Is_Refund']
+
+
+def ticket_codes(transaction_ids):
+    """Integer ticket code per line item and the IDs they index
+
+    A line item without a Transaction ID is its own ticket (its ID stays missing).
+    """
+    codes, ids = pd.factorize(pd.Series(transaction_ids), use_na_sentinel=True)
+    missing = codes < 0
+    codes[missing] = len(ids) + np.arange(missing.sum())
+    return codes, np.r_[np.asarray(ids, dtype=object), np.full(missing.sum(), None, dtype=object)]
+
+
+def build_baskets(df, pho_codes):
+    """One row per Transaction ID for a batch of (dictionary-coded) line items"""
+    codes, ids = ticket_codes(df['Transaction ID'])
+    # Sort by ticket, line items with a Dining Option first, so each run starts with a labelled row
+    order = np.lexsort((df['Dining Option'].isna().to_numpy(), codes))
+    codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+    def total(col):
+        return np.add.reduceat(df[col].to_numpy(dtype=float)[order], starts)
+
+    qty = df['Qty'].to_numpy(dtype=float)[order]
+    is_pho = np.isin(df['Item'].to_numpy()[order], pho_codes)
+    utc = df['Datetime_ET'].dt.tz_convert('UTC').dt.tz_localize(None).to_numpy()[order]
+    first_time = pd.DatetimeIndex(np.minimum.reduceat(utc, starts)).tz_localize('UTC').tz_convert(df['Datetime_ET'].dt.tz)
+    first = df.iloc[order[starts]]
+
+    baskets = pd.DataFrame({
+        'Transaction ID': pd.array(ids[codes[starts]], dtype='string'),
+        'Datetime_ET': first_time,
+        'Date': first_time.tz_localize(None).normalize(),
+        'Line_Items': np.diff(np.r_[starts, len(codes)]).astype('int32'),
+        'Items': np.add.reduceat(qty, starts),
+        'Pho_Bowls': np.add.reduceat(qty * is_pho, starts),
+        'Gross Sales': total('Gross Sales'),
+        'Discounts': total('Discounts'),
+        'Net Sales': total('Net Sales'),
+        'Dining Option': first['Dining Option'].to_numpy(),
+        'Channel': first['Channel'].to_numpy(),
+        'Is_Refund': (first['Event Type'] == 'Refund').to_numpy(),
+    })
+    for col in ['Dining Option', 'Channel']:
+        baskets[col] = baskets[col].astype('category')
+    return baskets.sort_values('Datetime_ET', ignore_index=True)[BASKET_COLUMNS]
+
+
+def daily_tickets(baskets):
+    """Per day: Tickets, Avg_Check (net), Items_Per_Ticket, Pho_Per_Ticket, To_Go_Share (refunds excluded)"""
+    paid = baskets[~baskets['Is_Refund']]
+    g = paid.groupby('Date', sort=True)
+    daily = pd.DataFrame({
+        'Tickets': g.size(),
+        'Avg_Check': g['Net Sales'].mean(),
+        'Items_Per_Ticket': g['Items'].mean(),
+        'Pho_Per_Ticket': g['Pho_Bowls'].mean(),
+        'To_Go_Share': (paid['Dining Option'] == 'To Go').groupby(paid['Date']).mean(),
+    })
+    return daily.reset_index()
@@ -0,0 +1,59 @@
+"""
+Process-wide frame cache shared by every dashboard page.
+
+st.cache_data keeps a separate entry per decorated function and hands each
+caller its own unpickled copy, so two pages loading the same data paid the
+full load twice and held two copies. Entries here are built once per process
+and keyed by a data version (store batch count, file mtimes). Cached frames
+are shared: callers must .copy() before adding columns.
+"""
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+_lock = threading.RLock()
+_entries = {}  # name -> (version, value)
+
+
+def get_or_build(name, version, build):
+    """Return the cached value for name, rebuilding it if version changed"""
+    with _lock:
+        hit = _entries.get(name)
+        if hit is not None and hit[0] == version:
+            return hit[1]
+        value = build()
+        _entries[name] = (version, value)
+        return value
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def _nbytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+def memory_footprint():
+    """One row per cache entry: name, rows, MB (deep memory usage)"""
+    with _lock:
+        items = list(_entries.items())
+    rows = [{
+        'Entry': name,
+        'Rows': len(value) if hasattr(value, '__len__') else None,
+        'MB': _nbytes(value) / 1e6,
+    } for name, (_, value) in items]
+    return pd.DataFrame(rows, columns=['Entry', 'Rows', 'MB'])
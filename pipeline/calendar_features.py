@@ -0,0 +1,137 @@
+"""
+Dense per-day calendar table: paydays, holidays, events and seasonality.
+
+All flags are computed once for a contiguous date range with array
+arithmetic on day numbers (no per-holiday or per-payday scans), so the cost
+is linear in days + events. Feature generation for any frame is then a
+single lookup join on Date (add_calendar_features).
+"""
+import numpy as np
+import pandas as pd
+
+from pipeline import cache
+
+# Federal (NSA) bi-weekly payday Fridays, anchored on a known payday
+PAYDAY_ANCHOR = pd.Timestamp('2026-01-09')
+
+# Lunar New Year has no closed form; extend as needed
+LUNAR_NEW_YEAR = {
+    2020: '2020-01-25', 2021: '2021-02-12', 2022: '2022-02-01', 2023: '2023-01-22',
+    2024: '2024-02-10', 2025: '2025-01-29', 2026: '2026-02-17', 2027: '2027-02-06',
+    2028: '2028-01-26', 2029: '2029-02-13', 2030: '2030-02-03', 2031: '2031-01-23',
+    2032: '2032-02-11', 2033: '2033-01-31', 2034: '2034-02-19', 2035: '2035-02-08',
+}
+
+# Flag -> (event days, first offset, last offset) windows around each event
+HOLIDAY_WINDOWS = {
+    'is_pre_holiday': ('major_holidays', -2, -1),
+    'is_post_holiday': ('major_holidays', 1, 2),
+    'is_valentines_period': ('valentines', -1, 1),
+    'is_lunar_new_year': ('lunar_new_year', 0, 2),
+}
+
+# High Demand (+1): Jan, Feb, Nov, Dec (The Winter Peak)
+# Low Demand (-1): Apr, May, Jun, Jul, Aug (The Transitions & Heat Slump)
+# Neutral (0): March, September, October
+SEASON_BY_MONTH = np.array([0, 1, 1, 0, -1, -1, -1, -1, -1, 0, 0, 1, 1])
+
+CALENDAR_FEATURES = [
+    'is_weekend', 'is_friday_base', 'month', 'year', 'season_impact',
+    'is_federal_payday', 'is_payday_weekend', 'is_pre_holiday', 'is_post_holiday',
+    'is_valentines_period', 'is_lunar_new_year', 'is_pre_holiday_friday', 'is_2024', 'is_2025',
+]
+
+
+def _nth_weekday(years, month, weekday, n):
+    """nth (1-based; -1 = last) weekday (Mon=0) of month for each year"""
+    if n > 0:
+        first = pd.to_datetime({'year': years, 'month': month, 'day': 1})
+        shift = (weekday - first.dt.weekday) % 7 + 7 * (n - 1)
+        return first + pd.to_timedelta(shift, unit='D')
+    last = pd.to_datetime({'year': years, 'month': month + 1, 'day': 1}) - pd.Timedelta(days=1)
+    return last - pd.to_timedelta((last.dt.weekday - weekday) % 7, unit='D')
+
+
+def _easter(years):
+    """Gregorian Easter Sunday (anonymous computus), vectorized over years"""
+    y = np.asarray(years)
+    a, b, c = y % 19, y // 100, y % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return pd.to_datetime({'year': y, 'month': month, 'day': day})
+
+
+def event_days(years):
+    """Event dates per kind for the given years"""
+    years = pd.Series(sorted(set(years)))
+
+    def fixed(month, day):
+        return pd.to_datetime({'year': years, 'month': month, 'day': day})
+
+    lunar = pd.to_datetime(pd.Series([LUNAR_NEW_YEAR[y] for y in years if y in LUNAR_NEW_YEAR], dtype=object))
+    major = pd.concat([
+        fixed(1, 1),                          # New Year's Day
+        lunar,                                # Lunar New Year
+        _nth_weekday(years, 2, 6, 2),         # Super Bowl Sunday (2nd Sunday in Feb)
+        fixed(2, 14),                         # Valentine's Day
+        _easter(years),                       # Easter
+        _nth_weekday(years, 5, 0, -1),        # Memorial Day
+        fixed(7, 4),                          # Independence Day
+        _nth_weekday(years, 9, 0, 1),         # Labor Day
+        _nth_weekday(years, 11, 3, 4),        # Thanksgiving
+        fixed(12, 25),                        # Christmas
+    ], ignore_index=True)
+    return {'major_holidays': major, 'valentines': fixed(2, 14), 'lunar_new_year': lunar}
+
+
+def build_calendar(start, end):
+    """One row per day in [start, end] with every calendar feature"""
+    dates = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq='D', name='Date')
+    cal = pd.DataFrame(index=dates)
+    cal['Day_of_Week'] = dates.day_name()
+    weekday = dates.weekday.to_numpy()
+    cal['is_weekend'] = (weekday >= 4).astype('int8')   # Fri/Sat/Sun
+    cal['is_friday_base'] = (weekday == 4).astype('int8')
+    cal['month'] = dates.month.to_numpy()
+    cal['year'] = dates.year.to_numpy()
+    cal['season_impact'] = SEASON_BY_MONTH[cal['month'].to_numpy()].astype('int8')
+
+    since_payday = (dates - PAYDAY_ANCHOR).days.to_numpy() % 14
+    cal['is_federal_payday'] = (since_payday == 0).astype('int8')
+    cal['is_payday_weekend'] = np.isin(since_payday, [1, 2]).astype('int8')
+
+    # Mark each event's lead/lag window by index arithmetic on day numbers
+    events = event_days(range(dates[0].year - 1, dates[-1].year + 2))
+    for flag, (kind, lo, hi) in HOLIDAY_WINDOWS.items():
+        idx = ((events[kind] - dates[0]).dt.days.to_numpy()[:, None] + np.arange(lo, hi + 1)[None, :]).ravel()
+        mark = np.zeros(len(dates), dtype='int8')
+        mark[idx[(idx >= 0) & (idx < len(dates))]] = 1
+        cal[flag] = mark
+
+    cal['is_pre_holiday_friday'] = cal['is_pre_holiday'] * cal['is_friday_base']
+    cal['is_2024'] = (cal['year'] == 2024).astype('int8')
+    cal['is_2025'] = (cal['year'] == 2025).astype('int8')
+    return cal
+
+
+def calendar_table(start, end):
+    """Process-wide cached calendar covering whole years around [start, end]"""
+    first, last = pd.Timestamp(start).year, pd.Timestamp(end).year
+    return cache.get_or_build(f'calendar:{first}-{last}', None,
+                              lambda: build_calendar(f'{first}-01-01', f'{last}-12-31'))
+
+
+def add_calendar_features(df, date_col='Date', columns=CALENDAR_FEATURES):
+    """Copy of df with calendar columns joined on date_col"""
+    days = pd.DatetimeIndex(pd.to_datetime(df[date_col])).normalize()
+    table = calendar_table(days.min(), days.max())
+    out = df.copy()
+    add = [c for c in columns if c not in out.columns]
+    out[add] = table.reindex(days)[add].to_numpy()
+    return out
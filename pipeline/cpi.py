@@ -0,0 +1,65 @@
+"""
+CPI-U (New York-Newark-Jersey City, NY-NJ-PA; BLS series CUURS12ASA0) and real dollars.
+
+The BLS workbook (CPI 2015 - 2025 NE.xlsx) is a year × month table under a
+block of series notes. It is parsed once into a monthly index and cached
+per process, keyed by the file's mtime: reruns never reopen the xlsx, and
+replacing the workbook with a newer download is picked up automatically.
+
+Nominal amounts are deflated to constant BASE_YEAR dollars (that year's
+annual average index). Months past the end of the workbook use the latest
+month published, and months before it the first.
+"""
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from pipeline import cache
+from pipeline.paths import data_path
+
+CPI_FILE = 'CPI 2015 - 2025 NE.xlsx'
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+BASE_YEAR = 2025
+
+
+def parse_workbook(path):
+    """Monthly CPI as a float Series on a monthly PeriodIndex"""
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', 'Workbook contains no default style', UserWarning)
+        raw = pd.read_excel(path, header=None, engine='openpyxl')
+    header = raw.index[raw.iloc[:, 0].astype(str).str.strip() == 'Year'][0]
+    table = raw.iloc[header + 1:].set_axis(raw.iloc[header].astype(str).str.strip(), axis=1)
+    table = table[pd.to_numeric(table['Year'], errors='coerce').notna()]
+    long = table.melt(id_vars='Year', value_vars=[m for m in MONTHS if m in table], var_name='Month', value_name='CPI')
+    long['CPI'] = pd.to_numeric(long['CPI'], errors='coerce')
+    long = long.dropna(subset=['CPI'])
+    periods = pd.PeriodIndex.from_fields(year=long['Year'].astype(int).to_numpy(),
+                                         month=long['Month'].map(MONTHS.index).to_numpy() + 1, freq='M')
+    return pd.Series(long['CPI'].to_numpy(dtype=float), index=periods, name='CPI').sort_index()
+
+
+def load_cpi():
+    """Monthly CPI index (cached; re-parsed only when the workbook changes)"""
+    path = data_path(CPI_FILE)
+    return cache.get_or_build('cpi', os.path.getmtime(path), lambda: parse_workbook(path))
+
+
+def base_level(cpi, base_year=BASE_YEAR):
+    """Average index over base_year"""
+    return float(cpi[cpi.index.year == base_year].mean())
+
+
+def deflator(dates, cpi, base_year=BASE_YEAR):
+    """Multiplier turning nominal dollars on each date into base_year dollars"""
+    months = pd.DatetimeIndex(dates).to_period('M')
+    full = pd.period_range(min(cpi.index.min(), months.min()), max(cpi.index.max(), months.max()), freq='M')
+    level = cpi.reindex(full).ffill().bfill()
+    return base_level(cpi, base_year) / level.reindex(months).to_numpy()
+
+
+def deflate(values, dates, cpi=None, base_year=BASE_YEAR):
+    """Nominal amounts on dates -> constant base_year dollars"""
+    cpi = load_cpi() if cpi is None else cpi
+    return np.asarray(values, dtype=float) * deflator(dates, cpi, base_year)
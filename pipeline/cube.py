@@ -0,0 +1,72 @@
+"""
+Daily sales cube: line items pre-aggregated by date × hour × Category × Item × Dining Option.
+
+Built in one groupby pass per ingested batch (pipeline/sales_store.py) and
+stored next to the partitions, so questions like Dining Option mix, category
+sales or afternoon vs evening demand are answered by rolling up a few
+thousand cube cells instead of rescanning every line item. Category and
+Item are stored as menu dictionary codes (pipeline/menu.py, decoded by
+sales_store.read_cube) and Dining Option as a categorical.
+
+Transactions counts distinct tickets per cell; a ticket that spans several
+cells is counted once in each, so rolled-up ticket counts are "tickets that
+contain the rolled-up items". Exact per-day ticket totals are in the daily
+table (sales_store.read_daily).
+"""
+import numpy as np
+import pandas as pd
+
+CUBE_KEYS = ['Date', 'Hour', 'Category', 'Item', 'Dining Option']
+CODE_KEYS = ['Category', 'Item']
+CATEGORICAL_KEYS = ['Dining Option']
+# Additive measures (summed on rollup)
+CUBE_MEASURES = ['Qty', 'Gross Sales', 'Net Sales', 'Discounts', 'Line_Items', 'Transactions']
+
+
+def _as_categories(cube):
+    for col in CATEGORICAL_KEYS:
+        cube[col] = cube[col].astype('category')
+    for col in CODE_KEYS:
+        cube[col] = cube[col].astype('int32')
+    cube['Hour'] = cube['Hour'].astype('int8')
+    return cube
+
+
+def build_cube(df):
+    """Cube cells for a batch of typed, dictionary-coded line items (see sales_store.ingest_export)"""
+    keyed = pd.DataFrame({
+        'Date': df['Date'],
+        'Hour': df['Datetime_ET'].dt.hour,
+        'Category': df['Category'],
+        'Item': df['Item'],
+        'Dining Option': df['Dining Option'],
+        'Qty': df['Qty'],
+        'Gross Sales': df['Gross Sales'],
+        'Net Sales': df['Net Sales'],
+        'Discounts': df['Discounts'],
+        'Transaction ID': df['Transaction ID'],
+    })
+    g = keyed.groupby(CUBE_KEYS, observed=True, dropna=False, sort=True)
+    cube = g[['Qty', 'Gross Sales', 'Net Sales', 'Discounts']].sum()
+    cube['Line_Items'] = g.size()
+    cube['Transactions'] = g['Transaction ID'].nunique()
+    return _as_categories(cube.reset_index())
+
+
+def merge_cubes(*cubes):
+    """Sum cubes built from disjoint batches of line items"""
+    parts = [c.astype({col: object for col in CATEGORICAL_KEYS}) for c in cubes if c is not None and len(c)]
+    if not parts:
+        return cubes[0]
+    merged = pd.concat(parts, ignore_index=True).groupby(CUBE_KEYS, dropna=False, sort=True)[CUBE_MEASURES].sum()
+    return _as_categories(merged.reset_index())
+
+
+def rollup(cube, by, measures=None, where=None):
+    """Sum measures over the cube grouped by one or more keys
+
+    where is an optional boolean mask over the cube's cells (e.g. one Category).
+    """
+    if where is not None:
+        cube = cube[np.asarray(where)]
+    return cube.groupby(by, observed=True, dropna=False, sort=True)[measures or CUBE_MEASURES].sum()
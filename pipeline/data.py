@@ -0,0 +1,141 @@
+"""
+Shared sales / weather / merged loaders for all dashboard pages.
+
+Every page calls the same loaders, which sit on the process-wide cache in
+pipeline/cache.py: switching pages reuses the frames already in memory
+instead of re-reading and re-merging every file.
+"""
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from pipeline import baskets, cache, cpi, cube, menu, modifiers, sales_store, weather
+from pipeline.paths import BASE_DIR, data_path
+
+# Historical exports that may live on the external drive instead of the project folder
+SALES_ARCHIVES = ['2024_Bamboo_Data.csv', '2025_Bamboo_Data.csv']
+WEATHER_FILES = ['camp_hill_2024_weather_processed.csv', 'camp_hill_2025_weather.csv', 'jan_weather.csv', 'feb_weather.csv']
+
+
+def sync_sales():
+    """Ingest new Square exports into the sales store; returns the store version"""
+    sales_dirs = [BASE_DIR] + [os.path.dirname(data_path(f)) for f in SALES_ARCHIVES]
+    sales_store.sync(sales_store.find_exports(sales_dirs))
+    return sales_store.load_manifest()['batches']
+
+
+def weather_paths():
+    """Weather CSVs in precedence order (later files win): synced year files, then WEATHER_FILES"""
+    years = [weather.year_file(y) for y in range(2024, date.today().year + 1)]
+    return list(dict.fromkeys(years + [data_path(f) for f in WEATHER_FILES]))
+
+
+def _weather_version():
+    paths = weather_paths()
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
+
+
+def _cpi_version():
+    return os.path.getmtime(data_path(cpi.CPI_FILE))
+
+
+def load_sales(columns=None):
+    """Line items from the sales store (only the requested columns)"""
+    key = 'sales' if columns is None else 'sales:' + ','.join(columns)
+    return cache.get_or_build(key, sync_sales(), lambda: sales_store.read_sales(columns=columns))
+
+
+def load_daily_sales():
+    """Per-day aggregates maintained by the incremental ingest"""
+    return cache.get_or_build('daily_sales', sync_sales(), sales_store.read_daily)
+
+
+def load_daily_revenue():
+    """Gross / Net Sales per day, nominal and in constant CPI base-year dollars (Real_*)"""
+    def build():
+        daily = load_daily_sales()[['Date', 'Gross Sales', 'Net Sales']].copy()
+        factor = cpi.deflator(daily['Date'], cpi.load_cpi())
+        daily['Real_Gross_Sales'] = daily['Gross Sales'] * factor
+        daily['Real_Net_Sales'] = daily['Net Sales'] * factor
+        return daily
+
+    return cache.get_or_build('daily_revenue', (sync_sales(), _cpi_version()), build)
+
+
+def load_baskets():
+    """One row per ticket (pipeline/baskets.py)"""
+    return cache.get_or_build('baskets', sync_sales(), sales_store.read_baskets)
+
+
+def load_daily_tickets():
+    """Tickets, average check, items and pho per ticket, to-go share per day"""
+    return cache.get_or_build('daily_tickets', sync_sales(), lambda: baskets.daily_tickets(load_baskets()))
+
+
+def load_cube():
+    """Date × hour × Category × Item × Dining Option cube (pipeline/cube.py); query this, not line items"""
+    return cache.get_or_build('cube', sync_sales(), sales_store.read_cube)
+
+
+def load_menu():
+    """Item taxonomy (Item_Code -> Item_Name, Category, Family, Is_Voided), see pipeline/menu.py"""
+    return cache.get_or_build('menu', sync_sales(),
+                              lambda: menu.item_taxonomy(menu.load_dictionary(sales_store.STORE_DIR)))
+
+
+def load_modifier_menu():
+    """Modifier taxonomy (Modifier_Code -> Size, Broth), see pipeline/modifiers.py"""
+    return cache.get_or_build('modifier_menu', sync_sales(), lambda: modifiers.modifier_taxonomy(
+        menu.load_dictionary(sales_store.STORE_DIR)['Modifiers Applied']))
+
+
+def load_modifiers():
+    """Long table of parsed modifiers, one row per (line item, modifier)"""
+    return cache.get_or_build('modifiers', sync_sales(), sales_store.read_modifiers)
+
+
+def modifier_demand(group, family=None):
+    """Date × modifier quantities for a group ('broth', 'size', 'protein', ...), optionally one product family"""
+    items = None if family is None else menu.codes_for(load_menu(), 'Family', [family])
+    return modifiers.daily_demand(load_modifiers(), group, items)
+
+
+def daily_bowls():
+    """Pho bowls per sales day, rolled up from the cube"""
+    cells = load_cube()
+    pho = np.isin(cells['Item'].cat.codes, menu.codes_for(load_menu(), 'Family', ['pho']))
+    bowls = cube.rollup(cells, 'Date', ['Qty'], where=pho)['Qty']
+    days = pd.DatetimeIndex(cells['Date'].unique()).sort_values()
+    return bowls.reindex(days, fill_value=0.0).rename('Bowls_Sold').rename_axis('Date').reset_index()
+
+
+def load_weather():
+    """Unified daily weather (Date, Temp_High, Precip_Type, Source, Filled), short gaps interpolated"""
+    return cache.get_or_build('weather', _weather_version(), lambda: weather.build_store(weather_paths()))
+
+
+def load_weather_range(start, end):
+    """Contiguous daily weather for [start, end]; unknown days are NaN, never 0"""
+    return weather.select_range(load_weather(), start, end)
+
+
+def _build_merged():
+    daily_pho = daily_bowls()
+    merged = pd.merge(daily_pho, load_weather()[['Date', 'Temp_High', 'Precip_Type', 'Filled']], on='Date', how='left')
+    merged['Date_dt'] = pd.to_datetime(merged['Date'])
+    merged['Day_of_Week'] = merged['Date_dt'].dt.day_name()
+    merged['Precip_Type'] = merged['Precip_Type'].fillna('None')
+    merged['Filled'] = merged['Filled'].astype('boolean').fillna(False).astype(bool)
+    # Ticket-level daily measures, available as model features
+    merged = merged.merge(load_daily_tickets()[['Date', 'Tickets', 'Avg_Check']], on='Date', how='left')
+    # Net revenue, nominal and CPI-deflated (features.REVENUE_TARGET)
+    merged = merged.merge(load_daily_revenue()[['Date', 'Net Sales', 'Real_Net_Sales']], on='Date', how='left')
+    return merged
+
+
+def load_merged():
+    """Daily pho bowls joined with weather (one row per sales day)"""
+    version = (sync_sales(), _weather_version(), _cpi_version())
+    return cache.get_or_build('merged', version, _build_merged)
@@ -0,0 +1,186 @@
+"""
+Streaming converter for NOAA GHCN-Daily CSV exports (Climate Data Online).
+
+An export may cover any number of stations and years. It is read in chunks
+of CHUNK_ROWS. Each chunk is immediately cut to the wanted stations and
+date range and reduced to TMAX / PRCP / SNOW / WT* columns, so memory
+follows the output (stations × days), not the file size.
+
+By default each day is an inverse-distance blend of every station in the
+station index (pipeline/stations.py) that reported that day, within range
+of the restaurant. Stations are indexed from the export's own LATITUDE /
+LONGITUDE columns; an export without them converts by priority. TMAX, PRCP and SNOW are weighted means, and the
+weather-type flags are a weighted vote. With method='priority', each day
+instead takes its temperature from the highest-priority station that
+reported TMAX, and its precipitation (PRCP / SNOW / weather-type flags)
+from the highest-priority station that reported any of them. Without an
+explicit priority, stations are ranked by TMAX coverage. The precip type is
+then classified with vectorized rules (classify_precip) and the days are
+merged into the weather store's year files (or one output CSV). Standard
+units are assumed: °F and inches.
+
+Usage:
+    python convert_weather_data.py "Jan 1 2025_ Jan 30 2026 Weather.csv"
+    python convert_weather_data.py export.csv --start 2025-01-01 --end 2026-01-31 --stations USC00363698 US1PADP0035
+    python convert_weather_data.py export.csv --method priority --stations USC00363698 US1PADP0035
+    python convert_weather_data.py export.csv --output jan_weather.csv --start 2026-01-01 --end 2026-01-31
+"""
+import numpy as np
+import pandas as pd
+
+from pipeline import stations as station_index
+from pipeline import weather
+
+CHUNK_ROWS = 200_000
+VALUE_COLUMNS = ['TMAX', 'PRCP', 'SNOW']
+# GHCN weather-type flags used by the precip rules
+WT_SLEET = ['WT04', 'WT06', 'WT15', 'WT17']   # ice pellets, glaze, freezing drizzle, freezing rain
+WT_RAIN = ['WT14', 'WT16']                    # drizzle, rain
+WT_SNOW = ['WT18']                            # snow / snow pellets
+WT_COLUMNS = WT_SLEET + WT_RAIN + WT_SNOW
+HEAVY_SNOW_IN = 2.0
+SNOW_IN = 0.5
+MIXED_MAX_F = 34
+
+
+def _flags(df, columns):
+    """Any of the WT columns set (absent columns count as unset)"""
+    present = [c for c in columns if c in df]
+    return df[present].notna().any(axis=1).to_numpy() if present else np.zeros(len(df), dtype=bool)
+
+
+def classify_precip(df):
+    """Precip_Type for rows with TMAX, PRCP, SNOW and any WT* columns (first matching rule wins)"""
+    prcp = df['PRCP'].fillna(0).to_numpy(dtype=float)
+    snow = df['SNOW'].fillna(0).to_numpy(dtype=float)
+    tmax = df['TMAX'].to_numpy(dtype=float)
+    sleet, rain, snowing = _flags(df, WT_SLEET), _flags(df, WT_RAIN), _flags(df, WT_SNOW)
+    wet = (prcp > 0) | rain
+
+    rules = [
+        ('Heavy Snow', snow > HEAVY_SNOW_IN),
+        ('Snow', snow > SNOW_IN),
+        ('Flurries', (snow > 0) | (snowing & ~wet)),
+        ('Mixed', sleet | (snowing & wet) | ((prcp > 0) & (tmax <= MIXED_MAX_F))),
+        ('Rain', wet),
+    ]
+    return np.select([cond for _, cond in rules], [label for label, _ in rules], default='None')
+
+
+def read_chunks(path, start=None, end=None, stations=None, chunk_rows=CHUNK_ROWS):
+    """Yield per-chunk (STATION, Date, TMAX, PRCP, SNOW, WT*) frames cut to stations and [start, end]"""
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = ['STATION', 'DATE'] + [c for c in VALUE_COLUMNS + WT_COLUMNS if c in header]
+    for chunk in pd.read_csv(path, usecols=usecols, dtype={'STATION': str, 'DATE': str}, chunksize=chunk_rows):
+        dates = pd.to_datetime(chunk['DATE'], errors='coerce')
+        keep = dates.notna().to_numpy()
+        if start is not None:
+            keep = keep & (dates >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            keep = keep & (dates <= pd.Timestamp(end)).to_numpy()
+        if stations is not None:
+            keep = keep & chunk['STATION'].isin(stations).to_numpy()
+        if not keep.any():
+            continue
+        out = chunk[keep].drop(columns='DATE').assign(Date=dates[keep])
+        for col in VALUE_COLUMNS:
+            out[col] = pd.to_numeric(out[col], errors='coerce') if col in out else np.nan
+        yield out
+
+
+def station_priority(readings):
+    """Stations ordered by number of days with TMAX (then any reading)"""
+    coverage = readings.groupby('STATION').agg(tmax=('TMAX', 'count'), rows=('Date', 'size'))
+    return coverage.sort_values(['tmax', 'rows'], ascending=False).index.tolist()
+
+
+def _first_by_priority(readings, has_value, rank):
+    """Per date, the row of the best-ranked station for which has_value holds"""
+    rows = readings[has_value].assign(_rank=rank[has_value])
+    return rows.sort_values(['Date', '_rank'], kind='stable').drop_duplicates('Date').set_index('Date')
+
+
+def daily_weather(readings, priority=None):
+    """Date, Temp_High, Precip_Type, Station: one row per date with a per-day station fallback"""
+    readings = readings.drop_duplicates(['STATION', 'Date'], keep='last')
+    priority = list(priority) if priority else station_priority(readings)
+    # Stations not in an explicit priority list rank after it
+    rank = readings['STATION'].map({s: i for i, s in enumerate(priority)}).fillna(len(priority)).to_numpy()
+
+    has_precip = readings[['PRCP', 'SNOW']].notna().any(axis=1).to_numpy() | _flags(readings, WT_COLUMNS)
+    temp = _first_by_priority(readings, readings['TMAX'].notna().to_numpy(), rank)
+    precip = _first_by_priority(readings, has_precip, rank)
+
+    days = temp.index.union(precip.index)
+    wt = [c for c in WT_COLUMNS if c in precip]
+    day = precip.reindex(days)[['PRCP', 'SNOW'] + wt].assign(TMAX=temp['TMAX'].reindex(days))
+    return pd.DataFrame({
+        'Date': days,
+        'Temp_High': day['TMAX'].to_numpy(),
+        'Precip_Type': classify_precip(day),
+        'Station': temp['STATION'].reindex(days).fillna(precip['STATION'].reindex(days)).to_numpy(),
+    })
+
+
+def blend_daily(readings, index, max_km=station_index.MAX_DISTANCE_KM):
+    """Date, Temp_High, Precip_Type, Stations (TMAX reports blended): inverse-distance blend per day"""
+    readings = readings.drop_duplicates(['STATION', 'Date'], keep='last')
+    near = index[index['Distance_km'] <= max_km]
+    ids = [s for s in near.index if s in set(readings['STATION'])]
+    readings = readings[readings['STATION'].isin(ids)]
+    weights = station_index.idw_weights(near.loc[ids, 'Distance_km'])
+    days = pd.DatetimeIndex(np.sort(readings['Date'].unique()), name='Date')
+
+    # A station votes on the weather-type flags only on days it reported precipitation
+    has_precip = readings[['PRCP', 'SNOW']].notna().any(axis=1).to_numpy() | _flags(readings, WT_COLUMNS)
+    readings = readings.assign(**{
+        flag: np.where(has_precip, _flags(readings, group), np.nan)
+        for flag, group in [('WT04', WT_SLEET), ('WT16', WT_RAIN), ('WT18', WT_SNOW)]
+    })
+
+    def matrix(column):
+        return station_index.station_matrix(readings, column, ids).reindex(days).to_numpy(dtype=float)
+
+    tmax = matrix('TMAX')
+    day = pd.DataFrame({col: station_index.blend(matrix(col), weights) for col in ['TMAX', 'PRCP', 'SNOW']}, index=days)
+    for flag in ['WT04', 'WT16', 'WT18']:
+        day[flag] = np.where(station_index.blend(matrix(flag), weights) >= 0.5, 1.0, np.nan)
+    return pd.DataFrame({
+        'Date': days,
+        'Temp_High': day['TMAX'].round(1).to_numpy(),
+        'Precip_Type': classify_precip(day),
+        'Stations': (~np.isnan(tmax)).sum(axis=1),
+    })
+
+
+def convert(path, start=None, end=None, stations=None, output=None, chunk_rows=CHUNK_ROWS, method='idw',
+            stations_file=None):
+    """Convert a GHCN export and merge it into the weather store; returns {csv path: days with data}
+
+    method='idw' adds the export's station coordinates to the station index
+    and blends indexed stations by distance; 'priority' (or an export with
+    no indexed station) takes each day from the first station in stations
+    that reported.
+    """
+    chunks = list(read_chunks(path, start, end, stations, chunk_rows))
+    if not chunks:
+        return {}
+    readings = pd.concat(chunks, ignore_index=True)
+    index = None
+    if method == 'idw':
+        station_index.add_from_export(path, stations_file, chunk_rows)
+        index = station_index.load_stations(stations_file)
+    if index is not None and readings['STATION'].isin(index.index).any():
+        daily = blend_daily(readings, index)
+    else:
+        daily = daily_weather(readings, stations)
+    daily = daily[daily['Temp_High'].notna()]
+
+    if output:
+        lo, hi = pd.Timestamp(start or daily['Date'].min()), pd.Timestamp(end or daily['Date'].max())
+        return {output: weather.merge_into_csv(daily, output, lo, hi)}
+    written = {}
+    for year, part in daily.groupby(daily['Date'].dt.year):
+        path_out = weather.year_file(year)
+        written[path_out] = weather.merge_into_csv(part, path_out, pd.Timestamp(year, 1, 1), pd.Timestamp(year, 12, 31))
+    return written
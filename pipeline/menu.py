@@ -0,0 +1,150 @@
+"""
+Menu dictionary and taxonomy.
+
+Item, Category, Price Point Name and Modifiers Applied are interned as
+integer codes at ingest against an append-only dictionary
+(sales_store/_dictionary.json), so a code means the same label in every
+partition, in the cube and across syncs. Readers turn the codes back into
+pandas categoricals whose .cat.codes are these dictionary codes.
+
+The taxonomy maps every item code to a product family (pho, banh mi, tea,
+appetizer, ...; modifier codes are parsed in pipeline/modifiers.py), so a filter
+like "pho bowls" is an integer-set lookup instead of a substring scan over
+line items. Labels are matched after trimming and accent folding, since the
+Square labels carry stray spaces ("Appetizers ", "Banh Mi  hoagies").
+"""
+import json
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+DICTIONARY_FILE = '_dictionary.json'
+DICTIONARY_FIELDS = ['Category', 'Item', 'Price Point Name', 'Modifiers Applied']
+
+# Product family by item name (first match wins), matched on clean_label() text
+FAMILY_PATTERNS = [
+    ('pho', r'\bpho\b'),
+    ('broth', r'\bbroth\b'),
+    ('noodle soup', r'bun bo hue'),
+    ('banh mi', r'banh mi'),
+    ('banh bao', r'banh bao'),
+    ('banh xeo', r'banh xeo'),
+    ('vermicelli', r'vermicelli'),
+    ('fried rice', r'fried rice'),
+    ('rice plate', r'rice ?plate'),
+    ('lo mein', r'lo mein'),
+    ('appetizer', r'\brolls?\b|skewer|shrimp balls?'),
+    ('tea', r'\btea\b'),
+    ('smoothie', r'smoothie|slushie'),
+    ('coffee', r'coffee|cafe'),
+    ('packaging', r'to ?go'),
+    ('extra', r'^extra\b|boba|^sauce|custom amount'),
+]
+# Fallback family by (clean) category
+CATEGORY_FAMILIES = {
+    'pho': 'pho', 'appetizers': 'appetizer', 'banh mi hoagies': 'banh mi', 'banh bao': 'banh bao',
+    'banh xeo': 'banh xeo', 'beverage': 'beverage', 'fried rice': 'fried rice', 'iced tea': 'tea',
+    'milk tea': 'tea', 'lo mein': 'lo mein', 'rice plates': 'rice plate', 'slushie': 'smoothie',
+    'smoothies': 'smoothie', 'specialities': 'entree', 'vermicelli': 'vermicelli',
+}
+VOIDED_SUFFIX = '(Voided)'
+
+
+def clean_label(label):
+    """Lowercase, accent-folded, single-spaced label for matching"""
+    if not isinstance(label, str):
+        return ''
+    text = unicodedata.normalize('NFKD', label.replace('đ', 'd').replace('Đ', 'D'))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.lower().split())
+
+
+# --- DICTIONARY (stable integer codes) ---
+
+def load_dictionary(store_dir):
+    """{field: [label, ...]} where a label's list position is its code; plus Item_Category"""
+    path = os.path.join(store_dir, DICTIONARY_FILE)
+    if not os.path.exists(path):
+        return {**{f: [] for f in DICTIONARY_FIELDS}, 'Item_Category': []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_dictionary(dictionary, store_dir):
+    path = os.path.join(store_dir, DICTIONARY_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(dictionary, f, ensure_ascii=False, indent=0)
+    os.replace(path + '.tmp', path)
+
+
+def intern(values, vocabulary):
+    """int32 codes for values (missing = -1), appending unseen labels to vocabulary in place"""
+    uniques = pd.unique(pd.Series(values, dtype=object).dropna())
+    new = pd.Index(uniques).difference(pd.Index(vocabulary), sort=False)
+    vocabulary.extend(new.tolist())
+    return pd.Index(vocabulary).get_indexer(pd.Series(values, dtype=object)).astype('int32')
+
+
+def intern_frame(df, dictionary):
+    """Copy of df with DICTIONARY_FIELDS replaced by dictionary codes (dictionary grows in place)"""
+    out = df.copy()
+    for field in DICTIONARY_FIELDS:
+        out[field] = intern(df[field], dictionary[field])
+    # Category an item was first seen under (taxonomy fallback)
+    first_cat = out.drop_duplicates('Item').set_index('Item')['Category']
+    item_cat = dictionary['Item_Category']
+    item_cat.extend([-1] * (len(dictionary['Item']) - len(item_cat)))
+    for item, cat in first_cat.items():
+        if item >= 0 and item_cat[item] < 0:
+            item_cat[item] = int(cat)
+    return out
+
+
+def decode(codes, vocabulary):
+    """Categorical whose .cat.codes are the dictionary codes"""
+    return pd.Categorical.from_codes(np.asarray(codes, dtype='int32'), categories=pd.Index(vocabulary, dtype=object))
+
+
+def decode_frame(df, dictionary):
+    """Turn any dictionary-coded columns of df back into categoricals"""
+    for field in DICTIONARY_FIELDS:
+        if field in df.columns:
+            df[field] = decode(df[field], dictionary[field])
+    return df
+
+
+# --- TAXONOMY ---
+
+def family_of(item, category=None):
+    name = clean_label(item)
+    for family, pattern in FAMILY_PATTERNS:
+        if re.search(pattern, name):
+            return family
+    return CATEGORY_FAMILIES.get(clean_label(category), 'other')
+
+
+def item_taxonomy(dictionary):
+    """One row per item code: Item, Item_Name (trimmed, voided suffix dropped), Category, Family, Is_Voided"""
+    items = pd.Series(dictionary['Item'], dtype=object)
+    cat_codes = np.asarray(dictionary['Item_Category'] + [-1] * (len(items) - len(dictionary['Item_Category'])), dtype=int)
+    categories = np.array(dictionary['Category'] + [None], dtype=object)[cat_codes]
+    voided = items.str.endswith(VOIDED_SUFFIX)
+    names = items.str.replace(VOIDED_SUFFIX, '', regex=False).str.split().str.join(' ')
+    return pd.DataFrame({
+        'Item': items,
+        'Item_Name': names,
+        'Category': pd.Series(categories, dtype=object).str.strip(),
+        'Family': [family_of(n, c) for n, c in zip(names, categories)],
+        'Is_Voided': voided.to_numpy(),
+    }).rename_axis('Item_Code')
+
+
+def codes_for(taxonomy, column='Family', values=('pho',), include_voided=True):
+    """Integer codes whose taxonomy column is in values (for np.isin filters)"""
+    mask = taxonomy[column].isin(list(values))
+    if not include_voided and 'Is_Voided' in taxonomy:
+        mask &= ~taxonomy['Is_Voided']
+    return taxonomy.index[mask].to_numpy()
@@ -0,0 +1,141 @@
+"""
+Modifier parser: Square "Modifiers Applied" lists -> normalised (group, modifier) rows.
+
+A label such as "Large, Beef Broth, Rare Beef (tai), Shrimp & pork ( Tom & Heo)"
+is split into tokens, the Vietnamese glosses in parentheses are dropped,
+accents folded, and each token is classified by a fixed list of compiled
+rules into a group (size, broth, protein, temperature, flavor, topping,
+sauce, side, substitution, style) with a canonical name ("Rare Beef").
+Combos ("Shrimp & pork") become one row per protein and "Extra ..." tokens
+are flagged as extras of the underlying modifier.
+
+Parsing runs once per distinct label (menu dictionary code, cached), never
+per line item. At ingest the parsed tokens are joined onto the batch by code
+and stored as a long table keyed by line item (sales_store/_modifiers.parquet),
+from which broth, size and protein demand per day are simple rollups.
+"""
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+from pipeline.menu import clean_label
+
+MODIFIER_GROUPS = ['size', 'broth', 'protein', 'temperature', 'flavor', 'topping',
+                   'sauce', 'side', 'substitution', 'style', 'other']
+
+# Canonical protein names (clean_label text, "grilled"/"only"/"extra" handled separately)
+PROTEINS = {
+    'rare beef': 'Rare Beef', 'well done beef': 'Well Done Beef', 'tendon': 'Tendon',
+    'meatball': 'Meatball', 'meatballs': 'Meatball', 'beef': 'Beef', 'chicken': 'Chicken',
+    'shrimp': 'Shrimp', 'pork': 'Pork', 'boneless pork': 'Boneless Pork', 'pork boneless': 'Boneless Pork',
+    'pork chop': 'Pork Chop', 'tofu': 'Tofu', 'fishball': 'Fishball', 'squid': 'Squid',
+    'veggie': 'Veggie', 'vegetables': 'Veggie', 'seafood': 'Seafood',
+}
+# Spelling variants folded before classification
+SYNONYMS = {'eggrolls': 'egg rolls', 'meatballs': 'meatball'}
+BROTHS = {'beef': 'Beef', 'chicken': 'Chicken', 'vegetable': 'Vegetable', 'vegetables': 'Vegetable',
+          'veggie': 'Vegetable'}
+
+# (group, pattern) checked in order on the cleaned token; first match wins
+MODIFIER_RULES = [(group, re.compile(pattern)) for group, pattern in [
+    ('size', r'^(small|regular|large)$'),
+    ('broth', r'^(\w+) broth$'),
+    ('temperature', r'^(hot|iced)$'),
+    ('style', r'^special\b'),
+    ('substitution', r'substitute|^egg noodles$|^plain lo mein$'),
+    ('sauce', r'sauce|chili oil|hoisin'),
+    ('side', r'egg ?rolls?$|fried rice side|\brice$|\begg$|^pate$|noodles$|banh xeo|^extra vegetables$'),
+    ('topping', r'boba|pearls|jelly|aloe'),
+    ('flavor', r'tea$|^(mango|strawberry|taro|black sugar|coconut|lychee|passionfruit|avocado|honeydew|matcha|'
+               r'peach|pineapple|ginger|watermelon|dragonfruit|banana|blueberry|pomegranate|green apple|honey)$'),
+]]
+
+_PARENS = re.compile(r'\([^)]*\)?')
+_SPLIT = re.compile(r',(?![^()]*\))')
+
+
+def _protein(text):
+    """Canonical protein for a cleaned token (None if it is not one)"""
+    text = re.sub(r'^grilled ', '', re.sub(r' only$', '', text))
+    return PROTEINS.get(text)
+
+
+@lru_cache(maxsize=None)
+def parse_token(token):
+    """[(group, modifier, extra)] for one raw token (several for protein combos)"""
+    text = ' '.join(clean_label(_PARENS.sub(' ', token)).split())
+    if not text:
+        return []
+    extra = text.startswith('extra ') and text != 'extra vegetables'
+    base = text[6:].strip() if extra else text
+    base = SYNONYMS.get(base, base)
+
+    parts = [p.strip() for p in base.split('&')]
+    proteins = [_protein(p) for p in parts]
+    if all(proteins):
+        grilled = base.startswith('grilled ')
+        return [('protein', ('Grilled ' if grilled and len(parts) == 1 else '') + p, extra) for p in proteins]
+
+    for group, rule in MODIFIER_RULES:
+        m = rule.search(base)
+        if m:
+            if group == 'broth':
+                return [('broth', BROTHS.get(m.group(1), m.group(1).title()), extra)]
+            if group == 'style':
+                return [('style', 'Special', extra)]
+            return [(group, base.title(), extra)]
+    return [('other', base.title(), extra)]
+
+
+@lru_cache(maxsize=None)
+def parse_label(label):
+    """Tuple of (group, modifier, extra) for a whole Modifiers Applied label"""
+    if not isinstance(label, str):
+        return ()
+    return tuple(row for token in _SPLIT.split(label) for row in parse_token(token.strip()))
+
+
+def token_table(vocabulary):
+    """Long table of parsed tokens per Modifiers Applied dictionary code"""
+    rows = [(code, group, modifier, extra)
+            for code, label in enumerate(vocabulary)
+            for group, modifier, extra in parse_label(label)]
+    tokens = pd.DataFrame(rows, columns=['Modifier_Code', 'Group', 'Modifier', 'Extra'])
+    tokens['Modifier_Code'] = tokens['Modifier_Code'].astype('int32')
+    tokens['Group'] = pd.Categorical(tokens['Group'], categories=MODIFIER_GROUPS)
+    return tokens
+
+
+def modifier_taxonomy(vocabulary):
+    """One row per Modifiers Applied code: Size and Broth (NaN when not specified)"""
+    tokens = token_table(vocabulary)
+    out = pd.DataFrame({'Modifiers Applied': pd.Series(vocabulary, dtype=object)}).rename_axis('Modifier_Code')
+    for group, col in [('size', 'Size'), ('broth', 'Broth')]:
+        first = tokens[tokens['Group'] == group].drop_duplicates('Modifier_Code').set_index('Modifier_Code')['Modifier']
+        out[col] = first.reindex(out.index).astype(object)
+    return out
+
+
+def explode(batch, vocabulary):
+    """Long (Line_ID, Date, Item, Group, Modifier, Extra, Qty) rows for dictionary-coded line items"""
+    lines = pd.DataFrame({
+        'Line_ID': batch['Line_ID'].to_numpy(),
+        'Date': batch['Date'].to_numpy(),
+        'Item': batch['Item'].to_numpy(),
+        'Modifier_Code': batch['Modifiers Applied'].to_numpy(),
+        'Qty': batch['Qty'].to_numpy(),
+    })
+    lines = lines[lines['Modifier_Code'] >= 0]
+    long = lines.merge(token_table(vocabulary), on='Modifier_Code', how='inner', sort=False)
+    long['Modifier'] = long['Modifier'].astype('category')
+    return long[['Line_ID', 'Date', 'Item', 'Group', 'Modifier', 'Extra', 'Qty']]
+
+
+def daily_demand(long, group, items=None):
+    """Date × modifier quantities for one group (e.g. 'broth'), optionally for some item codes only"""
+    rows = long[long['Group'] == group]
+    if items is not None:
+        rows = rows[rows['Item'].cat.codes.isin(items)]
+    return rows.pivot_table(index='Date', columns='Modifier', values='Qty', aggfunc='sum',
+                            fill_value=0.0, observed=True).rename_axis(columns=None)
@@ -0,0 +1,179 @@
+"""
+NOAA Climate Data Online (GHCND) weather sync.
+
+Only the days the local weather store is missing (absent, NA, or
+interpolated) are requested. The missing days are split into monthly
+ranges, which are fetched concurrently through one pooled requests.Session.
+HTTP 429/5xx responses are retried with exponential backoff, honouring
+Retry-After. Raw JSON responses are cached on disk (.noaa_cache/) keyed
+by request parameters, so a rerun or an interrupted sync resumes without
+re-downloading. Responses that reach into the last RECENT_DAYS are not
+cached, since NOAA posts late readings.
+
+The year's CSV (Date, Temp_High, Precip_Type) is merged rather than
+rewritten: fetched readings replace missing ones, and existing readings
+are kept.
+
+Usage:
+    python fetch_noaa_data.py --year 2025                 # token from $NOAA_TOKEN
+    python fetch_noaa_data.py --year 2026 --workers 8
+    python fetch_noaa_data.py --year 2025 --base-url http://127.0.0.1:8000/data   # stub server
+"""
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from pipeline import weather
+from pipeline.paths import BASE_DIR
+
+# Register for a free token at https://www.ncdc.noaa.gov/cdo-web/token
+BASE_URL = 'https://www.ncdc.noaa.gov/cdo-web/api/v2/data'
+STATION_ID = 'GHCND:USW00014751'  # KMDT - Harrisburg International
+DATATYPES = 'TMAX,PRCP,SNOW'
+CACHE_DIR = os.path.join(BASE_DIR, '.noaa_cache')
+MAX_WORKERS = 4
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+RECENT_DAYS = 10
+PAGE_LIMIT = 1000  # a monthly range is at most 31 days × 3 datatypes
+
+
+def celsius_to_fahrenheit(celsius):
+    return round(celsius * 9 / 5 + 32)
+
+
+def determine_precip_type(prcp_mm, snow_mm, temp_f):
+    """Precip_Type from precipitation / snowfall (mm) and the day's high"""
+    if snow_mm > 50:  # Heavy snow (>2 inches)
+        return 'Heavy Snow'
+    if snow_mm > 10:
+        return 'Snow'
+    if snow_mm > 0:
+        return 'Flurries'
+    if prcp_mm > 0:
+        return 'Mixed' if temp_f < 34 else 'Rain'
+    return 'None'
+
+
+# --- WHAT TO FETCH ---
+
+def missing_ranges(year, store=None, today=None):
+    """(start, end) date ranges, each within one month, for days of year the store lacks"""
+    today = today or date.today()
+    last = min(date(year, 12, 31), today - timedelta(days=1))
+    days = pd.date_range(date(year, 1, 1), last, freq='D')
+    if not len(days):
+        return []
+    if store is None:
+        missing = np.ones(len(days), dtype=bool)
+    else:
+        known = weather.select_range(store, days[0], days[-1])
+        missing = (known['Temp_High'].isna() | known['Filled']).to_numpy()
+
+    # A new range starts at every missing day that follows a present day or opens a month
+    idx = np.flatnonzero(missing)
+    if not len(idx):
+        return []
+    months = days.month.to_numpy()[idx]
+    breaks = np.flatnonzero((np.diff(idx) > 1) | (np.diff(months) != 0)) + 1
+    return [(days[run[0]].date(), days[run[-1]].date()) for run in np.split(idx, breaks)]
+
+
+# --- FETCHING ---
+
+def make_session(token, workers=MAX_WORKERS):
+    """requests.Session sized for the worker pool (retries are handled in fetch_range)"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['token'] = token
+    return session
+
+
+def _params(start, end):
+    return {
+        'datasetid': 'GHCND',
+        'stationid': STATION_ID,
+        'startdate': start.isoformat(),
+        'enddate': end.isoformat(),
+        'datatypeid': DATATYPES,
+        'units': 'metric',
+        'limit': PAGE_LIMIT,
+    }
+
+
+def _cache_path(cache_dir, base_url, params):
+    key = hashlib.sha1(json.dumps([base_url, params], sort_keys=True).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{params['startdate']}_{params['enddate']}_{key}.json")
+
+
+def fetch_range(session, start, end, base_url=BASE_URL, cache_dir=CACHE_DIR, today=None):
+    """Raw NOAA JSON for one date range (from the disk cache when possible)"""
+    params = _params(start, end)
+    path = _cache_path(cache_dir, base_url, params)
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    for attempt in range(MAX_RETRIES):
+        response = session.get(base_url, params=params, timeout=30)
+        if response.status_code in RETRY_STATUS and attempt < MAX_RETRIES - 1:
+            retry_after = response.headers.get('Retry-After')
+            time.sleep(float(retry_after) if retry_after else BACKOFF_SECONDS * 2 ** attempt)
+            continue
+        response.raise_for_status()
+        break
+    payload = response.json() if response.content else {}
+
+    if end < (today or date.today()) - timedelta(days=RECENT_DAYS):
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(payload, f)
+        os.replace(path + '.tmp', path)
+    return payload
+
+
+def fetch_ranges(ranges, token, base_url=BASE_URL, cache_dir=CACHE_DIR, workers=MAX_WORKERS):
+    """NOAA results for every range, fetched concurrently"""
+    session = make_session(token, workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        payloads = list(pool.map(lambda r: fetch_range(session, *r, base_url=base_url, cache_dir=cache_dir), ranges))
+    return [item for payload in payloads for item in payload.get('results', [])]
+
+
+def daily_weather(results):
+    """Date, Temp_High (°F), Precip_Type per day with a TMAX reading"""
+    if not results:
+        return pd.DataFrame(columns=['Date', 'Temp_High', 'Precip_Type'])
+    raw = pd.DataFrame(results)
+    raw['Date'] = pd.to_datetime(raw['date'].str[:10])
+    wide = raw.pivot_table(index='Date', columns='datatype', values='value', aggfunc='first')
+    wide = wide.reindex(columns=['TMAX', 'PRCP', 'SNOW']).dropna(subset=['TMAX'])
+    temp_f = [celsius_to_fahrenheit(c) for c in wide['TMAX']]   # units=metric: °C, mm
+    precip = [determine_precip_type(p, s, t) for p, s, t in
+              zip(wide['PRCP'].fillna(0), wide['SNOW'].fillna(0), temp_f)]
+    return pd.DataFrame({'Date': wide.index, 'Temp_High': temp_f, 'Precip_Type': precip})
+
+
+def sync_year(year, token, weather_paths=(), output=None, base_url=BASE_URL, cache_dir=CACHE_DIR,
+              workers=MAX_WORKERS):
+    """Fetch the days of year missing from the weather store and merge them into its CSV"""
+    output = output or weather.year_file(year)
+    paths = [p for p in [*weather_paths, output] if os.path.exists(p)]
+    store = weather.build_store(list(dict.fromkeys(paths))) if paths else None
+    ranges = missing_ranges(year, store)
+    if not ranges:
+        return ranges, daily_weather([]), None
+    fetched = daily_weather(fetch_ranges(ranges, token, base_url, cache_dir, workers))
+    return ranges, fetched, weather.merge_into_csv(fetched, output, date(year, 1, 1), date(year, 12, 31))
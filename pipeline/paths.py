@@ -0,0 +1,21 @@
+"""
+Project paths and data-file lookup shared by the dashboard pages
+"""
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def data_path(fname):
+    """Try project folder, then Extreme SSD (project or root) if mounted."""
+    local = os.path.join(BASE_DIR, fname)
+    if os.path.exists(local):
+        return local
+    if os.path.exists('/Volumes'):
+        for vol in os.listdir('/Volumes'):
+            if 'Extreme' in vol:
+                for sub in ['', 'moms-dashboard', 'bamboo_data']:
+                    alt = os.path.join('/Volumes', vol, sub, fname) if sub else os.path.join('/Volumes', vol, fname)
+                    if os.path.exists(alt):
+                        return alt
+    return local
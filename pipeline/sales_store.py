@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Columnar sales store for the Square line-item exports.
+
+Each Square CSV export is parsed once into typed Parquet files partitioned by
+month (sales_store/month=YYYY-MM/<export>.parquet). Datetime_ET, Date, Gross
+Sales and Qty are pre-computed at ingest, so the dashboards only read the
+columns they need instead of re-parsing all 32 string columns on cold start.
+
+Ingest is incremental and append-only: a manifest (sales_store/_manifest.json)
+records each export's signature and date range plus the global date watermark,
+so a sync only parses exports that are new or changed, drops transactions that
+are already stored (overlapping exports), and folds the new rows into the
+cached daily aggregates (sales_store/_daily.parquet) and the date × hour ×
+category × item × dining option cube (sales_store/_cube.parquet, see
+pipeline/cube.py).
+
+Item, Category, Price Point Name and Modifiers Applied are stored as integer
+codes from the menu dictionary (sales_store/_dictionary.json, see
+pipeline/menu.py); the readers decode them back into categoricals. Every
+line item gets a Line_ID, which keys the parsed modifier rows
+(sales_store/_modifiers.parquet, see pipeline/modifiers.py). Tickets are
+reduced to one row each in sales_store/_baskets.parquet (pipeline/baskets.py).
+
+Usage:
+    python -m pipeline.sales_store                 # sync every export in the project folder
+    python -m pipeline.sales_store "Feb 3 and 4 sales.csv"
+    python -m pipeline.sales_store --rebuild       # drop the store and re-ingest
+"""
+import glob
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+from pipeline import baskets, cube, menu, modifiers, normalize
+from pipeline.paths import BASE_DIR
+
+STORE_DIR = os.path.join(BASE_DIR, 'sales_store')
+# Underscore-prefixed files are skipped by Parquet dataset discovery
+MANIFEST_FILE = '_manifest.json'
+DAILY_FILE = '_daily.parquet'
+CUBE_FILE = '_cube.parquet'
+MODIFIERS_FILE = '_modifiers.parquet'
+BASKETS_FILE = '_baskets.parquet'
+# Line_ID = batch * LINE_ID_STRIDE + row within the batch
+LINE_ID_STRIDE = 10**8
+# Bumped when the stored column types or aggregates change; an older store is rebuilt on sync
+SCHEMA_VERSION = 7
+
+# First columns of every Square line-item export
+SQUARE_HEADER = 'Date,Time,Time Zone,Category,Item,Qty'
+
+# Square export columns worth keeping; Token, PAN Suffix, Details, customer
+# fields, card info etc. are dropped at ingest.
+RAW_COLUMNS = [
+    'Date', 'Time', 'Time Zone', 'Category', 'Item', 'Qty', 'Price Point Name',
+    'Modifiers Applied', 'Gross Sales', 'Discounts', 'Net Sales', 'Tax',
+    'Transaction ID', 'Payment ID', 'Event Type', 'Dining Option', 'Channel',
+]
+CURRENCY_COLUMNS = ['Gross Sales', 'Discounts', 'Net Sales', 'Tax']
+CATEGORY_COLUMNS = ['Category', 'Item', 'Price Point Name', 'Modifiers Applied',
+                    'Event Type', 'Dining Option', 'Channel', 'Day_of_Week']
+
+# Column order of the stored partitions
+STORE_COLUMNS = [
+    'Datetime_ET', 'Date', 'Day_of_Week', 'Category', 'Item', 'Qty', 'Price Point Name',
+    'Modifiers Applied', 'Gross Sales', 'Discounts', 'Net Sales', 'Tax',
+    'Transaction ID', 'Payment ID', 'Event Type', 'Dining Option', 'Channel',
+]
+
+
+def normalize_export(df_raw):
+    """Typed line items from a raw Square export (vectorized, see pipeline/normalize.py)"""
+    df = normalize.normalize_sales(df_raw, CURRENCY_COLUMNS)
+    for col in RAW_COLUMNS:
+        if col not in df and col not in ('Time', 'Time Zone'):
+            df[col] = df_raw[col] if col in df_raw else None
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype('category')
+    return df[STORE_COLUMNS]
+
+
+def _partition_files(store_dir):
+    return glob.glob(os.path.join(glob.escape(store_dir), 'month=*', '*.parquet'))
+
+
+# --- MANIFEST (ingest watermark) ---
+
+def load_manifest(store_dir=STORE_DIR):
+    """Ingest bookkeeping: per-export signature/date range plus the global watermark"""
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {'schema': SCHEMA_VERSION, 'exports': {}, 'batches': 0, 'first_date': None, 'last_date': None}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest, store_dir):
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def _signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'mtime': stat.st_mtime, 'size': stat.st_size}
+
+
+def find_exports(search_dirs):
+    """Square line-item exports (*.csv with the Square header) in the given folders"""
+    found = {}
+    for d in search_dirs:
+        for p in sorted(glob.glob(os.path.join(glob.escape(d), '*.csv'))):
+            try:
+                with open(p, encoding='utf-8-sig') as f:
+                    header = f.readline()
+            except (OSError, UnicodeDecodeError):
+                continue
+            if header.startswith(SQUARE_HEADER) and os.path.basename(p) not in found:
+                found[os.path.basename(p)] = p
+    return list(found.values())
+
+
+# --- INCREMENTAL INGEST ---
+
+def _ingested_keys(months, store_dir):
+    """(Transaction ID, Payment ID) pairs already stored for the given months"""
+    months = [m for m in months if os.path.isdir(os.path.join(store_dir, f'month={m}'))]
+    if not months:
+        return pd.MultiIndex.from_arrays([[], []])
+    ids = pd.read_parquet(store_dir, columns=['Transaction ID', 'Payment ID'],
+                          filters=[('month', 'in', months)])
+    return pd.MultiIndex.from_frame(ids.fillna(''))
+
+
+def _daily_aggregates(df, pho_codes):
+    """Additive per-day measures for a batch of (dictionary-coded) line items"""
+    is_pho = np.isin(df['Item'].to_numpy(), pho_codes)
+    daily = pd.DataFrame({
+        'Date': df['Date'],
+        'Bowls_Sold': df['Qty'].where(is_pho, 0.0),
+        'Items_Sold': df['Qty'],
+        'Gross Sales': df['Gross Sales'],
+        'Net Sales': df['Net Sales'],
+    }).groupby('Date').sum()
+    daily['Transactions'] = df.groupby('Date')['Transaction ID'].nunique()
+    return daily
+
+
+def _update_daily(batch, pho_codes, store_dir):
+    """Fold a batch's per-day measures into the cached daily table"""
+    path = os.path.join(store_dir, DAILY_FILE)
+    daily = _daily_aggregates(batch, pho_codes)
+    if os.path.exists(path):
+        daily = pd.concat([pd.read_parquet(path).set_index('Date'), daily]).groupby(level=0).sum()
+    daily.sort_index().reset_index().to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+
+
+def _update_cube(batch, store_dir):
+    """Fold a batch's cube cells into the stored cube"""
+    path = os.path.join(store_dir, CUBE_FILE)
+    cells = cube.build_cube(batch)
+    if os.path.exists(path):
+        cells = cube.merge_cubes(pd.read_parquet(path), cells)
+    cells.to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+
+
+def _update_modifiers(batch, vocabulary, store_dir):
+    """Append a batch's parsed modifier rows to the long modifier table"""
+    path = os.path.join(store_dir, MODIFIERS_FILE)
+    rows = modifiers.explode(batch, vocabulary)
+    if os.path.exists(path):
+        rows = pd.concat([pd.read_parquet(path), rows], ignore_index=True)
+        rows['Modifier'] = rows['Modifier'].astype('category')
+        rows['Group'] = pd.Categorical(rows['Group'], categories=modifiers.MODIFIER_GROUPS)
+    rows.to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+
+
+def _update_baskets(batch, pho_codes, store_dir):
+    """Append a batch's tickets to the basket table"""
+    path = os.path.join(store_dir, BASKETS_FILE)
+    rows = baskets.build_baskets(batch, pho_codes)
+    if os.path.exists(path):
+        rows = pd.concat([pd.read_parquet(path), rows], ignore_index=True)
+        for col in ['Dining Option', 'Channel']:
+            rows[col] = rows[col].astype('category')
+    rows.to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+
+
+def ingest_export(csv_path, store_dir=STORE_DIR):
+    """Append one export's new transactions to the store; returns rows appended
+
+    Transactions already ingested (from this or an overlapping export) are
+    dropped, so re-running on a grown export only appends the new days.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = load_manifest(store_dir)
+    df = normalize_export(pd.read_csv(csv_path, usecols=lambda c: c in RAW_COLUMNS, dtype=str))
+    months = pd.Series(df['Date'].to_numpy().astype('datetime64[M]').astype(str), index=df.index)
+
+    # Only rows at or before the watermark can overlap what is already stored
+    if manifest['last_date'] is not None and len(df):
+        overlap = df['Date'] <= pd.Timestamp(manifest['last_date'])
+        if overlap.any():
+            seen = _ingested_keys(sorted(months[overlap].unique()), store_dir)
+            keys = pd.MultiIndex.from_frame(df[['Transaction ID', 'Payment ID']].astype(object).fillna(''))
+            keep = ~(overlap.to_numpy() & keys.isin(seen))
+            df, months = df[keep], months[keep]
+
+    name = os.path.basename(csv_path)
+    if len(df):
+        dictionary = menu.load_dictionary(store_dir)
+        df = menu.intern_frame(df, dictionary)
+        menu.save_dictionary(dictionary, store_dir)
+        pho_codes = menu.codes_for(menu.item_taxonomy(dictionary))
+
+        manifest['batches'] += 1
+        df['Line_ID'] = manifest['batches'] * LINE_ID_STRIDE + np.arange(len(df), dtype='int64')
+        part_name = f"{manifest['batches']:05d}-{os.path.splitext(name)[0]}.parquet"
+        for month, part in df.groupby(months, sort=True):
+            part_dir = os.path.join(store_dir, f'month={month}')
+            os.makedirs(part_dir, exist_ok=True)
+            out = os.path.join(part_dir, part_name)
+            part.reset_index(drop=True).to_parquet(out + '.tmp', index=False)
+            os.replace(out + '.tmp', out)
+        _update_daily(df, pho_codes, store_dir)
+        _update_cube(df, store_dir)
+        _update_modifiers(df, dictionary['Modifiers Applied'], store_dir)
+        _update_baskets(df, pho_codes, store_dir)
+
+        first, last = f"{df['Date'].min():%Y-%m-%d}", f"{df['Date'].max():%Y-%m-%d}"
+        manifest['first_date'] = min(filter(None, [manifest['first_date'], first]))
+        manifest['last_date'] = max(filter(None, [manifest['last_date'], last]))
+
+    entry = manifest['exports'].get(name, {'rows': 0, 'first_date': None, 'last_date': None})
+    entry.update(_signature(csv_path))
+    entry['rows'] += len(df)
+    if len(df):
+        entry['first_date'] = min(filter(None, [entry['first_date'], first]))
+        entry['last_date'] = max(filter(None, [entry['last_date'], last]))
+    manifest['exports'][name] = entry
+    _save_manifest(manifest, store_dir)
+    return len(df)
+
+
+def sync(csv_paths, store_dir=STORE_DIR):
+    """Ingest exports that are new or changed since the last sync; returns {name: rows appended}"""
+    manifest = load_manifest(store_dir)
+    if manifest.get('schema') != SCHEMA_VERSION:
+        shutil.rmtree(store_dir)
+        manifest = load_manifest(store_dir)
+    exports = manifest['exports']
+    appended = {}
+    for p in csv_paths:
+        if not os.path.exists(p):
+            continue
+        seen = exports.get(os.path.basename(p))
+        if seen and {k: seen[k] for k in ('mtime', 'size')} == _signature(p):
+            continue
+        appended[os.path.basename(p)] = ingest_export(p, store_dir)
+    return appended
+
+
+def rebuild(csv_paths, store_dir=STORE_DIR):
+    """Drop the store and re-ingest every export from scratch"""
+    if os.path.isdir(store_dir):
+        shutil.rmtree(store_dir)
+    return sync(csv_paths, store_dir)
+
+
+# --- READERS ---
+
+def read_sales(columns=None, store_dir=STORE_DIR, filters=None):
+    """Read line items from the store, loading only the requested columns"""
+    if not _partition_files(store_dir):
+        raise FileNotFoundError(f"Sales store at {store_dir} is empty. Run: python -m pipeline.sales_store")
+    df = pd.read_parquet(store_dir, columns=columns, filters=filters)
+    return menu.decode_frame(df, menu.load_dictionary(store_dir))
+
+
+def read_daily(columns=None, store_dir=STORE_DIR):
+    """Cached per-day aggregates (Bowls_Sold, Items_Sold, Gross/Net Sales, Transactions)"""
+    path = os.path.join(store_dir, DAILY_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Sales store at {store_dir} is empty. Run: python -m pipeline.sales_store")
+    return pd.read_parquet(path, columns=columns)
+
+
+def read_cube(columns=None, store_dir=STORE_DIR):
+    """Pre-aggregated cube cells (see pipeline/cube.py)"""
+    path = os.path.join(store_dir, CUBE_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Sales store at {store_dir} is empty. Run: python -m pipeline.sales_store")
+    return menu.decode_frame(pd.read_parquet(path, columns=columns), menu.load_dictionary(store_dir))
+
+
+def read_modifiers(columns=None, store_dir=STORE_DIR):
+    """Parsed modifier rows: Line_ID, Date, Item, Group, Modifier, Extra, Qty"""
+    path = os.path.join(store_dir, MODIFIERS_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Sales store at {store_dir} is empty. Run: python -m pipeline.sales_store")
+    return menu.decode_frame(pd.read_parquet(path, columns=columns), menu.load_dictionary(store_dir))
+
+
+def read_baskets(columns=None, store_dir=STORE_DIR):
+    """One row per ticket (see pipeline/baskets.py)"""
+    path = os.path.join(store_dir, BASKETS_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Sales store at {store_dir} is empty. Run: python -m pipeline.sales_store")
+    return pd.read_parquet(path, columns=columns)
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if a != '--rebuild']
+    files = args or find_exports([BASE_DIR])
+    appended = rebuild(files) if '--rebuild' in sys.argv else sync(files)
+    for name, n in appended.items():
+        print(f"✓ Ingested {name}: {n} new line items")
+    if not appended:
+        print("✓ Sales store already up to date")
+    manifest = load_manifest()
+    print(f"✓ Sales store: {STORE_DIR} ({manifest['first_date']} to {manifest['last_date']})")
@@ -0,0 +1,92 @@
+"""
+Weather station index and inverse-distance blending.
+
+weather_stations.csv lists every station we can blend (STATION, NAME,
+LATITUDE, LONGITUDE). Coordinates only ever come from NOAA: GHCN exports
+downloaded with the station-location option carry those columns, and
+add_from_export() appends new stations from them. A station that has never
+appeared in such an export is not in the index and is not blended.
+
+The index holds each station's great-circle distance to the restaurant
+(SITE), computed once at load, plus a station × station distance matrix.
+Blending turns the readings into days × stations matrices, one per
+variable, and takes inverse-distance weighted means over the stations that
+reported each day. A day has a value as long as any station within
+MAX_DISTANCE_KM reported one. Adding stations or years only widens the
+matrices.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from pipeline.paths import data_path
+
+STATIONS_FILE = 'weather_stations.csv'
+SITE = (40.2401, -76.9358)  # 4401 Carlisle Pike, Camp Hill
+EARTH_RADIUS_KM = 6371.0
+IDW_POWER = 2
+MIN_DISTANCE_KM = 0.5   # keeps a station next door from taking all the weight
+MAX_DISTANCE_KM = 50.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance (km), broadcasting over arrays"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def load_stations(path=None, site=SITE):
+    """Station index (STATION -> NAME, LATITUDE, LONGITUDE, Distance_km to site)"""
+    path = path or data_path(STATIONS_FILE)
+    if not os.path.exists(path):
+        path = io.StringIO('STATION,NAME,LATITUDE,LONGITUDE\n')
+    stations = pd.read_csv(path, dtype={'STATION': str})
+    stations = stations.drop_duplicates('STATION', keep='last').set_index('STATION')
+    stations['Distance_km'] = haversine_km(stations['LATITUDE'], stations['LONGITUDE'], *site)
+    return stations.sort_values('Distance_km')
+
+
+def distance_matrix(stations):
+    """Station × station distances (km)"""
+    lat, lon = stations['LATITUDE'].to_numpy(), stations['LONGITUDE'].to_numpy()
+    km = haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+    return pd.DataFrame(km, index=stations.index, columns=stations.index)
+
+
+def add_from_export(export_path, path=None, chunk_rows=200_000):
+    """Append stations (with LATITUDE/LONGITUDE columns) from a GHCN export to the index; returns new IDs"""
+    path = path or data_path(STATIONS_FILE)
+    header = pd.read_csv(export_path, nrows=0).columns
+    if not {'LATITUDE', 'LONGITUDE'} <= set(header):
+        return []
+    cols = ['STATION', 'NAME', 'LATITUDE', 'LONGITUDE']
+    found = pd.concat(chunk.drop_duplicates('STATION') for chunk in
+                      pd.read_csv(export_path, usecols=cols, dtype={'STATION': str}, chunksize=chunk_rows))
+    known = pd.read_csv(path, dtype={'STATION': str}) if os.path.exists(path) else pd.DataFrame(columns=cols)
+    new = found.drop_duplicates('STATION')
+    new = new[~new['STATION'].isin(known['STATION'])]
+    if len(new):
+        pd.concat([known, new[cols]], ignore_index=True).to_csv(path, index=False)
+    return new['STATION'].tolist()
+
+
+def idw_weights(distance_km, power=IDW_POWER):
+    return np.maximum(np.asarray(distance_km, dtype=float), MIN_DISTANCE_KM) ** -power
+
+
+def blend(values, weights):
+    """Weighted mean across stations (columns) of a days × stations matrix, skipping NaN"""
+    observed = ~np.isnan(values)
+    w = observed * weights[None, :]
+    total = w.sum(axis=1)
+    weighted = np.where(observed, values, 0.0) @ weights
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, weighted / total, np.nan)
+
+
+def station_matrix(readings, column, stations):
+    """Days × stations matrix of one reading column"""
+    return readings.pivot(index='Date', columns='STATION', values=column).reindex(columns=stations)
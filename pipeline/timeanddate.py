@@ -0,0 +1,199 @@
+"""
+timeanddate.com historic weather scraper (Camp Hill, PA).
+
+Each day's historic page has an hourly table; the day's high is the largest
+temperature in it, and the precip type comes from the first hourly
+description that mentions rain, snow, sleet, etc. Two caches make reruns
+cheap:
+
+    .timeanddate_cache/html/<location>/<YYYYMMDD>.html   raw day pages (HTTP cache)
+    .timeanddate_cache/days.json                          parsed result per day
+
+Days already in days.json are neither fetched nor parsed again, so running
+for a new month only requests that month's days. Pages are fetched by a
+small thread pool over one pooled session, and are parsed with lxml,
+restricted to <td> cells, instead of a full html.parser tree.
+Only finished days (before today) are cached. With --offline nothing is
+fetched: a cache directory of saved HTML pages (e.g. test fixtures) is the
+only source.
+
+Usage:
+    python fetch_weather_2025.py --year 2025
+    python fetch_weather_2025.py --year 2026 --month 2
+    python fetch_weather_2025.py --year 2025 --offline --cache-dir path/to/fixtures
+"""
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pandas as pd
+
+from pipeline.paths import BASE_DIR
+
+LOCATION = '@5182928'  # Camp Hill, PA
+DAY_URL = 'https://www.timeanddate.com/weather/{location}/historic?hd={ymd}'
+CACHE_DIR = os.path.join(BASE_DIR, '.timeanddate_cache')
+DAY_RESULTS = 'days.json'
+MAX_WORKERS = 4
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 1.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# BeautifulSoup tree builder (lxml is in requirements.txt)
+PARSER = 'lxml'
+
+_TEMP = re.compile(r'(-?\d+)\s*°\s*([CF])')
+_WEATHER = re.compile(r'rain|snow|clear|cloud|fog|sleet|drizzle|shower|flurr', re.I)
+
+
+def determine_precip_type(weather_desc):
+    """Precip_Type from a weather description"""
+    weather_desc = weather_desc.lower()
+    if 'heavy snow' in weather_desc or 'blizzard' in weather_desc:
+        return 'Heavy Snow'
+    if 'snow' in weather_desc and 'flurr' not in weather_desc:
+        return 'Snow'
+    if 'flurr' in weather_desc or 'snow shower' in weather_desc:
+        return 'Flurries'
+    if 'rain' in weather_desc and 'snow' in weather_desc:
+        return 'Mixed'
+    if 'sleet' in weather_desc or 'freezing rain' in weather_desc:
+        return 'Mixed'
+    if 'rain' in weather_desc or 'drizzle' in weather_desc or 'shower' in weather_desc:
+        return 'Rain'
+    return 'None'
+
+
+# --- PARSING (pure: HTML in, result out) ---
+
+def parse_day(html):
+    """{'high_temp_f': int or None, 'weather': [descriptions]} for one day page"""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html, PARSER, parse_only=SoupStrainer('td'))
+    cells = [td.get_text(' ', strip=True) for td in soup.find_all('td')]
+    temps_f = []
+    for text in cells:
+        m = _TEMP.search(text)
+        if m:
+            value = int(m.group(1))
+            temps_f.append(value if m.group(2) == 'F' else round(value * 9 / 5 + 32))
+    weather = [text for text in cells if _WEATHER.search(text) and not _TEMP.search(text)][:5]
+    return {'high_temp_f': max(temps_f) if temps_f else None, 'weather': weather}
+
+
+def precip_type(weather):
+    """First non-'None' precip type among a day's descriptions"""
+    for desc in weather:
+        kind = determine_precip_type(desc)
+        if kind != 'None':
+            return kind
+    return 'None'
+
+
+def to_frame(results):
+    """Date, Temp_High, Precip_Type for parsed days with a high temperature"""
+    rows = [(day, r['high_temp_f'], precip_type(r['weather']))
+            for day, r in sorted(results.items()) if r.get('high_temp_f') is not None]
+    return pd.DataFrame({
+        'Date': pd.to_datetime([d for d, _, _ in rows]),
+        'Temp_High': [t for _, t, _ in rows],
+        'Precip_Type': [p for _, _, p in rows],
+    })
+
+
+# --- CACHES ---
+
+def _page_path(cache_dir, day, location):
+    return os.path.join(cache_dir, 'html', location, f'{day:%Y%m%d}.html')
+
+
+def load_day_results(cache_dir):
+    path = os.path.join(cache_dir, DAY_RESULTS)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_day_results(results, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, DAY_RESULTS)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(results, f, indent=0, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+# --- FETCHING ---
+
+def make_session(workers=MAX_WORKERS):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=0)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = 'Mozilla/5.0 (bamboo-dashboard weather sync)'
+    return session
+
+
+def fetch_page(session, day, cache_dir=CACHE_DIR, location=LOCATION, offline=False, today=None):
+    """HTML for one day page, from the HTTP cache when possible (None if offline and not cached)"""
+    path = _page_path(cache_dir, day, location)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    if offline:
+        return None
+
+    url = DAY_URL.format(location=location, ymd=f'{day:%Y%m%d}')
+    for attempt in range(MAX_RETRIES):
+        response = session.get(url, timeout=30)
+        if response.status_code in RETRY_STATUS and attempt < MAX_RETRIES - 1:
+            retry_after = response.headers.get('Retry-After')
+            time.sleep(float(retry_after) if retry_after else BACKOFF_SECONDS * 2 ** attempt)
+            continue
+        response.raise_for_status()
+        break
+
+    if day < (today or date.today()):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(response.content)
+        os.replace(path + '.tmp', path)
+    return response.content
+
+
+def fetch_days(days, cache_dir=CACHE_DIR, location=LOCATION, workers=MAX_WORKERS, offline=False, today=None):
+    """({ISO date: parsed result}, number of days looked up); only days missing from days.json are fetched"""
+    today = today or date.today()
+    results = load_day_results(cache_dir)
+    todo = [d for d in days if d.isoformat() not in results]
+    session = None if offline else make_session(workers)
+
+    def work(day):
+        try:
+            html = fetch_page(session, day, cache_dir, location, offline, today)
+        except Exception as e:
+            print(f"  Warning: Could not fetch {day}: {e}")
+            return day, None
+        return day, (parse_day(html) if html is not None else None)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        fetched = [(day, result) for day, result in pool.map(work, todo) if result is not None]
+    for day, result in fetched:
+        if day < today:
+            results[day.isoformat()] = result
+    if fetched:
+        save_day_results(results, cache_dir)
+    found = {**results, **{day.isoformat(): result for day, result in fetched}}
+    wanted = {d.isoformat() for d in days}
+    return {k: v for k, v in found.items() if k in wanted}, len(todo)
+
+
+def days_between(start, end, today=None):
+    """Calendar days in [start, end] up to today"""
+    end = min(end, today or date.today())
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
@@ -0,0 +1,149 @@
+"""
+Unified daily weather store.
+
+Every weather CSV (processed NOAA exports, converter output, hand-filled
+monthly files) is read into one schema:
+
+    Date (datetime64), Temp_High (float, °F), Precip_Type (categorical),
+    Source (file the value came from, or 'interpolated'), Filled (bool)
+
+'°F' suffixes, spaces in column names and qualifiers such as "Rain (light)"
+are normalised once here. Missing readings ('NA', blank) stay missing instead
+of being zero-filled: the combined series is reindexed to every calendar day,
+and short temperature gaps (up to MAX_INTERP_DAYS) are linearly interpolated
+and flagged Filled. Longer gaps stay NaN so the model drops those days
+rather than seeing 0°F. Precipitation is not interpolated; interpolated days
+count as dry ('None').
+"""
+import csv
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from pipeline.paths import data_path
+
+PRECIP_TYPES = ['None', 'Rain', 'Mixed', 'Flurries', 'Snow', 'Heavy Snow']
+PRECIP_ALIASES = {'none': 'None', 'clear': 'None', 'rain': 'Rain', 'rainy': 'Rain', 'mixed': 'Mixed',
+                  'flurries': 'Flurries', 'snow': 'Snow', 'heavy snow': 'Heavy Snow'}
+NA_VALUES = ['', 'NA', 'N/A', 'nan', 'NaN', '-']
+WEATHER_COLUMNS = ['Date', 'Temp_High', 'Precip_Type', 'Source', 'Filled']
+MAX_INTERP_DAYS = 3
+# Year files whose name differs from camp_hill_<year>_weather.csv (2024's raw GHCN export owns that name)
+YEAR_FILES = {2024: 'camp_hill_2024_weather_processed.csv'}
+
+
+def year_file(year):
+    """Date,Temp_High,Precip_Type CSV that sync tools write a year into"""
+    return data_path(YEAR_FILES.get(year, f'camp_hill_{year}_weather.csv'))
+
+
+def normalize_precip(values):
+    """Canonical PRECIP_TYPES label ("Rain (light)" -> "Rain", "Clear" -> "None"); unknown -> NaN"""
+    labels = pd.Series(values, dtype=object)
+    uniques = labels.dropna().unique()
+    mapping = {u: PRECIP_ALIASES.get(re.sub(r'\s*\(.*$', '', str(u)).strip().lower()) for u in uniques}
+    return pd.Categorical(labels.map(mapping), categories=PRECIP_TYPES)
+
+
+def read_weather_file(path):
+    """One weather CSV in the store schema (observed rows only, unfilled)"""
+    w = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=NA_VALUES)
+    w.columns = w.columns.str.strip().str.replace(' ', '_')
+    w = w[w['Date'].notna() & ~w['Date'].str.startswith('#', na=False)]   # template instruction rows
+    temp = pd.to_numeric(w['Temp_High'].str.replace('°F', '', regex=False).str.strip(), errors='coerce')
+    precip = normalize_precip(w['Precip_Type'] if 'Precip_Type' in w else None)
+    out = pd.DataFrame({
+        'Date': pd.to_datetime(w['Date'], errors='coerce').to_numpy(),
+        'Temp_High': temp.to_numpy(dtype=float),
+        # A converter writes 'None' precip for days it has no reading for
+        'Precip_Type': pd.Categorical(np.where(temp.notna(), precip.astype(object), None), categories=PRECIP_TYPES),
+        'Source': os.path.basename(path),
+        'Filled': False,
+    })
+    return out.dropna(subset=['Date'])
+
+
+def combine(frames):
+    """One row per date; where files overlap, the later file's observed reading wins"""
+    stacked = pd.concat([f.assign(_order=i) for i, f in enumerate(frames)], ignore_index=True)
+    stacked['_observed'] = stacked['Temp_High'].notna()
+    stacked = stacked.sort_values(['Date', '_observed', '_order'], kind='stable')
+    return stacked.drop_duplicates('Date', keep='last').drop(columns=['_order', '_observed']).reset_index(drop=True)
+
+
+def _gap_lengths(missing):
+    """Length of the run of missing values each position belongs to (0 if present)"""
+    run_id = np.cumsum(~missing)
+    lengths = pd.Series(missing.astype(int)).groupby(run_id).transform('sum').to_numpy()
+    return np.where(missing, lengths, 0)
+
+
+def fill_gaps(weather, max_days=MAX_INTERP_DAYS):
+    """Contiguous daily frame with gaps of up to max_days interpolated (Filled=True)"""
+    days = pd.date_range(weather['Date'].min(), weather['Date'].max(), freq='D', name='Date')
+    df = weather.set_index('Date').reindex(days)
+    missing = df['Temp_High'].isna().to_numpy()
+    interp = df['Temp_High'].interpolate(method='linear', limit_area='inside').to_numpy()
+    fill = missing & (_gap_lengths(missing) <= max_days) & ~np.isnan(interp)
+
+    df['Temp_High'] = np.where(fill, np.round(interp, 1), df['Temp_High'].to_numpy())
+    df['Filled'] = fill
+    df['Source'] = df['Source'].astype(object).where(~fill, 'interpolated')
+    df.loc[fill, 'Precip_Type'] = 'None'
+    df['Source'] = df['Source'].astype('category')
+    return df.reset_index()[WEATHER_COLUMNS]
+
+
+def build_store(paths, max_days=MAX_INTERP_DAYS):
+    """Read, combine and gap-fill every existing weather file"""
+    frames = [read_weather_file(p) for p in paths if os.path.exists(p)]
+    if not frames:
+        raise FileNotFoundError(f"No weather data. Need one of: {', '.join(os.path.basename(p) for p in paths)}")
+    return fill_gaps(combine(frames), max_days)
+
+
+def select_range(store, start, end):
+    """Contiguous daily frame for [start, end] (days outside the store are NaN, not Filled)"""
+    days = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq='D', name='Date')
+    out = store.set_index('Date').reindex(days)
+    out['Filled'] = out['Filled'].fillna(False).astype(bool)
+    return out
+
+
+def temp_series(store, start, end):
+    """Temp_High for every day in [start, end] as a float64 Series (NaN = unknown)"""
+    return select_range(store, start, end)['Temp_High'].astype('float64')
+
+
+def merge_into_csv(fetched, path, start, end):
+    """Merge fetched Date/Temp_High/Precip_Type rows into a CSV covering [start, end]; returns days with data
+
+    Existing readings are kept unless fetched has one for the same day;
+    every day in the range (and in the existing file) is written, unknown
+    days as NA / None.
+    """
+    frames = [read_weather_file(path)] if os.path.exists(path) else []
+    frames.append(pd.DataFrame({
+        'Date': pd.to_datetime(fetched['Date']),
+        'Temp_High': pd.to_numeric(fetched['Temp_High'], errors='coerce'),
+        'Precip_Type': normalize_precip(fetched['Precip_Type']),
+        'Source': 'fetched',
+        'Filled': False,
+    }))
+    merged = combine(frames).set_index('Date')
+    # Days already in the file outside [start, end] are kept
+    merged = merged.reindex(pd.date_range(min(pd.Timestamp(start), merged.index.min()),
+                                          max(pd.Timestamp(end), merged.index.max()), freq='D'))
+
+    with open(path + '.tmp', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Date', 'Temp_High', 'Precip_Type'])
+        for day, temp, precip in zip(merged.index, merged['Temp_High'], merged['Precip_Type']):
+            if pd.isna(temp):
+                writer.writerow([day.strftime('%Y-%m-%d'), 'NA', 'None'])
+            else:
+                writer.writerow([day.strftime('%Y-%m-%d'), int(round(temp)), precip if pd.notna(precip) else 'None'])
+    os.replace(path + '.tmp', path)
+    return int(merged['Temp_High'].notna().sum())
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from forecasting import intraday
+from pipeline import baskets
+
+
+def _lines():
+    """Ticket A (two lines), then three line items without a Transaction ID"""
+    return pd.DataFrame({
+        'Datetime_ET': pd.to_datetime(['2026-01-09 12:00', '2026-01-09 12:01', '2026-01-09 12:05',
+                                       '2026-01-09 12:20', '2026-01-09 18:40']).tz_localize('America/New_York'),
+        'Transaction ID': ['A', 'A', None, None, None],
+        'Item': [0, 1, 0, 0, 1],
+        'Qty': [1.0, 2.0, 1.0, 1.0, 1.0],
+        'Gross Sales': [14.0, 6.0, 14.0, 14.0, 3.0],
+        'Discounts': 0.0,
+        'Net Sales': [14.0, 6.0, 14.0, 14.0, 3.0],
+        'Dining Option': ['For Here', None, 'To Go', None, 'For Here'],
+        'Channel': 'Point of Sale',
+        'Event Type': 'Payment',
+    })
+
+
+def test_lines_without_a_transaction_id_are_tickets_of_their_own():
+    table = baskets.build_baskets(_lines(), pho_codes=[0])
+    assert len(table) == 4
+    assert table['Line_Items'].tolist() == [2, 1, 1, 1]
+    assert table['Net Sales'].tolist() == [20.0, 14.0, 14.0, 3.0]
+    assert table['Transaction ID'].isna().tolist() == [False, True, True, True]
+    assert baskets.daily_tickets(table)['Tickets'].tolist() == [4]
+
+
+def test_intraday_counts_the_same_tickets():
+    lines = _lines()
+    counts = intraday.bucket(lines['Datetime_ET'], lines['Transaction ID'])
+    assert counts.to_numpy().sum() == len(baskets.build_baskets(lines, pho_codes=[0]))
+    # The unlabelled 12:20 line does not borrow another line's dining option
+    assert intraday.dine_in_lines(lines['Transaction ID'], lines['Dining Option']).tolist() == \
+        [True, True, False, False, True]
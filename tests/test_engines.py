@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import engines, features, kink
+
+
+def _design(temps, kink_point=40.0, seed=0, weekend=None):
+    rng = np.random.default_rng(seed)
+    n = len(temps)
+    X = pd.DataFrame(0.0, index=range(n), columns=features.EXOG_NAMES)
+    X['const'] = 1.0
+    X['temp_cold'], X['temp_hot'] = kink.hinge(temps, kink_point)
+    X['is_weekend'] = (np.arange(n) % 3 == 0).astype(float) if weekend is None else weekend
+    X['season_impact'] = 1.0 + 0.1 * rng.standard_normal(n)
+    return X
+
+
+@pytest.mark.parametrize('name', ['poisson', 'negbin'])
+def test_one_warm_day_cannot_blow_up_the_forecast(name):
+    # 29 cold days around 3 a day, then one warm day with a burst of sales: the
+    # unpenalised hinge slope is ~2.6 log-units/°F, i.e. over a million at 45°F
+    temps = np.r_[np.linspace(15, 39, 29), 41.0]
+    y = np.r_[np.random.default_rng(1).poisson(3.0, 29), 40.0]
+    engine = engines.make_engine(name).fit(_design(temps), y)
+
+    at_max, beyond = engine.predict(_design([41.0])), engine.predict(_design([45.0]))
+    assert at_max[0] <= engines.MAX_RATIO * y.max()
+    assert beyond[0] == pytest.approx(at_max[0])
+
+
+def test_temperatures_outside_training_are_clamped_not_flattened():
+    temps = np.linspace(20, 60, 40)
+    weekend = (np.arange(40) % 3 == 0).astype(float)
+    y = np.round(np.exp(0.5 + 0.05 * temps + 0.4 * weekend))
+    engine = engines.make_engine('poisson').fit(_design(temps, weekend=weekend), y)
+
+    def predict(temp, is_weekend):
+        return engine.predict(_design([temp], weekend=[is_weekend]))[0]
+
+    assert predict(10.0, 0) == pytest.approx(predict(20.0, 0))
+    assert predict(90.0, 0) == pytest.approx(predict(60.0, 0))
+    # The weekend effect survives outside the training range
+    assert predict(90.0, 1) / predict(90.0, 0) == pytest.approx(predict(50.0, 1) / predict(50.0, 0))
+    assert predict(90.0, 1) > 1.3 * predict(90.0, 0)
+    assert predict(30.0, 0) < predict(55.0, 0) <= engines.MAX_RATIO * y.max()
+
+
+def test_clamp_matches_clamping_the_temperature_first():
+    bounds = engines.log_bounds(_design(np.linspace(15, 70, 12)).to_numpy(), np.ones(12))
+    X = _design(np.array([5.0, 25.0, 50.0, 99.0])).to_numpy()
+    clamped = engines.clamp_temps(X, bounds['temp_lo'], bounds['temp_hi'])
+    assert clamped == pytest.approx(_design(np.array([15.0, 25.0, 50.0, 70.0])).to_numpy())
+
+
+def test_bounded_exp_caps_each_series():
+    X = _design(np.array([30.0, 35.0]))
+    params = np.zeros((2, len(features.EXOG_NAMES)))
+    params[:, 0] = [1.0, 50.0]   # exp(50) would overflow any sane forecast
+    bounds = engines.log_bounds(X.to_numpy(), np.array([[2.0, 4.0], [3.0, 8.0]]))
+
+    mu = engines.bounded_exp(X.to_numpy(), params, **bounds)
+    assert mu[:, 0] == pytest.approx(np.e)
+    assert mu[:, 1] == pytest.approx(engines.MAX_RATIO * 8.0)
+
+
+def test_all_zero_columns_still_fit():
+    temps = np.linspace(20, 60, 15)
+    y = np.round(np.exp(1.0 + 0.03 * temps))
+    engine = engines.make_engine('poisson').fit(_design(temps), y)   # is_2024 / is_2025 are all zero
+    assert np.isfinite(engine.params).all()
+    assert engine.diagnostics()['deviance'] < 15
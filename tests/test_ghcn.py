@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from pipeline import ghcn, stations
+
+# Two stations due north of the restaurant, about 2 km and 6 km away
+NEAR, FAR = ('USC00000001', 40.2581), ('USC00000002', 40.2941)
+
+
+def _export(path, with_location):
+    rows = []
+    for (station, lat), tmax in [(NEAR, 40), (FAR, 60)]:
+        for day in ['2025-03-01', '2025-03-02']:
+            row = {'STATION': station, 'NAME': f'TEST {station}, PA US', 'DATE': day, 'PRCP': 0.0, 'TMAX': tmax}
+            if with_location:
+                row.update(LATITUDE=lat, LONGITUDE=stations.SITE[1])
+            rows.append(row)
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def test_coordinates_come_from_the_export(tmp_path):
+    index_file, output = str(tmp_path / 'stations.csv'), str(tmp_path / 'weather.csv')
+    ghcn.convert(_export(tmp_path / 'export.csv', True), output=output, stations_file=index_file)
+
+    index = stations.load_stations(index_file)
+    assert index.index.tolist() == [NEAR[0], FAR[0]]
+    assert index['Distance_km'].tolist() == pytest.approx([2.0, 6.0], abs=0.05)
+    # Inverse-distance squared: the near station carries 9/10 of the weight
+    assert pd.read_csv(output)['Temp_High'].tolist() == [42, 42]
+
+
+def test_export_without_coordinates_converts_by_priority(tmp_path):
+    index_file, output = str(tmp_path / 'stations.csv'), str(tmp_path / 'weather.csv')
+    ghcn.convert(_export(tmp_path / 'export.csv', False), stations=[FAR[0], NEAR[0]], output=output,
+                 stations_file=index_file)
+
+    assert stations.load_stations(index_file).empty
+    assert pd.read_csv(output)['Temp_High'].tolist() == [60, 60]
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import features, intraday
+
+MIDWEEK = features.DAY_TYPES[0]
+
+
+def _profile(shares):
+    """Profile with the given slot shares from 12:00 (same for every day type)"""
+    col = np.zeros(intraday.SLOTS_PER_DAY)
+    col[48:48 + len(shares)] = shares
+    return pd.DataFrame({d: col for d in features.DAY_TYPES}, index=intraday.slot_labels())
+
+
+def test_seats_in_use_are_flagged_against_the_seat_count():
+    # 150 bowls, 30 per slot from 12:00 to 13:00; a 45-minute stay keeps 90 seats busy
+    profile = _profile([0.2] * 5)
+    slots = intraday.forecast_slots(150, MIDWEEK, profile).set_index('Slot')
+    assert slots.loc['12:30', 'Seats_In_Use'] == pytest.approx(90)
+    assert slots['Over_Capacity'].sum() == (slots['Seats_In_Use'] > intraday.SEATS).sum() > 0
+    assert not slots.loc['11:45', 'Over_Capacity']
+
+
+def test_to_go_bowls_do_not_take_seats():
+    # Same rush, but only a third of the bowls are eaten in
+    profile = _profile([0.2] * 5)
+    slots = intraday.forecast_slots(150, MIDWEEK, profile, seat_profile=profile / 3).set_index('Slot')
+    assert slots['Bowls'].sum() == pytest.approx(150)
+    assert slots.loc['12:30', 'Seats_In_Use'] == pytest.approx(30)
+    assert not slots['Over_Capacity'].any()
+
+
+def test_busy_day_under_the_seat_count_is_not_over_capacity():
+    # More bowls than the daily limit (scoring.CAPACITY_LIMIT) spread thin enough to fit the room
+    profile = _profile(np.full(40, 1 / 40))
+    slots = intraday.forecast_slots(200, MIDWEEK, profile)
+    assert slots['Seats_In_Use'].max() == pytest.approx(15)
+    assert not slots['Over_Capacity'].any()
+
+
+def test_unlabelled_lines_take_their_tickets_dining_option():
+    ids = pd.Series(['a', 'a', 'b', 'b', None, 'c'])
+    option = pd.Series(['For Here', None, None, 'To Go', 'For Here', None])
+    assert intraday.dine_in_lines(ids, option).tolist() == [True, True, False, False, True, False]
+
+
+def test_dine_in_profile_is_a_share_of_all_bowls():
+    times = pd.to_datetime(['2026-01-06 12:00', '2026-01-06 12:05', '2026-01-06 12:20', '2026-01-06 18:00'])
+    ids = ['a', 'b', 'c', 'd']
+    qty = np.array([2.0, 1.0, 1.0, 4.0])
+    for_here = np.array([True, False, True, True])
+    everything = intraday.bucket(times, ids, qty)
+    seated = intraday.bucket(times, ids, qty * for_here)
+
+    share = intraday.demand_profile(seated, everything)[MIDWEEK]   # 2026-01-06 is a Tuesday
+    assert share['12:00'] == pytest.approx(2 / 8) and share['12:15'] == pytest.approx(1 / 8)
+    assert share.sum() == pytest.approx(7 / 8)
+    assert intraday.demand_profile(everything)[MIDWEEK].sum() == pytest.approx(1)
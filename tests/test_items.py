@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import engines, features, items
+
+KINK = 31.0
+
+
+def _history(seed=0):
+    """A month of model rows plus a cube of three items (one sparse, sold mostly on the one warm day)"""
+    rng = np.random.default_rng(seed)
+    n = 28
+    temps = np.r_[rng.uniform(16, 30, n - 6), [34, 36, 38, 41, 45, 57]]
+    df = pd.DataFrame({'Date': pd.date_range('2026-01-06', periods=n), 'Temp_High': temps})
+    for col in features.KINK_VARS:
+        df[col] = 0.0
+    df['is_weekend'] = (df['Date'].dt.dayofweek >= 4).astype(float)
+    df['is_snow'] = (rng.random(n) < 0.2).astype(float)
+    df['is_2025'] = 0.0
+    df['season_impact'] = 1.0
+
+    taxonomy = pd.DataFrame({'Item_Name': ['Pho Dac Biet', 'Banh Xeo', 'Pho Dac Biet (void)'],
+                             'Category': ['Pho', 'Appetizers', 'Pho'], 'Family': ['pho', 'appetizer', 'pho'],
+                             'Is_Voided': [False, False, True]})
+    qty = np.c_[rng.poisson(40 + 10 * df['is_weekend']), rng.poisson(0.3, n), rng.poisson(1.0, n)]
+    qty[-1, 1] = 9   # the warm day: a party orders Banh Xeo
+    cells = pd.DataFrame({'Date': np.repeat(df['Date'].to_numpy(), 3),
+                          'Item': pd.Categorical.from_codes(np.tile([0, 1, 2], n), taxonomy['Item_Name']),
+                          'Qty': qty.ravel().astype(float)})
+    return df, cells, taxonomy
+
+
+def _days(temps):
+    rows = pd.DataFrame({'Date': pd.date_range('2026-02-09', periods=len(temps)), 'Temp_High': temps})
+    for col in features.KINK_VARS:
+        rows[col] = 0.0
+    rows['is_weekend'] = (rows['Date'].dt.dayofweek >= 4).astype(float)
+    rows['season_impact'] = 1.0
+    return features.design_matrix(rows, KINK)
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    df, cells, taxonomy = _history()
+    Y = items.series_matrix(cells, taxonomy, df['Date'])
+    return items.fit(df, KINK, cells, taxonomy, workers=1), Y
+
+
+def test_forecasts_stay_within_a_multiple_of_history(fitted):
+    models, Y = fitted
+    assert models.series.tolist() == ['Banh Xeo', 'Pho Dac Biet']
+    # A week-ahead forecast that warms past anything in training
+    qty = pd.DataFrame(models.predict(_days(np.array([22.0, 38.0, 50.0, 57.0, 63.0, 70.0, 75.0]))),
+                       columns=models.series)
+    history = Y[models.series]
+    assert (qty.max() <= engines.MAX_RATIO * history.max()).all()
+    assert np.isfinite(qty.to_numpy()).all()
+    # Fri-Sun warm past the 57°F training max: held at 57°F, weekend effect kept
+    assert qty.iloc[4:].to_numpy() == pytest.approx(np.tile(qty.iloc[4].to_numpy(), (3, 1)))
+    assert qty.loc[4, 'Pho Dac Biet'] > qty.loc[3, 'Pho Dac Biet']   # Thursday at 57°F
+    at_max = models.predict(_days(np.array([57.0] * 7)))
+    assert qty.iloc[4:].to_numpy() == pytest.approx(at_max[4:])
+
+
+def test_identity_link_is_clamped_too():
+    df, cells, taxonomy = _history()
+    models = items.fit(df, KINK, cells, taxonomy, level='Family', engine='ols', workers=1)
+    assert models.predict(_days(np.array([90.0]))) == pytest.approx(models.predict(_days(np.array([57.0]))))
+
+
+def test_bounds_survive_save_and_load(fitted, tmp_path):
+    models, _ = fitted
+    loaded = items.load(items.save(models, tmp_path))
+    X = _days(np.array([20.0, 45.0, 80.0]))
+    assert loaded.predict(X) == pytest.approx(models.predict(X))
+    assert loaded.cap.tolist() == models.cap.tolist()
+    assert loaded.summary().index.tolist() == ['Banh Xeo', 'Pho Dac Biet']
+
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from forecasting import kink
+
+
+def _days(temps, seed=0):
+    rng = np.random.default_rng(seed)
+    temps = np.asarray(temps, dtype=float)
+    weekend = (np.arange(len(temps)) % 3 == 0).astype(float)
+    y = 60 - 0.3 * temps + 15 * weekend + rng.normal(0, 1, len(temps))
+    return temps, pd.DataFrame({'is_weekend': weekend}), y
+
+
+def test_sparse_warm_days_cannot_set_the_kink():
+    # 27 cold days and one warm outlier: without a support rule the best R² puts the
+    # kink just below the single warm day
+    temps, other, y = _days(list(np.linspace(15, 55, 27)) + [70.0])
+    y[-1] = 0.0
+    search = kink.search_kinks(temps, other, y)
+
+    unrestricted = float(search.summary['r2'].idxmax())
+    assert (temps > unrestricted).sum() < kink.MIN_SIDE_DAYS
+
+    best = search.best_kink
+    n_cold, n_hot = kink.side_counts(temps, best)
+    assert n_cold[0] >= kink.MIN_SIDE_DAYS and n_hot[0] >= kink.MIN_SIDE_DAYS
+    assert search.summary.loc[best, 'supported']
+
+
+def test_no_supported_kink_returns_none():
+    temps, other, y = _days(np.linspace(10, 28, 20))   # every day below the grid
+    assert kink.search_kinks(temps, other, y).best_kink is None
+    assert kink.optimize_kink(temps, other, y) is None
+
+
+def test_near_ties_take_the_middle_kink():
+    summary = pd.DataFrame({'r2': [0.5, 0.7, 0.7, 0.7 - 1e-12, 0.7, 0.6],
+                            'supported': [True, True, True, True, True, False]},
+                           index=pd.Index([40.0, 41.0, 41.5, 42.0, 42.5, 43.0], name='kink'))
+    assert kink._best_supported(summary) == 41.5
+
+
+def test_single_warm_day_tie_is_broken_deterministically():
+    # With one day above the kink its residual is 0 for every kink between the two
+    # warmest days, so R² is tied there; the middle tied kink is taken
+    temps, other, y = _days(list(np.linspace(15, 50, 20)) + [57.0])
+    y[-1] = 0.0
+    search = kink.search_kinks(temps, other, y, min_side=1)
+    r2 = search.summary['r2']
+    tied = r2.index[r2 >= r2.max() - kink.R2_TIE]
+    assert list(tied) == list(np.arange(50.0, 57.0, 0.5))
+    assert search.best_kink == 53.0
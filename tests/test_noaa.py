@@ -0,0 +1,148 @@
+import json
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from pipeline import noaa, weather
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """NOAA /data stub: TMAX 10°C (50°F) and 2 mm rain for every requested day
+
+    Queued (status, headers) pairs on the server are answered first.
+    """
+
+    def do_GET(self):
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        self.server.requests.append(query)
+        if self.server.queue:
+            status, headers = self.server.queue.pop(0)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        days = pd.date_range(query['startdate'], query['enddate'], freq='D')
+        results = [{'date': f'{d:%Y-%m-%d}T00:00:00', 'datatype': t, 'station': noaa.STATION_ID, 'value': v}
+                   for d in days for t, v in [('TMAX', 10.0), ('PRCP', 2.0)]]
+        body = json.dumps({'results': results}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.requests, server.queue = [], []
+    server.url = f'http://127.0.0.1:{server.server_port}/data'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _write(path, rows):
+    pd.DataFrame(rows, columns=['Date', 'Temp_High', 'Precip_Type']).to_csv(path, index=False)
+
+
+def test_missing_ranges_split_at_gaps_and_months(tmp_path):
+    path = tmp_path / 'w.csv'
+    # Jan 1-29 known, Jan 30 - Feb 3 unknown (too long to interpolate), Feb 4-9 known
+    rows = [(f'{d:%Y-%m-%d}', 'NA' if date(2025, 1, 30) <= d.date() <= date(2025, 2, 3) else 40, 'None')
+            for d in pd.date_range('2025-01-01', '2025-02-09')]
+    _write(path, rows)
+    store = weather.build_store([str(path)])
+
+    ranges = noaa.missing_ranges(2025, store, today=date(2025, 2, 12))
+    assert ranges == [(date(2025, 1, 30), date(2025, 1, 31)), (date(2025, 2, 1), date(2025, 2, 3)),
+                      (date(2025, 2, 10), date(2025, 2, 11))]
+    assert noaa.missing_ranges(2025, None, today=date(2025, 1, 1)) == []
+    assert len(noaa.missing_ranges(2025, None, today=date(2026, 1, 1))) == 12
+
+
+def test_short_gaps_are_refetched_once_interpolated(tmp_path):
+    path = tmp_path / 'w.csv'
+    _write(path, [('2025-01-01', 40, 'None'), ('2025-01-02', 'NA', 'None'), ('2025-01-03', 42, 'None')])
+    ranges = noaa.missing_ranges(2025, weather.build_store([str(path)]), today=date(2025, 1, 4))
+    assert ranges == [(date(2025, 1, 2), date(2025, 1, 2))]
+
+
+def test_429_is_retried_after_the_servers_delay(stub, tmp_path, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(noaa.time, 'sleep', sleeps.append)
+    stub.queue += [(429, {'Retry-After': '7'}), (503, {})]
+
+    session = noaa.make_session('token')
+    payload = noaa.fetch_range(session, date(2025, 3, 1), date(2025, 3, 2), stub.url, tmp_path)
+    assert len(payload['results']) == 4
+    assert len(stub.requests) == 3
+    # Retry-After is honoured; without it the backoff doubles from BACKOFF_SECONDS
+    assert sleeps == [7.0, noaa.BACKOFF_SECONDS * 2]
+
+
+def test_persistent_errors_raise(stub, tmp_path, monkeypatch):
+    import requests
+    monkeypatch.setattr(noaa.time, 'sleep', lambda s: None)
+    stub.queue += [(500, {})] * noaa.MAX_RETRIES
+
+    with pytest.raises(requests.HTTPError):
+        noaa.fetch_range(noaa.make_session('token'), date(2025, 3, 1), date(2025, 3, 2), stub.url, tmp_path)
+    assert len(stub.requests) == noaa.MAX_RETRIES
+    assert not list(tmp_path.iterdir())
+
+
+def test_rerun_is_served_from_the_cache(stub, tmp_path):
+    ranges = [(date(2025, 1, 1), date(2025, 1, 31)), (date(2025, 2, 1), date(2025, 2, 28))]
+    first = noaa.fetch_ranges(ranges, 'token', stub.url, tmp_path, workers=2)
+    assert len(stub.requests) == 2
+
+    second = noaa.fetch_ranges(ranges, 'token', stub.url, tmp_path, workers=2)
+    assert len(stub.requests) == 2
+    assert second == first
+    assert noaa.daily_weather(second)['Temp_High'].eq(50).all()
+
+
+def test_recent_ranges_are_not_cached(stub, tmp_path):
+    session = noaa.make_session('token')
+    for _ in range(2):
+        noaa.fetch_range(session, date(2025, 3, 1), date(2025, 3, 5), stub.url, tmp_path, today=date(2025, 3, 8))
+    assert len(stub.requests) == 2
+    assert not list(tmp_path.iterdir())
+
+
+def test_sync_merges_into_the_csv_and_dedups(stub, tmp_path):
+    output = tmp_path / 'camp_hill_2025_weather.csv'
+    # Known readings, a duplicated day and a long NA gap (Jan 3-7) that has to be fetched
+    rows = [('2025-01-01', 31, 'Snow'), ('2025-01-02', 33, 'None'), ('2025-01-02', 33, 'None')]
+    rows += [(f'2025-01-0{d}', 'NA', 'None') for d in range(3, 8)] + [('2025-01-08', 35, 'Rain')]
+    _write(output, rows)
+
+    ranges, fetched, known = noaa.sync_year(2025, 'token', output=str(output), base_url=stub.url,
+                                            cache_dir=tmp_path / 'cache', workers=2)
+    assert ranges[0] == (date(2025, 1, 3), date(2025, 1, 7))
+    assert ranges[1] == (date(2025, 1, 9), date(2025, 1, 31)) and len(ranges) == 13
+    assert known == 365
+
+    merged = pd.read_csv(output)
+    assert len(merged) == 365 and merged['Date'].is_unique
+    by_day = merged.set_index('Date')
+    # Existing readings are kept; fetched days fill the gaps
+    assert by_day.loc['2025-01-01'].tolist() == [31, 'Snow']
+    assert by_day.loc['2025-01-08'].tolist() == [35, 'Rain']
+    assert by_day.loc['2025-01-05'].tolist() == [50, 'Rain']
+
+    # Nothing left to fetch: no ranges and no network
+    n = len(stub.requests)
+    assert noaa.sync_year(2025, 'token', output=str(output), base_url=stub.url, cache_dir=tmp_path / 'cache')[0] == []
+    assert len(stub.requests) == n
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline import normalize
+
+
+def test_currency_strings_parse_to_floats():
+    values = pd.Series(['$1,234.56', '-$6.49', '$0.00', None, '$1,234.56'])
+    assert normalize.parse_currency(values).tolist() == [1234.56, -6.49, 0.0, 0.0, 1234.56]
+    assert normalize.parse_number(pd.Series(['1.0', '2', 'x', None])).tolist() == [1.0, 2.0, 0.0, 0.0]
+
+
+def test_pacific_export_times_become_local_time():
+    # The account reports in Pacific time; the restaurant is Eastern
+    dates = pd.Series(['2026-01-31', '2026-01-31', '2025-07-04'])
+    times = pd.Series(['15:45:15', '22:30:00', '11:00:00'])
+    tz = pd.Series(['Pacific Time (US & Canada)', 'Pacific Time (US & Canada)', 'Eastern Time (US & Canada)'])
+    local = normalize.parse_local_datetime(dates, times, tz)
+    assert str(local.tz) == normalize.LOCAL_TZ
+    assert [f'{t:%Y-%m-%d %H:%M:%S}' for t in local] == ['2026-01-31 18:45:15', '2026-02-01 01:30:00',
+                                                          '2025-07-04 11:00:00']
+    # A late Pacific ticket belongs to the next local day
+    days = normalize.local_day(local)
+    assert days.dtype == np.dtype('datetime64[ns]')
+    assert pd.DatetimeIndex(days).strftime('%Y-%m-%d').tolist() == ['2026-01-31', '2026-02-01', '2025-07-04']
+    assert normalize.day_names(days).tolist() == ['Saturday', 'Sunday', 'Friday']
+
+
+def test_missing_time_zone_column_uses_the_account_default():
+    local = normalize.parse_local_datetime(pd.Series(['2026-01-05']), pd.Series(['09:00:00']))
+    assert f'{local[0]:%H:%M}' == '12:00'
+
+
+def test_unknown_time_zone_label_raises():
+    assert normalize.resolve_timezone('Europe/Paris') == 'Europe/Paris'
+    with pytest.raises(ValueError, match='Unknown Square time zone'):
+        normalize.resolve_timezone('Mars Standard Time')
+
+
+def test_normalize_sales_builds_the_typed_columns():
+    raw = pd.DataFrame({'Date': ['2026-01-05'], 'Time': ['09:00:00'], 'Time Zone': ['Pacific Time (US & Canada)'],
+                        'Qty': ['2.0'], 'Gross Sales': ['$27.98'], 'Net Sales': ['$25.18']})
+    out = normalize.normalize_sales(raw)
+    assert out.columns.tolist() == ['Datetime_ET', 'Date', 'Day_of_Week', 'Qty',
+                                    'Gross Sales', 'Discounts', 'Net Sales', 'Tax']
+    assert out.iloc[0][['Day_of_Week', 'Qty', 'Gross Sales', 'Discounts', 'Net Sales']].tolist() == \
+        ['Monday', 2.0, 27.98, 0.0, 25.18]
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import engines, prep
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'prep')
+ITEMS = ['Pho Dac Biet', 'Banh Mi', 'Spring rolls']
+PROTEIN = {'Pho Dac Biet': 'Rare Beef', 'Banh Mi': 'Grilled Pork', 'Spring rolls': 'Shrimp'}
+
+
+def _history(seed=0):
+    """Four weeks of cube cells, taxonomy and per-line modifiers for three items"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2026-01-05', periods=28)
+    qty = np.c_[rng.integers(30, 61, 28), rng.integers(8, 21, 28), rng.integers(12, 29, 28)]
+    taxonomy = pd.DataFrame({'Item_Name': ITEMS, 'Category': ['Pho', 'Banh Mi', 'Appetizers'],
+                             'Family': ['pho', 'banh mi', 'appetizer'], 'Is_Voided': False})
+    cells = pd.DataFrame({'Date': np.repeat(dates, 3), 'Item': pd.Categorical(np.tile(ITEMS, 28), categories=ITEMS),
+                          'Qty': qty.ravel().astype(float)})
+
+    # One line per unit sold: pho is two-thirds Large, all beef broth
+    lines = cells.loc[cells.index.repeat(cells['Qty'].astype(int)), ['Date', 'Item']].reset_index(drop=True)
+    lines['Line_ID'] = np.arange(len(lines))
+    is_pho = (lines['Item'] == 'Pho Dac Biet').to_numpy()
+    size = np.where(lines['Line_ID'] % 3 == 0, 'Small', 'Large')
+    groups = [lines[is_pho].assign(Group='size', Modifier=size[is_pho]),
+              lines[is_pho].assign(Group='broth', Modifier='Beef'),
+              lines.assign(Group='protein', Modifier=lines['Item'].astype(str).map(PROTEIN))]
+    mods = pd.concat(groups, ignore_index=True).assign(Extra=False, Qty=1.0)
+    mods['Item'] = pd.Categorical(mods['Item'], categories=ITEMS)
+    return cells, taxonomy, mods, lines.assign(Size=size)
+
+
+@pytest.fixture(scope='module')
+def engine():
+    cells, taxonomy, mods, _ = _history()
+    return prep.build_engine(cells, taxonomy, mods, prep.read_recipes())
+
+
+def _forecast():
+    menu_qty = pd.read_csv(os.path.join(FIXTURES, 'item_forecast.csv'), parse_dates=['Date'])
+    return prep.item_quantities(menu_qty, 'Item')
+
+
+def test_limits_come_from_the_busiest_historical_day(engine):
+    cells, *_, lines = _history()
+    busiest = cells.pivot(index='Date', columns='Item', values='Qty').max()
+    pho = lines.loc[lines['Item'] == 'Pho Dac Biet', 'Size']
+    broth_per_bowl = (0.9 * (pho == 'Large') + 0.6 * (pho == 'Small')).mean()   # the historical size mix
+    limits = engine.limits()
+    assert limits['Beef broth'] == pytest.approx(engines.MAX_RATIO * busiest['Pho Dac Biet'] * broth_per_bowl)
+    assert limits['Baguettes'] == pytest.approx(engines.MAX_RATIO * busiest['Banh Mi'])
+
+
+def test_realistic_forecast_is_not_flagged(engine):
+    quantities = _forecast()
+    sheet = engine.sheet(quantities)
+    assert list(sheet.columns) == ['Date', 'Ingredient', 'Unit', 'Qty', 'Limit', 'Over_Limit']
+    assert not sheet['Over_Limit'].any() and engine.over_limit(quantities).empty
+
+    qty = sheet.set_index(['Date', 'Ingredient'])['Qty']
+    assert qty[(pd.Timestamp('2026-02-14'), 'Baguettes')] == 22
+    assert 30 < qty[(pd.Timestamp('2026-02-14'), 'Beef broth')] < 60   # 63 bowls, mostly Large
+
+
+def test_implausible_forecast_is_flagged_not_rewritten(engine):
+    quantities = _forecast()
+    quantities.loc['2026-02-13', 'Pho Dac Biet'] = 1.6e7   # an exploding item model
+    sheet = engine.sheet(quantities).set_index(['Date', 'Ingredient'])
+
+    broth = sheet.loc[(pd.Timestamp('2026-02-13'), 'Beef broth')]
+    assert broth['Qty'] > 1e6 and broth['Over_Limit']
+    assert broth['Limit'] == pytest.approx(engine.limits()['Beef broth'], abs=0.01)
+
+    flagged = engine.over_limit(quantities)
+    assert flagged['Date'].unique().tolist() == [pd.Timestamp('2026-02-13')]
+    assert {'Beef broth', 'Rice noodles (banh pho)', 'Eye of round (rare beef)'} <= set(flagged['Ingredient'])
+    assert 'Baguettes' not in set(flagged['Ingredient'])
@@ -0,0 +1,66 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import features, kink, registry
+
+
+def _frame(temps, seed=0):
+    rng = np.random.default_rng(seed)
+    n = len(temps)
+    df = pd.DataFrame({'Date': pd.date_range('2026-01-06', periods=n), 'Temp_High': np.asarray(temps, dtype=float)})
+    for col in features.KINK_VARS:
+        df[col] = 0.0
+    df['is_weekend'] = (np.arange(n) % 3 == 0).astype(float)
+    df['season_impact'] = 1.0
+    df[features.TARGET] = 60 - 0.3 * df['Temp_High'] + 15 * df['is_weekend'] + rng.normal(0, 1, n)
+    return df
+
+
+def test_unsupported_search_keeps_the_default_kink(tmp_path):
+    df = _frame(np.linspace(10, 28, 20))
+    with pytest.warns(UserWarning, match='default'):
+        model = registry.fit('test', df)
+    assert model.kink == kink.DEFAULT_KINK
+    assert model.kink_source == 'default'
+    assert (model.kink_n_cold, model.kink_n_hot) == (20, 0)
+
+    registry.save(model, tmp_path)
+    loaded = registry.load('test', model.data_hash, tmp_path)
+    assert (loaded.kink_source, loaded.kink_n_cold, loaded.kink_n_hot) == ('default', 20, 0)
+
+
+def test_supported_kink_records_its_support():
+    temps = np.linspace(15, 65, 30)
+    model = registry.fit('test', _frame(temps))
+    assert model.kink_source == 'search'
+    assert model.kink_n_cold >= kink.MIN_SIDE_DAYS and model.kink_n_hot >= kink.MIN_SIDE_DAYS
+    assert model.kink_n_hot == int((temps > model.kink).sum())
+
+
+def test_revenue_target_is_its_own_model():
+    df = _frame(np.linspace(15, 65, 30))
+    df[features.REVENUE_TARGET] = 25 * df[features.TARGET] + 400
+    bowls, revenue = registry.fit('test', df), registry.fit('test', df, target=features.REVENUE_TARGET)
+    assert revenue.data_hash != bowls.data_hash
+    assert revenue.params['is_weekend'] == pytest.approx(25 * bowls.params['is_weekend'], rel=0.01)
+
+
+def test_constant_columns_are_left_out_of_the_fit():
+    df = _frame(np.linspace(15, 65, 30))   # year dummies all zero, season_impact constant
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        model = registry.fit('test', df)
+    assert model.params[['is_2024', 'is_2025', 'season_impact']].tolist() == [0.0, 0.0, 0.0]
+    assert model.cov.loc['is_2025'].abs().sum() == 0.0
+    assert model.params['is_weekend'] == pytest.approx(15, abs=1)
+
+
+def test_each_model_dir_gets_its_own_artifact(tmp_path):
+    df = _frame(np.linspace(15, 65, 30))
+    first = registry.load_or_fit('test', df, model_dir=str(tmp_path / 'a'))
+    registry.load_or_fit('test', df, model_dir=str(tmp_path / 'b'))
+    assert os.path.exists(registry.artifact_path('test', first.data_hash, str(tmp_path / 'b')))
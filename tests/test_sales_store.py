@@ -0,0 +1,92 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from pipeline import sales_store
+
+PACIFIC = 'Pacific Time (US & Canada)'
+
+
+def _line(day, time, ticket, payment, item='Pho: Dac Biet', category='Pho', gross='$14.99'):
+    return {'Date': day, 'Time': time, 'Time Zone': PACIFIC, 'Category': category, 'Item': item, 'Qty': '1.0',
+            'Price Point Name': 'Regular', 'Modifiers Applied': 'Large', 'Gross Sales': gross,
+            'Discounts': '$0.00', 'Net Sales': gross, 'Tax': '$0.90', 'Transaction ID': ticket,
+            'Payment ID': payment, 'Event Type': 'Payment', 'Dining Option': 'For Here',
+            'Channel': 'Bamboo Pho & Tea'}
+
+
+def _export(path, lines):
+    pd.DataFrame(lines).to_csv(path, index=False)
+    return str(path)
+
+
+# Three tickets over two days; T2 has a pho and a drink on one payment
+JAN_5_6 = [_line('2026-01-05', '11:00:00', 'T1', 'P1'),
+           _line('2026-01-06', '12:00:00', 'T2', 'P2'),
+           _line('2026-01-06', '12:00:00', 'T2', 'P2', 'Milk Tea', 'Milk Tea', '$5.75'),
+           _line('2026-01-06', '13:00:00', 'T3', 'P3')]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return str(tmp_path / 'store')
+
+
+def test_overlapping_export_only_appends_new_transactions(tmp_path, store):
+    first = _export(tmp_path / 'jan_5_6.csv', JAN_5_6)
+    assert sales_store.ingest_export(first, store) == 4
+
+    # A later export repeats Jan 6 (T2, T3) and adds a late Jan 6 ticket plus Jan 7
+    later = JAN_5_6[1:] + [_line('2026-01-06', '18:05:00', 'T4', 'P4'), _line('2026-01-07', '11:30:00', 'T5', 'P5')]
+    assert sales_store.ingest_export(_export(tmp_path / 'jan_6_7.csv', later), store) == 2
+
+    sales = sales_store.read_sales(['Transaction ID', 'Payment ID'], store)
+    assert sales.astype(str).value_counts().to_dict() == {('T2', 'P2'): 2, ('T1', 'P1'): 1, ('T3', 'P3'): 1,
+                                                          ('T4', 'P4'): 1, ('T5', 'P5'): 1}
+    daily = sales_store.read_daily(store_dir=store).set_index('Date')
+    assert daily['Bowls_Sold'].tolist() == [1.0, 3.0, 1.0]
+    assert daily['Transactions'].tolist() == [1, 3, 1]
+
+    manifest = sales_store.load_manifest(store)
+    assert (manifest['first_date'], manifest['last_date']) == ('2026-01-05', '2026-01-07')
+    assert manifest['exports']['jan_6_7.csv']['rows'] == 2
+
+
+def test_rows_after_the_watermark_are_kept_even_with_known_ids(tmp_path, store):
+    sales_store.ingest_export(_export(tmp_path / 'a.csv', JAN_5_6[:1]), store)
+    # The same IDs on a later day (past the watermark) are not checked against the store
+    assert sales_store.ingest_export(_export(tmp_path / 'b.csv', [_line('2026-01-08', '11:00:00', 'T1', 'P1')]),
+                                     store) == 1
+
+
+def test_sync_skips_unchanged_exports(tmp_path, store):
+    path = _export(tmp_path / 'jan.csv', JAN_5_6)
+    assert sales_store.sync([path], store) == {'jan.csv': 4}
+    assert sales_store.sync([path], store) == {}
+
+    # A grown export is re-read, and only its new day is appended
+    _export(path, JAN_5_6 + [_line('2026-01-07', '11:30:00', 'T5', 'P5')])
+    os.utime(path, (1, 1))
+    assert sales_store.sync([path], store) == {'jan.csv': 1}
+    assert len(sales_store.read_sales(['Transaction ID'], store)) == 5
+
+
+def test_schema_change_rebuilds_the_store(tmp_path, store):
+    path = _export(tmp_path / 'jan.csv', JAN_5_6)
+    sales_store.sync([path], store)
+
+    manifest_path = os.path.join(store, sales_store.MANIFEST_FILE)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest['schema'] = sales_store.SCHEMA_VERSION - 1
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f)
+
+    # The unchanged export is ingested again from scratch, not skipped or appended twice
+    assert sales_store.sync([path], store) == {'jan.csv': 4}
+    assert sales_store.load_manifest(store)['schema'] == sales_store.SCHEMA_VERSION
+    assert sales_store.load_manifest(store)['batches'] == 1
+    assert len(sales_store.read_sales(['Transaction ID'], store)) == 4
+    assert len(sales_store.read_baskets(store_dir=store)) == 3
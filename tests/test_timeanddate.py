@@ -0,0 +1,79 @@
+import json
+import os
+import shutil
+from datetime import date
+
+import pytest
+
+from pipeline import timeanddate
+
+# Hand-written day pages that follow the site's historic-weather table layout (not downloaded copies)
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'timeanddate')
+JAN_5, JAN_6, JAN_7, JUL_15 = date(2025, 1, 5), date(2025, 1, 6), date(2025, 1, 7), date(2025, 7, 15)
+
+
+def _page(day):
+    with open(os.path.join(FIXTURES, 'html', timeanddate.LOCATION, f'{day:%Y%m%d}.html'), 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    """Writable copy of the saved pages (fetch_days writes days.json next to them)"""
+    return str(shutil.copytree(FIXTURES, tmp_path / 'cache'))
+
+
+def test_parse_day_takes_the_high_and_weather_cells():
+    day = timeanddate.parse_day(_page(JAN_6))
+    assert day['high_temp_f'] == 31
+    assert day['weather'][:2] == ['Light snow. Overcast.', 'Snow. Overcast.']
+    assert timeanddate.precip_type(day['weather']) == 'Snow'
+
+    clear = timeanddate.parse_day(_page(JAN_7))
+    assert clear == {'high_temp_f': 28, 'weather': ['Passing clouds.', 'Clear.']}
+    assert timeanddate.precip_type(clear['weather']) == 'None'
+
+
+def test_parse_day_converts_celsius_pages():
+    day = timeanddate.parse_day(_page(JUL_15))
+    assert day['high_temp_f'] == 88   # 31 °C
+    assert len(day['weather']) == 5
+    assert timeanddate.precip_type(day['weather']) == 'Rain'
+
+
+def test_parse_day_without_a_table():
+    assert timeanddate.parse_day(b'<html><body><p>No data</p></body></html>') == {'high_temp_f': None, 'weather': []}
+
+
+def test_offline_fetch_uses_saved_pages_only(cache_dir):
+    results, n_todo = timeanddate.fetch_days([JAN_5, JAN_6, JAN_7], cache_dir, offline=True, today=JUL_15)
+    assert n_todo == 3
+    assert sorted(results) == ['2025-01-06', '2025-01-07']   # no page saved for Jan 5
+
+    frame = timeanddate.to_frame(results)
+    assert frame['Temp_High'].tolist() == [31, 28]
+    assert frame['Precip_Type'].tolist() == ['Snow', 'None']
+    with open(os.path.join(cache_dir, timeanddate.DAY_RESULTS)) as f:
+        assert sorted(json.load(f)) == ['2025-01-06', '2025-01-07']
+
+
+def test_day_cache_is_reused_without_pages_or_parsing(cache_dir, monkeypatch):
+    first, _ = timeanddate.fetch_days([JAN_6, JAN_7], cache_dir, offline=True, today=JUL_15)
+    shutil.rmtree(os.path.join(cache_dir, 'html'))
+
+    def fail(html):
+        raise AssertionError("parsed a day that is in days.json")
+
+    monkeypatch.setattr(timeanddate, 'parse_day', fail)
+    again, n_todo = timeanddate.fetch_days([JAN_6, JAN_7], cache_dir, offline=True, today=JUL_15)
+    assert n_todo == 0
+    assert again == first
+
+
+def test_today_is_returned_but_not_cached(cache_dir):
+    results, _ = timeanddate.fetch_days([JUL_15], cache_dir, offline=True, today=JUL_15)
+    assert results['2025-07-15']['high_temp_f'] == 88
+    assert timeanddate.load_day_results(cache_dir) == {}
+
+    _, n_todo = timeanddate.fetch_days([JUL_15], cache_dir, offline=True, today=JUL_15)
+    assert n_todo == 1